@@ -1,32 +1,54 @@
-import smtplib
 import pandas as pd
 from datetime import datetime
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Optional
+from email.mime.application import MIMEApplication
+from concurrent.futures import Future
+from typing import List, Dict, Optional, Tuple, Union
+from instantanea_monitoreo import InstantaneaMonitoreo
+from clasificacion_alertas import ClasificadorAlertas
+from envio_correo import EnviadorSMTP
+from estado_alertas import EstadoAlertas
+from plantilla_correo import RenderizadorCorreo, tabla_seccion
+from registro_alertas import RegistroAlertas
+
+# Columnas de cada alerta en el log JSON lines
+COLUMNAS_LOG_JSONL = ['dominio', 'dias_hasta_vencimiento', 'fecha_expiracion', 'registrar', 'motivo']
 
 class AgenteDecisor:
     """
     Agente Decisor: Encargado de tomar decisiones sobre notificaciones
     """
     
-    def __init__(self, config_email: Optional[Dict] = None):
+    def __init__(self, config_email: Optional[Dict] = None, clasificador: Optional[ClasificadorAlertas] = None,
+                 enviador: Optional[EnviadorSMTP] = None, estado_alertas: Optional[EstadoAlertas] = None,
+                 renderizador: Optional[RenderizadorCorreo] = None, registro: Optional[RegistroAlertas] = None):
         self.logger = logging.getLogger('AgenteDecisor')
         self.logger.setLevel(logging.INFO)
         self.config_email = config_email or {}
+        self.clasificador = clasificador or ClasificadorAlertas()
+        self.enviador = enviador
+        # Con estado de alertas solo se notifican alertas nuevas, escaladas o recordatorios
+        self.estado_alertas = estado_alertas
+        self.renderizador = renderizador or RenderizadorCorreo()
+        self.registro = registro or RegistroAlertas()
+        self.ultimo_envio: Optional[Future] = None
         
-    def evaluar_dominios(self, df: pd.DataFrame, forzar_envio: bool = False) -> Dict:
+    def evaluar_dominios(self, df: Union[pd.DataFrame, InstantaneaMonitoreo], forzar_envio: bool = False) -> Dict:
         """
         Evalúa los dominios y decide qué acción tomar
         
         Args:
-            df: DataFrame con información de dominios
+            df: DataFrame con información de dominios o InstantaneaMonitoreo de la ejecución
             forzar_envio: Si True, envía correo siempre que haya configuración
             
         Returns:
             Diccionario con decisiones tomadas
         """
+        if isinstance(df, InstantaneaMonitoreo):
+            df = df.dataframe
+        
         if df.empty:
             return {
                 'enviar_correo': False,
@@ -36,12 +58,10 @@ class AgenteDecisor:
                 'mensaje': 'No hay dominios para evaluar'
             }
         
-        # Filtrar dominios por vencer en 30 días o menos (críticos)
-        criticos = df[df['dias_hasta_vencimiento'] <= 30].copy()
-        
-        # Filtrar dominios por vencer en 50 días o menos (advertencia)
-        advertencia = df[(df['dias_hasta_vencimiento'] > 30) & 
-                        (df['dias_hasta_vencimiento'] <= 50)].copy()
+        # Clasificar en una sola pasada: críticos (≤30 días) y advertencia (31-50 días)
+        mascaras = self.clasificador.mascaras(df)
+        criticos = df[mascaras['critico']].copy()
+        advertencia = df[mascaras['advertencia']].copy()
         
         decisiones = {
             'enviar_correo': len(criticos) > 0 or forzar_envio,  # Forzar envío si se solicita
@@ -50,12 +70,64 @@ class AgenteDecisor:
             'dominios_advertencia': advertencia.to_dict('records'),
             'total_evaluados': len(df),
             'criticos_count': len(criticos),
-            'advertencia_count': len(advertencia)
+            'advertencia_count': len(advertencia),
+            # Las mismas filas como DataFrame, para renderizar el correo sin recorrer registros
+            'tabla_criticos': criticos,
+            'tabla_advertencia': advertencia
         }
         
+        if self.estado_alertas is not None:
+            self._aplicar_estado_alertas(df, decisiones, forzar_envio)
+        
         self.logger.info(f"Evaluación completada: {len(criticos)} críticos, {len(advertencia)} advertencia")
         return decisiones
     
+    def _aplicar_estado_alertas(self, df: pd.DataFrame, decisiones: Dict, forzar_envio: bool):
+        """
+        Limita correo y log a las alertas que corresponde notificar según el estado guardado
+        
+        Guarda el nivel actual de cada dominio y agrega a las decisiones
+        'dominios_notificar' (con nivel_alerta y motivo), 'notificaciones_count',
+        'resueltos' y 'alertas_pendientes' (para confirmar_notificaciones).
+        """
+        evaluacion = self.estado_alertas.evaluar(df['dominio'], df['dias_hasta_vencimiento'], self.clasificador)
+        self.estado_alertas.registrar_niveles(evaluacion)
+        
+        pendientes = evaluacion[evaluacion['notificar']]
+        notificar = df.loc[pendientes.index].copy()
+        notificar['nivel_alerta'] = pendientes['nivel_alerta'].astype(str)
+        notificar['motivo'] = pendientes['motivo'].astype(str)
+        criticos_nuevos = int((pendientes['nivel_alerta'] == 'CRÍTICO').sum())
+        
+        decisiones['enviar_correo'] = criticos_nuevos > 0 or forzar_envio
+        decisiones['generar_log'] = criticos_nuevos > 0
+        decisiones['dominios_notificar'] = notificar.to_dict('records')
+        decisiones['tabla_notificar'] = notificar
+        decisiones['notificaciones_count'] = len(notificar)
+        decisiones['resueltos'] = df.loc[evaluacion.index[evaluacion['resuelto']], 'dominio'].tolist()
+        decisiones['alertas_pendientes'] = pendientes
+        
+        self.logger.info(f"Alertas a notificar: {len(notificar)} ({criticos_nuevos} críticas), "
+                         f"resueltas: {len(decisiones['resueltos'])}")
+    
+    def confirmar_notificaciones(self, decisiones: Dict) -> int:
+        """
+        Marca como notificadas las alertas de las decisiones (tras enviar el correo o el log)
+        
+        Args:
+            decisiones: Diccionario devuelto por evaluar_dominios
+            
+        Returns:
+            Cantidad de alertas marcadas (0 si no hay estado de alertas)
+        """
+        if self.estado_alertas is None or decisiones.get('alertas_pendientes') is None:
+            return 0
+        try:
+            return self.estado_alertas.marcar_notificados(decisiones['alertas_pendientes'])
+        except Exception as e:
+            self.logger.error(f"Error al guardar el estado de alertas: {str(e)}")
+            return 0
+    
     def generar_mensaje_correo(self, decisiones: Dict) -> str:
         """
         Genera el contenido del correo electrónico
@@ -66,103 +138,134 @@ class AgenteDecisor:
         Returns:
             String con el contenido del correo
         """
-        mensaje = f"""
-REPORTE DE DOMINIOS POR VENCER
-Fecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-=== DOMINIOS CRÍTICOS (Vencen en 30 días o menos) ===
-"""
-        
-        if decisiones['dominios_criticos']:
-            for dominio in decisiones['dominios_criticos']:
-                mensaje += f"""
-Dominio: {dominio['dominio']}
-Días hasta vencimiento: {dominio['dias_hasta_vencimiento']}
-Fecha de expiración: {dominio['fecha_expiracion']}
-Registrar: {dominio.get('registrar', 'N/A')}
-----------------------------------------
-"""
-        else:
-            mensaje += "\nNo hay dominios críticos.\n"
-        
-        mensaje += f"""
-=== DOMINIOS EN ADVERTENCIA (Vencen entre 31-50 días) ===
-"""
-        
-        if decisiones['dominios_advertencia']:
-            for dominio in decisiones['dominios_advertencia']:
-                mensaje += f"""
-Dominio: {dominio['dominio']}
-Días hasta vencimiento: {dominio['dias_hasta_vencimiento']}
-Fecha de expiración: {dominio['fecha_expiracion']}
-----------------------------------------
-"""
+        return self.renderizador.renderizar(decisiones)[0]
+    
+    def construir_mensaje(self, decisiones: Dict, destinatarios: List[str]) -> MIMEMultipart:
+        """
+        Arma el mensaje de alerta (remitente, destinatarios, asunto y cuerpo)
+        
+        Args:
+            decisiones: Diccionario con decisiones
+            destinatarios: Lista de correos destinatarios
+            
+        Returns:
+            Mensaje listo para enviar
+        """
+        msg = MIMEMultipart()
+        msg['From'] = self.config_email.get('remite', 'sistema@dominio.com')
+        msg['To'] = ', '.join(destinatarios)
+        
+        # Asunto dinámico según contenido
+        if decisiones['criticos_count'] > 0:
+            msg['Subject'] = f"ALERTA: {decisiones['criticos_count']} dominios por vencer críticamente"
         else:
-            mensaje += "\nNo hay dominios en advertencia.\n"
+            msg['Subject'] = f"Reporte de Monitoreo de Dominios - {decisiones['total_evaluados']} dominios revisados"
         
-        mensaje += f"""
-=== RESUMEN ===
-Total dominios evaluados: {decisiones['total_evaluados']}
-Dominios críticos: {decisiones['criticos_count']}
-Dominios en advertencia: {decisiones['advertencia_count']}
-
-Acción recomendada: {'RENOVAR URGENTEMENTE' if decisiones['criticos_count'] > 0 else 'Monitoreo continuo'}
-"""
+        cuerpo, recortado = self.renderizador.renderizar(decisiones)
+        msg.attach(MIMEText(cuerpo, 'plain'))
         
-        return mensaje
+        # Lista completa como CSV comprimido cuando el cuerpo no la incluye entera
+        if self.renderizador.debe_adjuntar(decisiones, recortado):
+            adjunto = MIMEApplication(self.renderizador.csv_comprimido(decisiones), 'gzip')
+            adjunto.add_header('Content-Disposition', 'attachment',
+                               filename=f"dominios_alerta_{datetime.now().strftime('%Y%m%d_%H%M')}.csv.gz")
+            msg.attach(adjunto)
+        return msg
+    
+    def obtener_enviador(self) -> Optional[EnviadorSMTP]:
+        """
+        Devuelve el enviador SMTP compartido, creándolo la primera vez
+        
+        Returns:
+            EnviadorSMTP o None si no hay configuración de correo
+        """
+        if self.enviador is None and self.config_email:
+            self.enviador = EnviadorSMTP(self.config_email)
+        return self.enviador
     
-    def enviar_correo(self, decisiones: Dict, destinatarios: List[str]) -> bool:
+    def enviar_correo(self, decisiones: Dict, destinatarios: List[str], en_segundo_plano: bool = False) -> bool:
         """
         Envía correo electrónico con las alertas
         
+        La sesión SMTP (STARTTLS y LOGIN) se reutiliza entre envíos. Con
+        en_segundo_plano=True el mensaje se encola y el método vuelve sin
+        esperar al servidor; el resultado queda en self.ultimo_envio (Future).
+        
         Args:
             decisiones: Diccionario con decisiones
             destinatarios: Lista de correos destinatarios
+            en_segundo_plano: Si True, encola el envío en lugar de esperarlo
             
         Returns:
-            True si se envió correctamente, False en caso contrario
+            True si se envió (o encoló) correctamente, False en caso contrario
         """
         if not self.config_email:
             self.logger.error("No hay configuración de correo")
             return False
             
         try:
-            msg = MIMEMultipart()
-            msg['From'] = self.config_email.get('remite', 'sistema@dominio.com')
-            msg['To'] = ', '.join(destinatarios)
-            
-            # Asunto dinámico según contenido
-            if decisiones['criticos_count'] > 0:
-                msg['Subject'] = f"ALERTA: {decisiones['criticos_count']} dominios por vencer críticamente"
-            else:
-                msg['Subject'] = f"Reporte de Monitoreo de Dominios - {decisiones['total_evaluados']} dominios revisados"
-            
-            msg.attach(MIMEText(self.generar_mensaje_correo(decisiones), 'plain'))
-            
-            self.logger.info(f"Conectando a servidor SMTP: {self.config_email['smtp_server']}:{self.config_email['smtp_port']}")
-            server = smtplib.SMTP(self.config_email['smtp_server'], self.config_email['smtp_port'])
-            server.starttls()
-            self.logger.info(f"Iniciando sesión como: {self.config_email['usuario']}")
-            server.login(self.config_email['usuario'], self.config_email['contraseña'])
-            
-            text = msg.as_string()
-            server.sendmail(msg['From'], destinatarios, text)
-            server.quit()
-            
-            self.logger.info(f"Correo enviado exitosamente a {len(destinatarios)} destinatarios")
-            return True
-            
+            msg = self.construir_mensaje(decisiones, destinatarios)
         except Exception as e:
             self.logger.error(f"Error al enviar correo: {str(e)}")
             return False
+        
+        if en_segundo_plano:
+            self.ultimo_envio = self.obtener_enviador().encolar(msg, destinatarios)
+            self.logger.info(f"Correo encolado para {len(destinatarios)} destinatarios")
+            return True
+        return self.obtener_enviador().enviar(msg, destinatarios)
     
-    def generar_log(self, decisiones: Dict, archivo_log: str = 'dominios_log.txt') -> bool:
+    def enviar_correos(self, envios: List[Tuple[Dict, List[str]]]) -> List[bool]:
+        """
+        Envía varios correos (por ejemplo uno por equipo) por la misma sesión SMTP
+        
+        Args:
+            envios: Lista de tuplas (decisiones, destinatarios)
+            
+        Returns:
+            Lista de resultados en el mismo orden
+        """
+        if not self.config_email:
+            self.logger.error("No hay configuración de correo")
+            return [False] * len(envios)
+        
+        mensajes = [(self.construir_mensaje(decisiones, destinatarios), destinatarios)
+                    for decisiones, destinatarios in envios]
+        return self.obtener_enviador().enviar_lote(mensajes)
+    
+    def esperar_envios(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que se envíen los correos encolados
+        
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+            
+        Returns:
+            True si no quedan correos pendientes
+        """
+        return self.enviador.esperar(timeout) if self.enviador is not None else True
+    
+    def cerrar(self, timeout: Optional[float] = None):
+        """
+        Envía los correos pendientes, cierra las sesiones SMTP y vuelca el log de alertas
+        
+        Args:
+            timeout: Segundos máximos para vaciar la cola
+        """
+        if self.enviador is not None:
+            self.enviador.cerrar(esperar=True, timeout=timeout)
+        self.registro.cerrar()
+    
+    def generar_log(self, decisiones: Dict, archivo_log: Optional[str] = None) -> bool:
         """
         Genera archivo de log con las alertas
         
+        El bloque se arma completo y se escribe de una vez a través de
+        RegistroAlertas, que rota el archivo y comprime los segmentos viejos.
+        
         Args:
             decisiones: Diccionario con decisiones
-            archivo_log: Nombre del archivo de log
+            archivo_log: Nombre del archivo de log (por defecto el del registro del agente)
             
         Returns:
             True si se generó correctamente, False en caso contrario
@@ -170,31 +273,49 @@ Acción recomendada: {'RENOVAR URGENTEMENTE' if decisiones['criticos_count'] > 0
         if not decisiones['generar_log']:
             self.logger.info("No se requiere generar log")
             return True
+        
+        registro = self.registro
+        if archivo_log is not None and archivo_log != registro.ruta:
+            registro = RegistroAlertas(archivo_log, formato=registro.formato, tamano_maximo=registro.tamano_maximo,
+                                       rotacion_segundos=registro.rotacion_segundos, copias=registro.copias,
+                                       comprimir=registro.comprimir)
             
         try:
-            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            ahora = datetime.now()
+            criticos = tabla_seccion(decisiones, 'tabla_criticos', 'dominios_criticos')
+            advertencia = tabla_seccion(decisiones, 'tabla_advertencia', 'dominios_advertencia')
+            if 'dominios_notificar' in decisiones:
+                # Con estado de alertas solo se registran las novedades, no el bloque completo
+                notificar = tabla_seccion(decisiones, 'tabla_notificar', 'dominios_notificar')
+                criticos = notificar[notificar['nivel_alerta'] == 'CRÍTICO']
+                advertencia = notificar[notificar['nivel_alerta'] == 'ADVERTENCIA']
             
-            with open(archivo_log, 'a', encoding='utf-8') as f:
-                f.write(f"\n{'='*60}\n")
-                f.write(f"LOG DE ALERTAS - {timestamp}\n")
-                f.write(f"{'='*60}\n")
-                
-                if decisiones['dominios_criticos']:
-                    f.write("\nDOMINIOS CRÍTICOS:\n")
-                    for dominio in decisiones['dominios_criticos']:
-                        f.write(f"- {dominio['dominio']}: {dominio['dias_hasta_vencimiento']} días\n")
-                
-                if decisiones['dominios_advertencia']:
-                    f.write("\nDOMINIOS EN ADVERTENCIA:\n")
-                    for dominio in decisiones['dominios_advertencia']:
-                        f.write(f"- {dominio['dominio']}: {dominio['dias_hasta_vencimiento']} días\n")
-                
-                f.write(f"\nResumen: {decisiones['criticos_count']} críticos, {decisiones['advertencia_count']} advertencia\n")
-                f.write(f"{'='*60}\n")
+            if registro.formato == 'jsonl':
+                for nivel, tabla in (('CRÍTICO', criticos), ('ADVERTENCIA', advertencia)):
+                    columnas = [c for c in COLUMNAS_LOG_JSONL if c in tabla]
+                    registro.escribir_tabla(tabla[columnas], fecha=ahora.isoformat(timespec='seconds'), nivel=nivel)
+            else:
+                bloque = [f"\n{'='*60}\n", f"LOG DE ALERTAS - {ahora.strftime('%Y-%m-%d %H:%M:%S')}\n", f"{'='*60}\n"]
+                if not criticos.empty:
+                    bloque += ["\nDOMINIOS CRÍTICOS:\n", self._lineas_log(criticos)]
+                if not advertencia.empty:
+                    bloque += ["\nDOMINIOS EN ADVERTENCIA:\n", self._lineas_log(advertencia)]
+                bloque.append(f"\nResumen: {decisiones['criticos_count']} críticos, {decisiones['advertencia_count']} advertencia\n")
+                bloque.append(f"{'='*60}\n")
+                registro.escribir(''.join(bloque))
             
-            self.logger.info(f"Log generado en {archivo_log}")
+            if not registro.vaciar():
+                return False
+            self.logger.info(f"Log generado en {registro.ruta}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error al generar log: {str(e)}")
             return False
+    
+    def _lineas_log(self, tabla: pd.DataFrame) -> str:
+        """Una línea '- dominio: N días (motivo)' por fila, armadas por columna"""
+        lineas = '- ' + tabla['dominio'].astype(str) + ': ' + tabla['dias_hasta_vencimiento'].astype(str) + ' días'
+        if 'motivo' in tabla:
+            lineas = lineas + ' (' + tabla['motivo'].astype(str) + ')'
+        return '\n'.join(lineas) + '\n'
@@ -1,84 +1,464 @@
-import whois
 import pandas as pd
 from datetime import datetime, timedelta
 import logging
-from typing import Dict, List, Optional
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Union
+from esquema_dominios import aplicar_esquema
+from trazas_dominios import tramo
+from parser_whois import descargar_texto_whois, parsear_respuesta_whois
+
+BACKENDS_WHOIS = ('whois', 'asincrono')
+
+
+def calcular_dias_hasta_vencimiento(expiration_date) -> Optional[int]:
+    """
+    Calcula los días que faltan hasta una fecha de expiración
+    
+    Args:
+        expiration_date: Fecha de expiración (naive o timezone-aware) o None
+        
+    Returns:
+        Días hasta el vencimiento o None si no hay fecha
+    """
+    if expiration_date is None or pd.isna(expiration_date):
+        return None
+    
+    # Asegurar que ambas fechas sean timezone-aware o naive
+    now = datetime.now()
+    if expiration_date.tzinfo is not None:
+        now = datetime.now(expiration_date.tzinfo)
+    return (expiration_date - now).days
+
+
+def armar_info_dominio(dominio: str, expiration_date, registrar, estado) -> Dict:
+    """
+    Construye el diccionario estándar de información de un dominio
+    
+    Args:
+        dominio: Nombre del dominio consultado
+        expiration_date: Fecha de expiración (fecha única, lista de fechas o None)
+        registrar: Nombre del registrador
+        estado: Estado(s) del dominio según WHOIS
+        
+    Returns:
+        Diccionario con información del dominio
+    """
+    # Manejar casos donde expiration_date puede ser lista o fecha única
+    if isinstance(expiration_date, list):
+        expiration_date = expiration_date[0]
+        
+    return {
+        'dominio': dominio,
+        'fecha_expiracion': expiration_date,
+        'dias_hasta_vencimiento': calcular_dias_hasta_vencimiento(expiration_date),
+        'registrar': registrar,
+        'estado': estado,
+        'fecha_consulta': datetime.now()
+    }
+
+
+def construir_dataframes_por_bloques(registros: Iterable[Dict], tamano_bloque: int = 1000) -> Iterator[pd.DataFrame]:
+    """
+    Agrupa registros de dominios en DataFrames de tamaño acotado
+    
+    Pensado para consumir iterar_dominios sin acumular toda la cartera.
+    Cada bloque se convierte al esquema compacto de esquema_dominios.
+    
+    Args:
+        registros: Iterable de diccionarios de información de dominios
+        tamano_bloque: Filas máximas por DataFrame
+        
+    Yields:
+        DataFrame con hasta tamano_bloque filas
+    """
+    bloque = []
+    for registro in registros:
+        bloque.append(registro)
+        if len(bloque) >= tamano_bloque:
+            yield aplicar_esquema(pd.DataFrame(bloque))
+            bloque = []
+    if bloque:
+        yield aplicar_esquema(pd.DataFrame(bloque))
+
+
+def _iterar_asincrono(iterador_asincrono: AsyncIterator) -> Iterator:
+    """Consume un iterador asíncrono desde código síncrono con un event loop propio"""
+    loop = asyncio.new_event_loop()
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(iterador_asincrono.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(iterador_asincrono.aclose())
+        loop.close()
+
 
 class AgenteLector:
     """
     Agente Lector: Encargado de leer y obtener información sobre dominios
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 1, backend: Union[str, object] = 'whois',
+                 planificador=None, cache=None, resolvedor=None, metricas=None, trazador=None,
+                 parser_rapido: bool = True):
+        """
+        Args:
+            max_workers: Número de consultas WHOIS simultáneas (1 = secuencial)
+            backend: 'whois' (python-whois), 'asincrono' (cliente asyncio propio
+                     sobre el puerto 43) o una instancia de ClienteWhoisAsincrono
+            planificador: PlanificadorWhois opcional que limita la tasa por servidor
+            cache: CacheWhois opcional para reutilizar resultados entre ejecuciones
+            resolvedor: ResolvedorDNS opcional; leer_dominios omite la consulta
+                        WHOIS de los dominios con NXDOMAIN. Atención: un dominio
+                        suspendido o vencido (clientHold) también da NXDOMAIN,
+                        así que solo conviene usarlo en listas de dominios activos
+            metricas: MetricasMonitoreo opcional donde registrar la latencia y
+                      el tipo de error de cada consulta WHOIS
+            trazador: Trazador opcional que registra tramos por dominio
+                      (consulta WHOIS, ida y vuelta y parseo). Con el backend
+                      'whois' la resolución DNS, la conexión y la referencia al
+                      registrador quedan dentro de whois_ida_vuelta; el backend
+                      'asincrono' las separa en tcp_connect por servidor
+            parser_rapido: Si True (backend 'whois'), extrae los campos con los patrones
+                           por TLD de parser_whois y solo usa el parser completo de
+                           python-whois cuando no coinciden
+        """
         self.logger = logging.getLogger('AgenteLector')
         self.logger.setLevel(logging.INFO)
+        self.max_workers = max(1, max_workers)
+        self.planificador = planificador
+        self.cache = cache
+        self.resolvedor = resolvedor
+        self.metricas = metricas
+        self.trazador = trazador
+        self.parser_rapido = parser_rapido
+        self.cliente_asincrono = None
         
-    def obtener_info_dominio(self, dominio: str) -> Optional[Dict]:
+        if backend == 'asincrono':
+            from whois_asincrono import ClienteWhoisAsincrono
+            self.cliente_asincrono = ClienteWhoisAsincrono(planificador=planificador, metricas=metricas,
+                                                           trazador=trazador)
+        elif isinstance(backend, str):
+            if backend not in BACKENDS_WHOIS:
+                raise ValueError(f"Backend WHOIS no soportado: {backend}. Opciones: {', '.join(BACKENDS_WHOIS)}")
+        else:
+            self.cliente_asincrono = backend
+            if planificador is not None and self.cliente_asincrono.planificador is None:
+                self.cliente_asincrono.planificador = planificador
+            if metricas is not None and self.cliente_asincrono.metricas is None:
+                self.cliente_asincrono.metricas = metricas
+            if trazador is not None and self.cliente_asincrono.trazador is None:
+                self.cliente_asincrono.trazador = trazador
+        
+        self.estadisticas_ejecucion = {}
+        
+    def obtener_info_dominio(self, dominio: str, usar_cache: bool = True) -> Optional[Dict]:
         """
         Obtiene información completa de un dominio
         
         Args:
             dominio: Nombre del dominio a consultar
+            usar_cache: Si False, ignora la cache y consulta WHOIS (el resultado sí se guarda)
             
         Returns:
             Diccionario con información del dominio o None si hay error
         """
+        if self.cache is not None and usar_cache:
+            info = self.cache.obtener(dominio)
+            if info:
+                return info
+        
+        info = self._consultar_whois(dominio)
+        if info and self.cache is not None:
+            self.cache.guardar(info)
+        return info
+    
+    def _consultar_whois(self, dominio: str) -> Optional[Dict]:
+        """Consulta un dominio en el backend WHOIS, sin pasar por la cache"""
+        if self.cliente_asincrono is not None:
+            return asyncio.run(self.cliente_asincrono.obtener_info_dominio(dominio))
+        
+        inicio = time.perf_counter()
         try:
-            w = whois.whois(dominio)
-            
-            # Manejar casos donde expiration_date puede ser lista o fecha única
-            expiration_date = w.expiration_date
-            if isinstance(expiration_date, list):
-                expiration_date = expiration_date[0]
-                
-            # Calcular días hasta vencimiento
-            if expiration_date:
-                # Asegurar que ambas fechas sean timezone-aware o naive
-                now = datetime.now()
-                if expiration_date.tzinfo is not None:
-                    now = datetime.now(expiration_date.tzinfo)
-                dias_hasta_vencimiento = (expiration_date - now).days
-            else:
-                dias_hasta_vencimiento = None
+            # python-whois descarga la respuesta (siguiendo la referencia al registrador); los campos
+            # se extraen con los patrones del TLD y, si no coinciden, con el parser completo
+            with tramo(self.trazador, 'whois_consulta', dominio, backend='whois'):
+                if self.planificador is not None:
+                    servidor = self.planificador.servidor_para(dominio)
+                    with self.planificador.permiso(servidor):
+                        with tramo(self.trazador, 'whois_ida_vuelta', dominio, servidor=servidor):
+                            texto = descargar_texto_whois(dominio)
+                else:
+                    with tramo(self.trazador, 'whois_ida_vuelta', dominio):
+                        texto = descargar_texto_whois(dominio)
                 
-            info = {
-                'dominio': dominio,
-                'fecha_expiracion': expiration_date,
-                'dias_hasta_vencimiento': dias_hasta_vencimiento,
-                'registrar': w.registrar,
-                'estado': w.status,
-                'fecha_consulta': datetime.now()
-            }
+                with tramo(self.trazador, 'whois_parse', dominio):
+                    expiracion, registrar, estado = parsear_respuesta_whois(dominio, texto, self.parser_rapido)
+                info = armar_info_dominio(dominio, expiracion, registrar, estado)
             
-            self.logger.info(f"Información obtenida para {dominio}: {dias_hasta_vencimiento} días hasta vencimiento")
+            if self.metricas is not None:
+                self.metricas.registrar_consulta(time.perf_counter() - inicio)
+            self.logger.info(f"Información obtenida para {dominio}: {info['dias_hasta_vencimiento']} días hasta vencimiento",
+                             extra={'por_dominio': True, 'dominio': dominio})
             return info
             
         except Exception as e:
+            if self.metricas is not None:
+                self.metricas.registrar_consulta(time.perf_counter() - inicio, e)
             self.logger.error(f"Error al obtener información del dominio {dominio}: {str(e)}")
             return None
     
-    def leer_dominios(self, lista_dominios: List[str]) -> pd.DataFrame:
+    def _consultar_lote(self, lista_dominios: List[str], workers: int) -> List[Optional[Dict]]:
+        """
+        Consulta varios dominios en el backend WHOIS, sin pasar por la cache
+        
+        Returns:
+            Resultados en el mismo orden que lista_dominios (None si hubo error)
+        """
+        if self.planificador is not None:
+            orden = self.planificador.intercalar(lista_dominios)
+        else:
+            orden = list(range(len(lista_dominios)))
+        dominios_ordenados = [lista_dominios[i] for i in orden]
+        
+        if self.cliente_asincrono is not None:
+            # Todas las consultas comparten un único event loop
+            infos_ordenados = asyncio.run(self.cliente_asincrono.consultar_dominios(dominios_ordenados, max_concurrencia=workers))
+        elif workers > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lector-whois') as executor:
+                infos_ordenados = list(executor.map(self._consultar_whois, dominios_ordenados))
+        else:
+            infos_ordenados = [self._consultar_whois(dominio) for dominio in dominios_ordenados]
+        
+        # Restaurar el orden original de lista_dominios
+        infos = [None] * len(lista_dominios)
+        for indice, info in zip(orden, infos_ordenados):
+            infos[indice] = info
+        return infos
+    
+    def leer_dominios(self, lista_dominios: List[str], max_workers: Optional[int] = None,
+                      usar_cache: bool = True) -> pd.DataFrame:
         """
         Lee información de múltiples dominios y devuelve un DataFrame
         
+        Con más de un worker las consultas WHOIS se lanzan en paralelo, pero
+        las filas conservan el orden de lista_dominios. Si hay planificador,
+        los dominios se consultan intercalando servidores WHOIS.
+        
         Args:
             lista_dominios: Lista de dominios a consultar
+            max_workers: Consultas simultáneas para esta ejecución (por defecto self.max_workers)
+            usar_cache: Si False, ignora la cache y consulta todos los dominios
             
         Returns:
-            DataFrame con información de todos los dominios
+            DataFrame con información de todos los dominios (esquema compacto
+            de esquema_dominios.ESQUEMA_DOMINIOS)
         """
-        resultados = []
+        workers = self._calcular_workers(lista_dominios, max_workers)
+        inicio = time.perf_counter()
         
-        for dominio in lista_dominios:
-            info = self.obtener_info_dominio(dominio)
-            if info:
-                resultados.append(info)
-                
-        df = pd.DataFrame(resultados)
-        self.logger.info(f"Se procesaron {len(resultados)} dominios exitosamente")
+        infos, pendientes, aciertos_cache, sin_dns = self._preparar_lote(lista_dominios, usar_cache)
+        
+        if pendientes:
+            consultados = self._consultar_lote([lista_dominios[i] for i in pendientes], workers)
+            for indice, info in zip(pendientes, consultados):
+                infos[indice] = info
+                if info and self.cache is not None:
+                    self.cache.guardar(info)
         
+        resultados = [info for info in infos if info]
+        self._registrar_estadisticas(len(lista_dominios), len(resultados), len(pendientes),
+                                     aciertos_cache, sin_dns, workers, time.perf_counter() - inicio)
+                
+        df = aplicar_esquema(pd.DataFrame(resultados))
         return df
     
+    def _calcular_workers(self, lista_dominios: List[str], max_workers: Optional[int]) -> int:
+        """Consultas simultáneas para una ejecución según el backend"""
+        if self.cliente_asincrono is not None:
+            workers = max_workers or self.cliente_asincrono.max_concurrencia
+        else:
+            workers = max_workers or self.max_workers
+        return min(max(1, workers), max(1, len(lista_dominios)))
+    
+    def _preparar_lote(self, lista_dominios: List[str], usar_cache: bool):
+        """
+        Resuelve desde cache lo posible y descarta dominios inexistentes en DNS
+        
+        Returns:
+            Tupla (infos, pendientes, aciertos_cache, sin_dns) donde infos tiene
+            los resultados cacheados por posición y pendientes los índices a consultar
+        """
+        infos = [None] * len(lista_dominios)
+        pendientes = list(range(len(lista_dominios)))
+        
+        if self.cache is not None and usar_cache:
+            for indice, dominio in enumerate(lista_dominios):
+                infos[indice] = self.cache.obtener(dominio)
+            pendientes = [i for i, info in enumerate(infos) if info is None]
+        aciertos_cache = len(lista_dominios) - len(pendientes)
+        
+        sin_dns = 0
+        if self.resolvedor is not None and pendientes:
+            resoluciones = self.resolvedor.resolver_lote([lista_dominios[i] for i in pendientes])
+            inexistentes = {d for d, r in resoluciones.items() if not r['existe']}
+            for dominio in inexistentes:
+                self.logger.warning(f"Se omite WHOIS para {dominio}: {resoluciones[dominio]['error']}")
+            sin_dns = sum(1 for i in pendientes if lista_dominios[i] in inexistentes)
+            pendientes = [i for i in pendientes if lista_dominios[i] not in inexistentes]
+        
+        return infos, pendientes, aciertos_cache, sin_dns
+    
+    def _registrar_estadisticas(self, total: int, exitosos: int, consultas: int, aciertos_cache: int,
+                                sin_dns: int, workers: int, duracion: float):
+        """Guarda las estadísticas de la ejecución en self.estadisticas_ejecucion"""
+        self.estadisticas_ejecucion = {
+            'total_dominios': total,
+            'exitosos': exitosos,
+            'errores': total - exitosos,
+            'consultas_whois': consultas,
+            'aciertos_cache': aciertos_cache,
+            'sin_dns': sin_dns,
+            'workers': workers,
+            'duracion_segundos': round(duracion, 3),
+            'dominios_por_segundo': round(total / duracion, 2) if duracion > 0 else 0.0
+        }
+        self.logger.info(
+            f"Se procesaron {exitosos} dominios exitosamente en {duracion:.1f}s "
+            f"({self.estadisticas_ejecucion['dominios_por_segundo']} dominios/s, {workers} workers, "
+            f"{aciertos_cache} desde cache)"
+        )
+    
+    def iterar_dominios(self, lista_dominios: List[str], max_workers: Optional[int] = None,
+                        usar_cache: bool = True) -> Iterator[Dict]:
+        """
+        Entrega la información de cada dominio en cuanto está disponible
+        
+        Los resultados llegan en orden de finalización (primero los de cache).
+        Solo hay en vuelo unas pocas consultas por worker, así que la memoria no
+        crece con el tamaño de la lista. Los dominios con error no se entregan.
+        Al agotarse el iterador se actualiza self.estadisticas_ejecucion.
+        
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            max_workers: Consultas simultáneas (por defecto según el backend)
+            usar_cache: Si False, ignora la cache y consulta todos los dominios
+            
+        Yields:
+            Diccionario con información de un dominio
+        """
+        if self.cliente_asincrono is not None:
+            # El backend asíncrono se consume desde su propio event loop
+            yield from _iterar_asincrono(self.aiterar_dominios(lista_dominios, max_workers, usar_cache))
+            return
+        
+        workers = self._calcular_workers(lista_dominios, max_workers)
+        inicio = time.perf_counter()
+        infos, pendientes, aciertos_cache, sin_dns = self._preparar_lote(lista_dominios, usar_cache)
+        exitosos = 0
+        
+        for info in infos:
+            if info:
+                exitosos += 1
+                yield info
+        
+        dominios = self._ordenar_pendientes(lista_dominios, pendientes)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lector-whois') as executor:
+            en_vuelo = set()
+            siguiente = iter(dominios)
+            while True:
+                for dominio in islice(siguiente, 2 * workers - len(en_vuelo)):
+                    en_vuelo.add(executor.submit(self._consultar_whois, dominio))
+                if not en_vuelo:
+                    break
+                terminados, en_vuelo = wait(en_vuelo, return_when=FIRST_COMPLETED)
+                for futuro in terminados:
+                    info = futuro.result()
+                    if info:
+                        if self.cache is not None:
+                            self.cache.guardar(info)
+                        exitosos += 1
+                        yield info
+        
+        self._registrar_estadisticas(len(lista_dominios), exitosos, len(pendientes),
+                                     aciertos_cache, sin_dns, workers, time.perf_counter() - inicio)
+    
+    async def aiterar_dominios(self, lista_dominios: List[str], max_workers: Optional[int] = None,
+                               usar_cache: bool = True) -> AsyncIterator[Dict]:
+        """
+        Versión asíncrona de iterar_dominios
+        
+        Con el backend asíncrono las consultas comparten el event loop del
+        llamador; con python-whois se ejecutan en un pool de hilos.
+        
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            max_workers: Consultas simultáneas (por defecto según el backend)
+            usar_cache: Si False, ignora la cache y consulta todos los dominios
+            
+        Yields:
+            Diccionario con información de un dominio
+        """
+        workers = self._calcular_workers(lista_dominios, max_workers)
+        inicio = time.perf_counter()
+        infos, pendientes, aciertos_cache, sin_dns = self._preparar_lote(lista_dominios, usar_cache)
+        exitosos = 0
+        
+        for info in infos:
+            if info:
+                exitosos += 1
+                yield info
+        
+        loop = asyncio.get_running_loop()
+        executor = None
+        if self.cliente_asincrono is None:
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='lector-whois')
+        
+        def consultar(dominio: str):
+            if executor is None:
+                return asyncio.ensure_future(self.cliente_asincrono.obtener_info_dominio(dominio))
+            return loop.run_in_executor(executor, self._consultar_whois, dominio)
+        
+        en_vuelo = set()
+        try:
+            siguiente = iter(self._ordenar_pendientes(lista_dominios, pendientes))
+            while True:
+                for dominio in islice(siguiente, workers - len(en_vuelo)):
+                    en_vuelo.add(consultar(dominio))
+                if not en_vuelo:
+                    break
+                terminados, en_vuelo = await asyncio.wait(en_vuelo, return_when=asyncio.FIRST_COMPLETED)
+                for tarea in terminados:
+                    info = tarea.result()
+                    if info:
+                        if self.cache is not None:
+                            self.cache.guardar(info)
+                        exitosos += 1
+                        yield info
+        finally:
+            # Si el consumidor abandona la iteración, no dejar consultas huérfanas
+            for tarea in en_vuelo:
+                tarea.cancel()
+            if en_vuelo:
+                await asyncio.gather(*en_vuelo, return_exceptions=True)
+            if executor is not None:
+                executor.shutdown(wait=False)
+        
+        self._registrar_estadisticas(len(lista_dominios), exitosos, len(pendientes),
+                                     aciertos_cache, sin_dns, workers, time.perf_counter() - inicio)
+    
+    def _ordenar_pendientes(self, lista_dominios: List[str], pendientes: List[int]) -> List[str]:
+        """Dominios pendientes en el orden de consulta (intercalados si hay planificador)"""
+        dominios = [lista_dominios[i] for i in pendientes]
+        if self.planificador is not None:
+            dominios = [dominios[i] for i in self.planificador.intercalar(dominios)]
+        return dominios
+    
     def dominios_por_vencer(self, df: pd.DataFrame, dias: int = 50) -> pd.DataFrame:
         """
         Filtra dominios que vencerán en X días o menos
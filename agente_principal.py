@@ -1,41 +1,243 @@
+import os
 import pandas as pd
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
-from agente_lector import AgenteLector
+from datetime import datetime, timedelta
+from typing import Callable, List, Dict, Optional
+from agente_lector import AgenteLector, construir_dataframes_por_bloques
 from agente_decisor import AgenteDecisor
+from lector_fragmentado import LectorFragmentado
+from planificador_whois import PlanificadorWhois
+from cache_whois import CacheWhois
+from estado_alertas import EstadoAlertas
+from registro_alertas import RegistroAlertas
+from configuracion_logging import configurar_logging
+from instantanea_monitoreo import InstantaneaMonitoreo
+from clasificacion_alertas import ClasificadorAlertas
+from esquema_dominios import aplicar_esquema, calcular_dias_serie, reporte_memoria, formatear_bytes
+from metricas_monitoreo import MetricasMonitoreo
+from trazas_dominios import Trazador
 
 class AgentePrincipal:
     """
     Agente Principal: Coordina al Agente Lector y Agente Decisor
     """
     
-    def __init__(self, config_email: Optional[Dict] = None):
+    def __init__(self, config_email: Optional[Dict] = None, max_workers: int = 1,
+                 backend_whois: str = 'whois', limitar_tasa_whois: bool = False,
+                 ruta_cache_whois: Optional[str] = None,
+                 ruta_estado: str = 'estado_monitoreo.pkl', antiguedad_maxima_dias: int = 7,
+                 dias_ventana_alerta: int = 50, ruta_metricas: Optional[str] = None,
+                 ruta_trazas: Optional[str] = None, correo_en_segundo_plano: bool = False,
+                 ruta_estado_alertas: Optional[str] = None, recordatorios: Optional[Dict[str, Optional[int]]] = None,
+                 registro_alertas: Optional[RegistroAlertas] = None, formato_log: str = 'texto',
+                 muestreo_log: Optional[Dict[str, float]] = None, umbral_log_agregado: int = 1000,
+                 procesos: int = 1, fragmentos: Optional[int] = None, asignacion_fragmentos: str = 'hash'):
         self.logger = logging.getLogger('AgentePrincipal')
         self.logger.setLevel(logging.INFO)
         
-        # Configurar logging
-        self._configurar_logging()
+        # Configurar logging (una vez por proceso); en ejecuciones de umbral_log_agregado
+        # dominios o más, las líneas de éxito por dominio se muestrean y se resumen al final
+        self._configurar_logging(formato_log, muestreo_log)
+        self.umbral_log_agregado = umbral_log_agregado
+        
+        # Métricas por ejecución (ruta_metricas: archivo .prom para node_exporter)
+        self.metricas = MetricasMonitoreo()
+        self.ruta_metricas = ruta_metricas
+        
+        # Trazas por dominio (opcional): .jsonl para JSON lines, cualquier otra extensión para Chrome trace
+        self.ruta_trazas = ruta_trazas
+        self.trazador = Trazador() if ruta_trazas else None
         
         # Inicializar agentes
-        self.agente_lector = AgenteLector()
-        self.agente_decisor = AgenteDecisor(config_email)
+        planificador = PlanificadorWhois() if limitar_tasa_whois else None
+        cache = CacheWhois(ruta_cache_whois) if ruta_cache_whois else None
+        self.agente_lector = AgenteLector(max_workers=max_workers, backend=backend_whois,
+                                          planificador=planificador, cache=cache, metricas=self.metricas,
+                                          trazador=self.trazador)
+        # Con procesos > 1 la lectura se reparte por fragmentos entre procesos (las trazas
+        # por dominio solo se registran en la lectura de un único proceso)
+        self.lector_fragmentado = None
+        if procesos > 1:
+            self.lector_fragmentado = LectorFragmentado(procesos, fragmentos, asignacion_fragmentos,
+                                                        max_workers=max_workers, backend_whois=backend_whois,
+                                                        limitar_tasa_whois=limitar_tasa_whois,
+                                                        ruta_cache_whois=ruta_cache_whois, metricas=self.metricas)
+        self.clasificador = ClasificadorAlertas()
+        # Estado de alertas (opcional): evita repetir correo y log de alertas ya notificadas
+        self.estado_alertas = EstadoAlertas(ruta_estado_alertas, recordatorios) if ruta_estado_alertas else None
+        self.agente_decisor = AgenteDecisor(config_email, clasificador=self.clasificador,
+                                            estado_alertas=self.estado_alertas, registro=registro_alertas)
+        
+        # Con correo_en_segundo_plano el envío se encola y el monitoreo no espera al servidor SMTP
+        self.correo_en_segundo_plano = correo_en_segundo_plano
+        
+        # Configuración del monitoreo incremental
+        self.ruta_estado = ruta_estado
+        self.antiguedad_maxima = timedelta(days=antiguedad_maxima_dias)
+        self.dias_ventana_alerta = dias_ventana_alerta
         
         self.logger.info("Agente Principal inicializado")
     
-    def _configurar_logging(self):
-        """Configura el sistema de logging"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('sistema_dominios.log'),
-                logging.StreamHandler()
-            ]
-        )
+    def _configurar_logging(self, formato: str = 'texto', muestreo: Optional[Dict[str, float]] = None):
+        """Configura el sistema de logging (cola con hilo escritor, compartida por el proceso)"""
+        self.filtro_log = configurar_logging('sistema_dominios.log', formato=formato, muestreo=muestreo)
+    
+    def _registrar_resumen_log(self):
+        """Registra una línea con los totales de las líneas por dominio muestreadas"""
+        if not self.filtro_log.activo:
+            return
+        for nombre, conteo in self.filtro_log.resumen().items():
+            self.logger.info(f"{nombre}: {conteo['lineas']} dominios procesados "
+                             f"({conteo['registradas']} registrados individualmente en el log)")
+        self.filtro_log.activo = False
+    
+    def crear_instantanea(self, lista_dominios: List[str], usar_cache: bool = True,
+                          al_recibir: Optional[Callable[[Dict], None]] = None) -> InstantaneaMonitoreo:
+        """
+        Consulta los dominios una vez y devuelve una instantánea inmutable
+        
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            usar_cache: Si False, ignora la cache WHOIS y consulta todos los dominios
+            al_recibir: Función opcional llamada con cada dominio en cuanto se
+                        obtiene (por ejemplo para mostrar progreso)
+            
+        Returns:
+            InstantaneaMonitoreo con el DataFrame y las estadísticas de la consulta
+        """
+        lector = self.lector_fragmentado or self.agente_lector
+        if al_recibir is None:
+            df = lector.leer_dominios(lista_dominios, usar_cache=usar_cache)
+        else:
+            df = self._leer_con_progreso(lista_dominios, usar_cache, al_recibir)
+        estadisticas = dict(lector.estadisticas_ejecucion)
+        # LectorFragmentado ya deja en sus estadísticas el uso sumado de las caches de los procesos
+        if lector.cache is not None:
+            estadisticas['cache'] = lector.cache.estadisticas()
+        estadisticas['memoria'] = self._registrar_memoria(df)
+        return InstantaneaMonitoreo(lista_dominios, df, estadisticas)
+    
+    def _registrar_memoria(self, df: pd.DataFrame) -> Dict:
+        """Calcula y registra en el log la memoria que ocupa el DataFrame de la ejecución"""
+        memoria = reporte_memoria(df)
+        self.logger.info(f"DataFrame de dominios: {memoria['filas']} filas, "
+                         f"{formatear_bytes(memoria['bytes_total'])} ({memoria['bytes_por_fila']} bytes/fila)")
+        return memoria
+    
+    def crear_instantanea_incremental(self, lista_dominios: List[str], usar_cache: bool = True,
+                                      al_recibir: Optional[Callable[[Dict], None]] = None) -> InstantaneaMonitoreo:
+        """
+        Toma una instantánea re-consultando solo lo necesario respecto a la ejecución anterior
+        
+        Se consultan los dominios nuevos, los que tienen datos más antiguos que
+        antiguedad_maxima_dias, los que están dentro de la ventana de alerta y
+        los que fallaron la vez anterior. El resto se reutiliza del estado
+        guardado en ruta_estado, con los días hasta el vencimiento recalculados.
+        
+        Args:
+            lista_dominios: Lista de dominios a monitorear
+            usar_cache: Si False, ignora la cache WHOIS en los dominios re-consultados
+            al_recibir: Función opcional llamada con cada dominio re-consultado
+            
+        Returns:
+            InstantaneaMonitoreo con el estado combinado
+        """
+        previo = self._cargar_estado()
+        
+        if previo.empty:
+            a_consultar = list(lista_dominios)
+            reutilizado = previo
+            reutilizados = set()
+        else:
+            previo = previo[previo['dominio'].isin(lista_dominios)].drop_duplicates('dominio', keep='last').copy()
+            ahora = pd.Timestamp.now(tz='UTC')
+            previo['dias_hasta_vencimiento'] = calcular_dias_serie(previo['fecha_expiracion'], ahora)
+            
+            limite = ahora - self.antiguedad_maxima
+            vigentes = ((previo['fecha_consulta'] >= limite) & previo['dias_hasta_vencimiento'].notna() &
+                        (previo['dias_hasta_vencimiento'] > self.dias_ventana_alerta)).fillna(False)
+            reutilizado = previo[vigentes]
+            reutilizados = set(reutilizado['dominio'])
+            a_consultar = [d for d in lista_dominios if d not in reutilizados]
+        
+        self.logger.info(f"Monitoreo incremental: {len(a_consultar)} dominios a consultar, "
+                         f"{len(reutilizado)} reutilizados del estado anterior")
+        
+        nueva = self.crear_instantanea(a_consultar, usar_cache=usar_cache, al_recibir=al_recibir)
+        frescos = nueva.dataframe
+        
+        # Si una re-consulta falla se conserva el dato anterior del dominio
+        partes = [reutilizado, frescos]
+        if not previo.empty:
+            obtenidos = set(frescos['dominio']) if not frescos.empty else set()
+            # Dominios de la lista sin dato fresco ni reutilizado: los re-consultados que fallaron
+            fallidos = previo['dominio'].isin(obtenidos) | previo['dominio'].isin(reutilizados)
+            partes.append(previo[~fallidos])
+        partes = [parte for parte in partes if not parte.empty]
+        # concat de categóricos con distintas categorías da object: se reaplica el esquema
+        combinado = aplicar_esquema(pd.concat(partes, ignore_index=True)) if partes else pd.DataFrame()
+        
+        if not combinado.empty:
+            posicion = {dominio: i for i, dominio in reversed(list(enumerate(lista_dominios)))}
+            combinado = combinado.sort_values('dominio', key=lambda serie: serie.map(posicion),
+                                              kind='stable').reset_index(drop=True)
+            self._guardar_estado(combinado)
+        
+        estadisticas = nueva.estadisticas
+        estadisticas.update({
+            'modo': 'incremental',
+            'reutilizados_estado': len(reutilizado),
+            'reconsultados': len(a_consultar),
+            'memoria': self._registrar_memoria(combinado)
+        })
+        return InstantaneaMonitoreo(lista_dominios, combinado, estadisticas)
+    
+    def _cargar_estado(self) -> pd.DataFrame:
+        """Carga el DataFrame de la ejecución anterior (vacío si no existe)"""
+        if not self.ruta_estado or not os.path.exists(self.ruta_estado):
+            return pd.DataFrame()
+        try:
+            # Estados guardados por versiones anteriores pueden no tener el esquema compacto
+            return aplicar_esquema(pd.read_pickle(self.ruta_estado))
+        except Exception as e:
+            self.logger.warning(f"No se pudo leer el estado anterior {self.ruta_estado}: {str(e)}")
+            return pd.DataFrame()
+    
+    def _guardar_estado(self, df: pd.DataFrame):
+        """Guarda el DataFrame combinado para la próxima ejecución incremental"""
+        try:
+            temporal = f"{self.ruta_estado}.tmp"
+            df.to_pickle(temporal)
+            os.replace(temporal, self.ruta_estado)
+        except Exception as e:
+            self.logger.error(f"Error al guardar el estado de monitoreo: {str(e)}")
+    
+    def _leer_con_progreso(self, lista_dominios: List[str], usar_cache: bool,
+                           al_recibir: Callable[[Dict], None]) -> pd.DataFrame:
+        """
+        Lee los dominios en streaming avisando de cada resultado y devuelve
+        el DataFrame en el orden de lista_dominios
+        """
+        lector = self.lector_fragmentado or self.agente_lector
+        
+        def registros():
+            for info in lector.iterar_dominios(lista_dominios, usar_cache=usar_cache):
+                al_recibir(info)
+                yield info
+        
+        bloques = list(construir_dataframes_por_bloques(registros()))
+        if not bloques:
+            return pd.DataFrame()
+        
+        df = aplicar_esquema(pd.concat(bloques, ignore_index=True))
+        posicion = {dominio: i for i, dominio in reversed(list(enumerate(lista_dominios)))}
+        return df.sort_values('dominio', key=lambda serie: serie.map(posicion), kind='stable').reset_index(drop=True)
     
     def monitorear_dominios(self, lista_dominios: List[str], 
-                          destinatarios_correo: List[str] = None, forzar_envio_correo: bool = False) -> Dict:
+                          destinatarios_correo: List[str] = None, forzar_envio_correo: bool = False,
+                          usar_cache: bool = True, instantanea: Optional[InstantaneaMonitoreo] = None,
+                          al_recibir: Optional[Callable[[Dict], None]] = None,
+                          incremental: bool = False) -> Dict:
         """
         Ejecuta el monitoreo completo de dominios
         
@@ -43,11 +245,22 @@ class AgentePrincipal:
             lista_dominios: Lista de dominios a monitorear
             destinatarios_correo: Lista de correos para notificaciones
             forzar_envio_correo: Si True, envía correo siempre que haya configuración
+            usar_cache: Si False, ignora la cache WHOIS y consulta todos los dominios
+            instantanea: Instantánea ya tomada para estos dominios (evita consultarlos de nuevo)
+            al_recibir: Función opcional llamada con cada dominio en cuanto se obtiene
+            incremental: Si True, re-consulta solo dominios nuevos, antiguos o en
+                         ventana de alerta y combina con el estado anterior
             
         Returns:
-            Diccionario con resultados completos del monitoreo
+            Diccionario con resultados completos del monitoreo; la instantánea
+            usada queda en resultados['instantanea'] para los demás consumidores
         """
         self.logger.info(f"Iniciando monitoreo de {len(lista_dominios)} dominios")
+        self.filtro_log.resumen(reiniciar=True)
+        self.filtro_log.activo = len(lista_dominios) >= self.umbral_log_agregado
+        self.metricas.reiniciar()
+        if self.trazador is not None:
+            self.trazador.reiniciar()
         
         resultados = {
             'timestamp': datetime.now(),
@@ -55,26 +268,53 @@ class AgentePrincipal:
             'dominios_error': 0,
             'decisiones': None,
             'correo_enviado': False,
+            'correo_encolado': False,
             'log_generado': False,
             'dataframe_completo': None,
+            'estadisticas_lector': {},
+            'instantanea': None,
+            'metricas': {},
             'errores': []
         }
         
+        with self.metricas.etapa('total'):
+            self._ejecutar_pasos(resultados, lista_dominios, destinatarios_correo, forzar_envio_correo,
+                                 usar_cache, instantanea, al_recibir, incremental)
+        
+        self._registrar_metricas(resultados)
+        if self.trazador is not None:
+            self._exportar_trazas()
+        self._registrar_resumen_log()
+        return resultados
+    
+    def _ejecutar_pasos(self, resultados: Dict, lista_dominios: List[str], destinatarios_correo: Optional[List[str]],
+                        forzar_envio_correo: bool, usar_cache: bool, instantanea: Optional[InstantaneaMonitoreo],
+                        al_recibir: Optional[Callable[[Dict], None]], incremental: bool):
+        """Ejecuta los pasos del monitoreo midiendo cada uno; completa resultados"""
         try:
             # Paso 1: Agente Lector obtiene información
             self.logger.info("Paso 1: Obteniendo información de dominios...")
-            df_completo = self.agente_lector.leer_dominios(lista_dominios)
+            with self.metricas.etapa('lectura'):
+                if instantanea is None or not instantanea.corresponde_a(lista_dominios):
+                    if incremental:
+                        instantanea = self.crear_instantanea_incremental(lista_dominios, usar_cache, al_recibir)
+                    else:
+                        instantanea = self.crear_instantanea(lista_dominios, usar_cache=usar_cache, al_recibir=al_recibir)
+            df_completo = instantanea.dataframe
+            resultados['instantanea'] = instantanea
             resultados['dataframe_completo'] = df_completo
             resultados['dominios_procesados'] = len(df_completo)
             resultados['dominios_error'] = len(lista_dominios) - len(df_completo)
+            resultados['estadisticas_lector'] = instantanea.estadisticas
             
             if df_completo.empty:
                 self.logger.warning("No se pudo obtener información de ningún dominio")
-                return resultados
+                return
             
             # Paso 2: Agente Decisor evalúa y toma decisiones
             self.logger.info("Paso 2: Evaluando decisiones...")
-            decisiones = self.agente_decisor.evaluar_dominios(df_completo, forzar_envio_correo)
+            with self.metricas.etapa('evaluacion'):
+                decisiones = self.agente_decisor.evaluar_dominios(df_completo, forzar_envio_correo)
             resultados['decisiones'] = decisiones
             
             # Paso 3: Ejecutar acciones según decisiones
@@ -82,50 +322,166 @@ class AgentePrincipal:
             
             # Generar log si es necesario
             if decisiones['generar_log']:
-                log_resultado = self.agente_decisor.generar_log(decisiones)
+                with self.metricas.etapa('log'):
+                    log_resultado = self.agente_decisor.generar_log(decisiones)
                 resultados['log_generado'] = log_resultado
             
             # Enviar correo si es necesario y hay destinatarios
             if decisiones['enviar_correo'] and destinatarios_correo:
-                correo_resultado = self.agente_decisor.enviar_correo(decisiones, destinatarios_correo)
-                resultados['correo_enviado'] = correo_resultado
+                with self.metricas.etapa('correo'):
+                    correo_resultado = self.agente_decisor.enviar_correo(
+                        decisiones, destinatarios_correo, en_segundo_plano=self.correo_en_segundo_plano)
+                if self.correo_en_segundo_plano:
+                    # Encolado no es entregado: correo_enviado se completa cuando termina el envío
+                    resultados['correo_encolado'] = correo_resultado
+                    if correo_resultado:
+                        inicio_metricas = self.metricas.inicio
+                        self.agente_decisor.ultimo_envio.add_done_callback(
+                            lambda futuro: self._al_terminar_correo(futuro, resultados, inicio_metricas))
+                else:
+                    resultados['correo_enviado'] = correo_resultado
             elif decisiones['enviar_correo'] and not destinatarios_correo:
                 self.logger.warning("Se requiere enviar correo pero no hay destinatarios configurados")
             
+            self._confirmar_notificaciones(resultados, decisiones,
+                                           correo_intentado=bool(decisiones['enviar_correo'] and destinatarios_correo))
+            
             self.logger.info("Monitoreo completado exitosamente")
             
         except Exception as e:
             error_msg = f"Error en monitoreo: {str(e)}"
             self.logger.error(error_msg)
             resultados['errores'].append(error_msg)
+    
+    def _confirmar_notificaciones(self, resultados: Dict, decisiones: Dict, correo_intentado: bool):
+        """
+        Marca las alertas como notificadas si salió el correo (o el log, cuando no hay correo)
         
-        return resultados
+        Con el correo en segundo plano se marcan cuando el envío termina bien;
+        si falla, las alertas se vuelven a notificar en la próxima ejecución.
+        """
+        if not decisiones.get('notificaciones_count'):
+            return
+        if not correo_intentado:
+            if resultados['log_generado']:
+                self.agente_decisor.confirmar_notificaciones(decisiones)
+        elif resultados['correo_encolado'] or resultados['correo_enviado']:
+            if self.correo_en_segundo_plano:
+                self.agente_decisor.ultimo_envio.add_done_callback(
+                    lambda futuro: self._confirmar_tras_envio(futuro, decisiones))
+            else:
+                self.agente_decisor.confirmar_notificaciones(decisiones)
+    
+    def _confirmar_tras_envio(self, futuro, decisiones: Dict):
+        """
+        Marca las alertas como notificadas cuando un envío en segundo plano salió bien
+
+        Corre en el hilo de envío; si el envío se canceló o falló, o el estado
+        de alertas ya se cerró (cerrar() con timeout), no se marca nada y las
+        alertas se vuelven a notificar en la próxima ejecución.
+        """
+        if futuro.cancelled() or futuro.exception() is not None or not futuro.result():
+            return
+        if self.estado_alertas is None or self.estado_alertas.cerrado:
+            self.logger.warning("Estado de alertas cerrado: las alertas del correo enviado no se marcan como notificadas")
+            return
+        try:
+            self.agente_decisor.confirmar_notificaciones(decisiones)
+        except Exception as e:
+            self.logger.error(f"Error al confirmar las notificaciones: {str(e)}")
+    
+    def _al_terminar_correo(self, futuro, resultados: Dict, inicio_metricas: float):
+        """
+        Completa resultados['correo_enviado'] cuando termina un envío en segundo plano
+
+        Si las métricas siguen siendo las de esa ejecución, actualiza el valor
+        correo_enviado y vuelve a exportar el archivo .prom.
+        """
+        if futuro.cancelled() or futuro.exception() is not None:
+            return
+        resultados['correo_enviado'] = bool(futuro.result())
+        # Si todavía no se registraron las métricas, _registrar_metricas ya toma el valor
+        if self.metricas.inicio != inicio_metricas or not resultados['metricas']:
+            return
+        self.metricas.registrar_valor('correo_enviado', int(resultados['correo_enviado']))
+        self.metricas.registrar_valor('correo_encolado', int(resultados['correo_encolado']))
+        resultados['metricas'] = self.metricas.como_diccionario()
+        if self.ruta_metricas and not self.metricas.exportar_prometheus(self.ruta_metricas):
+            self.logger.error(f"No se pudieron exportar las métricas a {self.ruta_metricas}")
+    
+    def _registrar_metricas(self, resultados: Dict):
+        """Completa las métricas de la ejecución, las deja en resultados y exporta el archivo .prom"""
+        self.metricas.registrar_lectura(resultados['estadisticas_lector'])
+        decisiones = resultados['decisiones'] or {}
+        self.metricas.registrar_valor('dominios_criticos', decisiones.get('criticos_count', 0))
+        self.metricas.registrar_valor('dominios_advertencia', decisiones.get('advertencia_count', 0))
+        self.metricas.registrar_valor('log_generado', int(resultados['log_generado']))
+        self.metricas.registrar_valor('correo_enviado', int(resultados['correo_enviado']))
+        self.metricas.registrar_valor('correo_encolado', int(resultados['correo_encolado']))
+        self.metricas.registrar_valor('errores_monitoreo', len(resultados['errores']))
+        if 'notificaciones_count' in decisiones:
+            self.metricas.registrar_valor('alertas_notificadas', decisiones['notificaciones_count'])
+            self.metricas.registrar_valor('alertas_resueltas', len(decisiones['resueltos']))
+        memoria = resultados['estadisticas_lector'].get('memoria')
+        if memoria:
+            self.metricas.registrar_valor('memoria_dataframe_bytes', memoria['bytes_total'])
+        
+        resultados['metricas'] = self.metricas.como_diccionario()
+        
+        if self.ruta_metricas:
+            if self.metricas.exportar_prometheus(self.ruta_metricas):
+                self.logger.info(f"Métricas exportadas a {self.ruta_metricas}")
+            else:
+                self.logger.error(f"No se pudieron exportar las métricas a {self.ruta_metricas}")
+    
+    def _exportar_trazas(self):
+        """Escribe las trazas de la ejecución y registra los tramos WHOIS más lentos"""
+        try:
+            cantidad = self.trazador.exportar(self.ruta_trazas)
+            self.logger.info(f"Trazas exportadas a {self.ruta_trazas}: {cantidad} tramos")
+            for lento in self.trazador.mas_lentos('whois_consulta', cantidad=3):
+                self.logger.info(f"Consulta WHOIS lenta: {lento['dominio']} {lento['duracion_ms']:.0f}ms")
+        except Exception as e:
+            self.logger.error(f"Error al exportar trazas: {str(e)}")
+    
+    def cerrar(self, timeout: Optional[float] = None):
+        """
+        Espera los correos encolados, cierra las sesiones SMTP y termina los procesos de lectura
+        
+        Args:
+            timeout: Segundos máximos para terminar los envíos pendientes
+        """
+        self.agente_decisor.cerrar(timeout)
+        if self.lector_fragmentado is not None:
+            self.lector_fragmentado.cerrar()
+        if self.estado_alertas is not None:
+            self.estado_alertas.cerrar()
     
-    def obtener_reporte_pandas(self, lista_dominios: List[str]) -> pd.DataFrame:
+    def obtener_reporte_pandas(self, lista_dominios: Optional[List[str]] = None,
+                               instantanea: Optional[InstantaneaMonitoreo] = None) -> pd.DataFrame:
         """
         Obtiene un reporte visual en pandas de los dominios
         
         Args:
             lista_dominios: Lista de dominios a consultar
+            instantanea: Instantánea ya tomada; si corresponde a lista_dominios
+                         (o no se indica lista) no se consulta WHOIS de nuevo
             
         Returns:
             DataFrame con información formateada para visualización
         """
         self.logger.info("Generando reporte pandas...")
         
-        df = self.agente_lector.leer_dominios(lista_dominios)
+        if instantanea is None or (lista_dominios is not None and not instantanea.corresponde_a(lista_dominios)):
+            instantanea = self.crear_instantanea(lista_dominios or [])
+        
+        df = instantanea.dataframe
         
         if df.empty:
             return df
         
-        # Agregar columnas de análisis
-        df['estado_alerta'] = df['dias_hasta_vencimiento'].apply(
-            lambda x: 'CRÍTICO' if x <= 30 else ('ADVERTENCIA' if x <= 50 else 'NORMAL')
-        )
-        
-        df['prioridad'] = df['dias_hasta_vencimiento'].apply(
-            lambda x: 1 if x <= 30 else (2 if x <= 50 else 3)
-        )
+        # Agregar columnas de análisis (estado_alerta categórico y prioridad)
+        df = self.clasificador.agregar_columnas(df)
         
         # Ordenar por prioridad
         df = df.sort_values('prioridad')
@@ -146,12 +502,33 @@ class AgentePrincipal:
         print(f"Dominios procesados: {resultados['dominios_procesados']}")
         print(f"Dominios con error: {resultados['dominios_error']}")
         
+        estadisticas = resultados.get('estadisticas_lector')
+        if estadisticas:
+            procesos = f", {estadisticas['procesos']} procesos" if 'procesos' in estadisticas else ''
+            print(f"Tiempo de consulta WHOIS: {estadisticas['duracion_segundos']}s "
+                  f"({estadisticas['dominios_por_segundo']} dominios/s, {estadisticas['workers']} workers{procesos})")
+            print(f"Consultas WHOIS: {estadisticas['consultas_whois']} (desde cache: {estadisticas['aciertos_cache']})")
+            if estadisticas.get('memoria'):
+                memoria = estadisticas['memoria']
+                print(f"Memoria del DataFrame: {formatear_bytes(memoria['bytes_total'])} "
+                      f"({memoria['filas']} filas, {memoria['bytes_por_fila']} bytes/fila)")
+        
+        etapas = resultados.get('metricas', {}).get('etapas_segundos')
+        if etapas:
+            print("Tiempo por etapa: " + ", ".join(f"{nombre} {segundos:.2f}s" for nombre, segundos in etapas.items()))
+        
         if resultados['decisiones']:
             dec = resultados['decisiones']
             print(f"Dominios críticos (≤30 días): {dec['criticos_count']}")
             print(f"Dominios en advertencia (31-50 días): {dec['advertencia_count']}")
+            if 'notificaciones_count' in dec:
+                print(f"Alertas a notificar (nuevas, escaladas o recordatorio): {dec['notificaciones_count']}, "
+                      f"resueltas: {len(dec['resueltos'])}")
             print(f"Log generado: {'Sí' if resultados['log_generado'] else 'No'}")
-            print(f"Correo enviado: {'Sí' if resultados['correo_enviado'] else 'No'}")
+            if resultados['correo_encolado'] and not resultados['correo_enviado']:
+                print("Correo enviado: En cola (envío en segundo plano pendiente)")
+            else:
+                print(f"Correo enviado: {'Sí' if resultados['correo_enviado'] else 'No'}")
         
         if resultados['errores']:
             print("\nERRORES:")
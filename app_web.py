@@ -9,6 +9,9 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from typing import Dict, Tuple
+import hashlib
+import threading
 import sys
 import os
 
@@ -19,6 +22,7 @@ from agente_principal import AgentePrincipal
 from interfaz_pandas import InterfazPandas
 from config_email import obtener_config_email
 from traducciones import Traducciones
+from instantanea_monitoreo import InstantaneaMonitoreo
 
 # Configuración de la página
 st.set_page_config(
@@ -28,7 +32,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Configuración de tema
+# Segundos durante los que se reutilizan los datos WHOIS de una misma lista de dominios
+TTL_REPORTE = 15 * 60
+
+# Configuración de tema (el CSS se arma una vez por proceso)
+@st.cache_resource
 def set_custom_theme():
     """
     Define estilos personalizados modernos y revolucionarios
@@ -251,8 +259,53 @@ def set_custom_theme():
     
     return "", dark_theme
 
+@st.cache_resource
+def obtener_traducciones() -> Traducciones:
+    """Traducciones compartidas por todas las sesiones"""
+    return Traducciones()
+
+
+@st.cache_resource
+def obtener_agente(con_correo: bool) -> AgentePrincipal:
+    """
+    Agente principal compartido por todas las sesiones
+    
+    Se crea una vez por configuración de correo, así el logging, las
+    sesiones SMTP y los agentes no se reinician en cada interacción.
+    """
+    return AgentePrincipal(obtener_config_email('gmail') if con_correo else None)
+
+
+@st.cache_resource
+def bloqueo_monitoreo() -> threading.Lock:
+    """monitorear_dominios reinicia las métricas del agente: una ejecución a la vez entre sesiones"""
+    return threading.Lock()
+
+
+def huella_dominios(dominios) -> str:
+    """Clave de cache de una lista de dominios"""
+    return hashlib.sha256('\n'.join(dominios).encode('utf-8')).hexdigest()
+
+
+@st.cache_data(ttl=TTL_REPORTE, show_spinner=False)
+def leer_dominios(huella: str, _dominios: Tuple[str, ...], _agente: AgentePrincipal) -> Tuple[pd.DataFrame, Dict, datetime]:
+    """
+    Consulta los dominios una vez por huella y TTL_REPORTE
+    
+    Args:
+        huella: Clave de la lista de dominios (huella_dominios)
+        _dominios: Dominios a consultar (no forman parte de la clave)
+        _agente: Agente que hace la consulta (no forma parte de la clave)
+        
+    Returns:
+        Tupla (DataFrame, estadísticas, momento de la consulta) de la instantánea
+    """
+    instantanea = _agente.crear_instantanea(list(_dominios))
+    return instantanea.dataframe, instantanea.estadisticas, instantanea.timestamp
+
+
 # Inicializar sistema de traducciones
-traducciones = Traducciones()
+traducciones = obtener_traducciones()
 
 # Inicializar tema oscuro por defecto
 if 'theme' not in st.session_state:
@@ -322,16 +375,23 @@ destinatario = st.sidebar.text_input(traducciones.obtener_texto('correo_destinat
 # Botón principal
 st.sidebar.markdown("---")
 if st.sidebar.button(traducciones.obtener_texto('btn_iniciar_monitoreo', st.session_state.idioma), type="primary"):
-    # Inicializar agentes
-    config_email = obtener_config_email('gmail') if enviar_correo else None
-    agente_principal = AgentePrincipal(config_email)
+    # Agentes compartidos; la interfaz guarda los datos de esta sesión
+    agente_principal = obtener_agente(enviar_correo)
     interfaz = InterfazPandas(agente_principal)
     
     # Mostrar spinner durante el monitoreo
     with st.spinner(traducciones.obtener_texto('monitoreando_dominios', st.session_state.idioma)):
-        # Ejecutar monitoreo
+        # Ejecutar monitoreo: los datos WHOIS de la misma lista se reutilizan durante TTL_REPORTE
         destinatarios = [destinatario] if enviar_correo and destinatario else []
-        resultados = agente_principal.monitorear_dominios(dominios, destinatarios, forzar_envio_correo=enviar_correo)
+        with bloqueo_monitoreo():
+            df, estadisticas, momento = leer_dominios(huella_dominios(dominios), tuple(dominios), agente_principal)
+            instantanea = InstantaneaMonitoreo(dominios, df, estadisticas, momento)
+            resultados = agente_principal.monitorear_dominios(dominios, destinatarios, forzar_envio_correo=enviar_correo,
+                                                              instantanea=instantanea)
+        
+        # La interfaz lee la misma instantánea: cada dominio se consulta una sola vez
+        if resultados['instantanea'] is not None:
+            interfaz.cargar_instantanea(resultados['instantanea'])
         
         # Guardar resultados en session state
         st.session_state.resultados = resultados
@@ -394,8 +454,8 @@ if 'resultados' in st.session_state:
         </div>
         """, unsafe_allow_html=True)
     
-    # Obtener DataFrame actualizado
-    df_actual = interfaz.agente.obtener_reporte_pandas(dominios)
+    # Obtener DataFrame de la instantánea del monitoreo (sin nuevas consultas WHOIS)
+    df_actual = interfaz.df_actual.copy() if interfaz.df_actual is not None else pd.DataFrame()
     
     if not df_actual.empty:
         # Sección de tabla detallada
@@ -406,10 +466,14 @@ if 'resultados' in st.session_state:
         df_visual['fecha_expiracion'] = df_visual['fecha_expiracion'].dt.strftime('%Y-%m-%d')
         df_visual['fecha_consulta'] = df_visual['fecha_consulta'].dt.strftime('%Y-%m-%d %H:%M')
         
-        # Agregar estado de alerta
-        df_visual['estado_alerta'] = df_visual['dias_hasta_vencimiento'].apply(
-            lambda x: traducciones.obtener_texto('critico', st.session_state.idioma) if x <= 30 else (traducciones.obtener_texto('advertencia', st.session_state.idioma) if x <= 50 else traducciones.obtener_texto('normal', st.session_state.idioma))
-        )
+        # Agregar estado de alerta (clasificación vectorizada; se traducen solo las categorías)
+        clasificador = interfaz.agente.clasificador
+        etiquetas_nivel = {
+            'CRÍTICO': traducciones.obtener_texto('critico', st.session_state.idioma),
+            'ADVERTENCIA': traducciones.obtener_texto('advertencia', st.session_state.idioma),
+            'NORMAL': traducciones.obtener_texto('normal', st.session_state.idioma)
+        }
+        df_visual['estado_alerta'] = clasificador.clasificar(df_visual['dias_hasta_vencimiento'], etiquetas_nivel)
         
         # Renombrar columnas
         df_visual = df_visual.rename(columns={
@@ -449,20 +513,22 @@ if 'resultados' in st.session_state:
         
         with col2:
             # Gráfico de pastel - Estados de alerta
-            df_actual['estado_categoria'] = df_actual['dias_hasta_vencimiento'].apply(
-                lambda x: (traducciones.obtener_texto('critico', st.session_state.idioma) + ' (≤30 días)') if x <= 30 else ((traducciones.obtener_texto('advertencia', st.session_state.idioma) + ' (31-50 días)') if x <= 50 else (traducciones.obtener_texto('normal', st.session_state.idioma) + ' (>50 días)'))
-            )
+            rangos = clasificador.descripcion_rangos()
+            etiquetas_categoria = {nivel: f"{texto} ({rangos[nivel]})" for nivel, texto in etiquetas_nivel.items()}
+            df_actual['estado_categoria'] = clasificador.clasificar(df_actual['dias_hasta_vencimiento'], etiquetas_categoria)
             
             conteo_estados = df_actual['estado_categoria'].value_counts()
+            conteo_estados = conteo_estados[conteo_estados > 0]
             
             fig_pie = px.pie(
-                names=conteo_estados.index,
+                names=conteo_estados.index.astype(str),
                 values=conteo_estados.values,
                 title=traducciones.obtener_texto('titulo_pastel', st.session_state.idioma),
+                color=conteo_estados.index.astype(str),
                 color_discrete_map={
-                    traducciones.obtener_texto('critico', st.session_state.idioma) + ' (≤30 días)': 'red',
-                    traducciones.obtener_texto('advertencia', st.session_state.idioma) + ' (31-50 días)': 'orange',
-                    traducciones.obtener_texto('normal', st.session_state.idioma) + ' (>50 días)': 'green'
+                    etiquetas_categoria['CRÍTICO']: 'red',
+                    etiquetas_categoria['ADVERTENCIA']: 'orange',
+                    etiquetas_categoria['NORMAL']: 'green'
                 }
             )
             st.plotly_chart(fig_pie, use_container_width=True)
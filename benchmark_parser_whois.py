@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parseo WHOIS: parser completo de python-whois frente a parser_whois
+
+Parsea un corpus de respuestas WHOIS crudas con WhoisEntry.load (el parser
+que usa whois.whois) y con parsear_respuesta_whois (patrones por TLD con el
+parser completo como respaldo), y reporta tiempo de CPU por respuesta,
+respuestas por segundo con varios hilos, fracción resuelta por el camino
+rápido y diferencias de resultado entre ambos.
+
+El corpus es un directorio con un archivo <dominio>.txt por respuesta; sin
+--corpus se usan las respuestas de ejemplo de CORPUS_EJEMPLO. Con
+--capturar se descargan respuestas reales al directorio del corpus.
+
+Uso:
+    python benchmark_parser_whois.py
+    python benchmark_parser_whois.py --repeticiones 2000 --hilos 1 8
+    python benchmark_parser_whois.py --corpus corpus_whois --capturar google.com bbc.co.uk yandex.ru
+    python benchmark_parser_whois.py --corpus corpus_whois --salida parser.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+import pandas as pd
+from whois.parser import WhoisEntry
+
+from parser_whois import descargar_texto_whois, extraer_campos_rapido, parsear_respuesta_whois
+
+# Respuestas de ejemplo con el formato de cada registro (datos ficticios)
+CORPUS_EJEMPLO = {
+    # Registro "thin" (.com/.net): respuesta de Verisign seguida de la del registrador
+    'ejemplo.com': """   Domain Name: EJEMPLO.COM
+   Registry Domain ID: 2138514_DOMAIN_COM-VRSN
+   Registrar WHOIS Server: whois.registrador.test
+   Registrar URL: http://www.registrador.test
+   Updated Date: 2024-08-02T02:17:33Z
+   Creation Date: 1997-09-15T04:00:00Z
+   Registry Expiry Date: 2028-09-14T04:00:00Z
+   Registrar: Registrador Ejemplo, Inc.
+   Registrar IANA ID: 292
+   Registrar Abuse Contact Email: abuse@registrador.test
+   Registrar Abuse Contact Phone: +1.2086851750
+   Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited
+   Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+   Domain Status: clientUpdateProhibited https://icann.org/epp#clientUpdateProhibited
+   Name Server: NS1.EJEMPLO.COM
+   Name Server: NS2.EJEMPLO.COM
+   DNSSEC: unsigned
+   URL of the ICANN Whois Inaccuracy Complaint Form: https://www.icann.org/wicf/
+>>> Last update of whois database: 2024-10-01T12:00:00Z <<<
+
+NOTICE: The expiration date displayed in this record is the date the
+registrar's sponsorship of the domain name registration in the registry is
+currently set to expire.
+Domain Name: ejemplo.com
+Registry Domain ID: 2138514_DOMAIN_COM-VRSN
+Registrar WHOIS Server: whois.registrador.test
+Registrar URL: http://www.registrador.test
+Updated Date: 2024-08-02T02:17:33+0000
+Creation Date: 1997-09-15T07:00:00+0000
+Registrar Registration Expiration Date: 2028-09-13T07:00:00+0000
+Registrar: Registrador Ejemplo, Inc.
+Registrar IANA ID: 292
+Domain Status: clientUpdateProhibited (https://www.icann.org/epp#clientUpdateProhibited)
+Domain Status: clientTransferProhibited (https://www.icann.org/epp#clientTransferProhibited)
+Domain Status: clientDeleteProhibited (https://www.icann.org/epp#clientDeleteProhibited)
+Registrant Organization: Ejemplo LLC
+Registrant State/Province: CA
+Registrant Country: US
+Registrant Email: Select Request Email Form at https://domains.registrador.test/whois
+Admin Organization: Ejemplo LLC
+Admin State/Province: CA
+Admin Country: US
+Tech Organization: Ejemplo LLC
+Tech State/Province: CA
+Tech Country: US
+Name Server: ns1.ejemplo.com
+Name Server: ns2.ejemplo.com
+DNSSEC: unsigned
+""",
+    # Registro "thick" (.org y nuevos gTLD): una sola respuesta
+    'ejemplo.org': """Domain Name: ejemplo.org
+Registry Domain ID: 1ab2c3d4e5_DOMAIN_ORG-VRSN
+Registrar WHOIS Server: http://whois.registrador.test
+Registrar URL: http://www.registrador.test
+Updated Date: 2024-05-12T09:11:02Z
+Creation Date: 2001-05-14T20:37:01Z
+Registry Expiry Date: 2026-05-14T20:37:01Z
+Registrar: Registrador Ejemplo, Inc.
+Registrar IANA ID: 146
+Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited
+Registrant Organization: Fundación Ejemplo
+Registrant State/Province: Madrid
+Registrant Country: ES
+Name Server: ns1.ejemplo.org
+Name Server: ns2.ejemplo.org
+DNSSEC: unsigned
+""",
+    'ejemplo.co.uk': """
+    Domain name:
+        ejemplo.co.uk
+
+    Data validation:
+        Nominet was able to match the registrant's name and address against a 3rd party data source on 10-Dec-2012
+
+    Registrar:
+        Registrador Ejemplo Ltd [Tag = EJEMPLO]
+        URL: https://www.registrador.test
+
+    Relevant dates:
+        Registered on: 14-Feb-1999
+        Expiry date:  14-Feb-2027
+        Last updated:  13-Jan-2024
+
+    Registration status:
+        Registered until expiry date.
+
+    Name servers:
+        ns1.ejemplo.co.uk
+        ns2.ejemplo.co.uk
+
+    WHOIS lookup made at 12:00:00 01-Oct-2024
+""",
+    'ejemplo.ru': """% TCI Whois Service. Terms of use:
+% https://tcinet.ru/documents/whois_ru_rf.pdf (in Russian)
+
+domain:        EJEMPLO.RU
+nserver:       ns1.ejemplo.ru.
+nserver:       ns2.ejemplo.ru.
+state:         REGISTERED, DELEGATED, VERIFIED
+org:           EJEMPLO, LLC.
+taxpayer-id:   7736207543
+registrar:     RU-CENTER-RU
+admin-contact: https://www.nic.ru/whois
+created:       1997-09-23T09:45:07Z
+paid-till:     2025-09-30T21:00:00Z
+free-date:     2025-11-01
+source:        TCI
+
+Last updated on 2024-10-01T12:00:00Z
+""",
+    'ejemplo.fr': """%% This is the AFNIC Whois server.
+
+domain:                        ejemplo.fr
+status:                        ACTIVE
+eppstatus:                     serverTransferProhibited
+hold:                          NO
+holder-c:                      EJ123-FRNIC
+admin-c:                       EJ124-FRNIC
+tech-c:                        EJ125-FRNIC
+registrar:                     REGISTRADOR EJEMPLO
+Expiry Date:                   2026-12-01T10:00:00Z
+created:                       2000-07-26T22:00:00Z
+last-update:                   2024-11-27T09:12:01Z
+source:                        FRNIC
+
+nserver:                       ns1.ejemplo.fr
+source:                        FRNIC
+""",
+    'ejemplo.com.br': """% Copyright (c) Nic.br
+
+domain:      ejemplo.com.br
+owner:       Ejemplo Brasil Internet Ltda
+country:     BR
+owner-c:     EJB
+tech-c:      EJB
+nserver:     ns1.ejemplo.com
+nsstat:      20241001 AA
+nslastaa:    20241001
+created:     19990518 #142485
+changed:     20240411
+expires:     20270519
+status:      published
+""",
+    'ejemplo.jp': """[ JPRS database provides information on network administration. ]
+
+Domain Information:
+a. [Domain Name]                EJEMPLO.JP
+g. [Organization]               Ejemplo Japan G.K.
+p. [Name Server]                ns1.ejemplo.jp
+
+[State]                         Connected (2027/05/31)
+[Registered Date]               2005/05/30
+[Connected Date]                2005/05/30
+[Last Update]                   2024/06/01 01:05:04 (JST)
+[Expires on]                    2027/05/31
+""",
+    'ejemplo.cn': """Domain Name: ejemplo.cn
+ROID: 20030311s10001s00033735-cn
+Domain Status: clientDeleteProhibited
+Domain Status: serverDeleteProhibited
+Registrant: Ejemplo Technology Co., Ltd.
+Sponsoring Registrar: Registrador Ejemplo Co., Ltd.
+Name Server: ns1.ejemplo.cn
+Registration Time: 2003-03-17 12:20:05
+Expiration Time: 2027-03-17 12:48:36
+DNSSEC: unsigned
+""",
+    'ejemplo.it': """Domain:             ejemplo.it
+Status:             ok
+Signed:             no
+Created:            1999-12-10 00:00:00
+Last Update:        2024-05-07 00:52:11
+Expire Date:        2026-04-21
+
+Registrant
+  Organization:     Ejemplo Italia S.r.l.
+
+Registrar
+  Organization:     Registrador Ejemplo S.p.A.
+  Name:             EJEMPLO-REG
+  Web:              https://www.registrador.test
+
+Nameservers
+  ns1.ejemplo.it
+""",
+    'ejemplo.pl': """DOMAIN NAME:           ejemplo.pl
+registrant type:       organization
+nameservers:           ns1.ejemplo.pl.
+created:               2002.09.19 13:00:00
+last modified:         2024.08.19 09:02:51
+renewal date:          2026.09.18 14:00:00
+
+no option
+
+dnssec:                Unsigned
+
+REGISTRAR:
+Registrador Ejemplo sp. z o.o.
+ul. Ejemplo 1
+00-001 Warszawa
+""",
+    # Registros sin fecha de expiración pública: siempre van al parser completo
+    'ejemplo.de': """Domain: ejemplo.de
+Nserver: ns1.ejemplo.de
+Status: connect
+Changed: 2024-03-01T10:21:34+01:00
+""",
+    'ejemplo.eu': """Domain: ejemplo.eu
+Script: LATIN
+
+Registrar:
+        Name: Registrador Ejemplo
+        Website: https://www.registrador.test
+
+Name servers:
+        ns1.ejemplo.eu
+""",
+}
+
+
+def cargar_corpus(directorio: str) -> Dict[str, str]:
+    """
+    Lee un corpus de respuestas WHOIS (<dominio>.txt)
+
+    Args:
+        directorio: Directorio del corpus
+
+    Returns:
+        Diccionario dominio -> respuesta cruda
+    """
+    corpus = {}
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.endswith('.txt'):
+            with open(os.path.join(directorio, nombre), encoding='utf-8', errors='replace') as archivo:
+                corpus[nombre[:-4]] = archivo.read()
+    return corpus
+
+
+def capturar_corpus(dominios: List[str], directorio: str) -> int:
+    """
+    Descarga las respuestas WHOIS de los dominios y las guarda en el corpus
+
+    Returns:
+        Cantidad de respuestas guardadas
+    """
+    os.makedirs(directorio, exist_ok=True)
+    guardadas = 0
+    for dominio in dominios:
+        try:
+            texto = descargar_texto_whois(dominio)
+        except Exception as e:
+            print(f"  ✗ {dominio}: {str(e)}")
+            continue
+        with open(os.path.join(directorio, f'{dominio}.txt'), 'w', encoding='utf-8') as archivo:
+            archivo.write(texto)
+        guardadas += 1
+        print(f"  ✔ {dominio}: {len(texto)} bytes")
+    return guardadas
+
+
+def parser_completo(dominio: str, texto: str) -> Tuple:
+    """Parseo de whois.whois(): todas las expresiones de la clase del TLD"""
+    entrada = WhoisEntry.load(dominio, texto)
+    return entrada.expiration_date, entrada.registrar, entrada.status
+
+
+def _intentar(parser: Callable[[str, str], Tuple], dominio: str, texto: str):
+    try:
+        return parser(dominio, texto)
+    except Exception:
+        return None
+
+
+def medir(nombre: str, parser: Callable[[str, str], Tuple], trabajos: List[Tuple[str, str]], hilos: int) -> Dict:
+    """
+    Parsea todas las respuestas y mide tiempo de pared y de CPU
+
+    Args:
+        nombre: Nombre del parser para el reporte
+        parser: Función (dominio, texto) -> campos
+        trabajos: Lista de (dominio, texto) a parsear
+        hilos: Hilos que parsean en paralelo (1 = secuencial)
+
+    Returns:
+        Fila de resultados
+    """
+    inicio_cpu = time.process_time()
+    inicio = time.perf_counter()
+    if hilos > 1:
+        with ThreadPoolExecutor(max_workers=hilos) as executor:
+            list(executor.map(lambda trabajo: _intentar(parser, *trabajo), trabajos, chunksize=64))
+    else:
+        for dominio, texto in trabajos:
+            _intentar(parser, dominio, texto)
+    duracion = time.perf_counter() - inicio
+    cpu = time.process_time() - inicio_cpu
+    return {
+        'parser': nombre,
+        'hilos': hilos,
+        'respuestas': len(trabajos),
+        'segundos': round(duracion, 3),
+        'por_segundo': round(len(trabajos) / duracion, 1) if duracion > 0 else 0.0,
+        'cpu_us_por_respuesta': round(cpu / len(trabajos) * 1e6, 1) if trabajos else 0.0
+    }
+
+
+def _fecha_utc(valor):
+    if isinstance(valor, list):
+        valor = valor[0] if valor else None
+    if not isinstance(valor, datetime):
+        return valor
+    return valor.replace(tzinfo=timezone.utc) if valor.tzinfo is None else valor.astimezone(timezone.utc)
+
+
+def _conjunto(valor):
+    if valor is None:
+        return set()
+    return {str(v).lower() for v in (valor if isinstance(valor, list) else [valor])}
+
+
+def comparar(corpus: Dict[str, str]) -> Tuple[Dict, List[Dict]]:
+    """
+    Compara, respuesta por respuesta, el camino rápido con el parser completo
+
+    Returns:
+        Tupla (resumen, diferencias) donde diferencias lista los campos que no coinciden
+    """
+    rapidas = 0
+    diferencias = []
+    for dominio, texto in corpus.items():
+        campos = extraer_campos_rapido(dominio, texto)
+        if campos is None:
+            continue
+        rapidas += 1
+        esperado = _intentar(parser_completo, dominio, texto)
+        if esperado is None:
+            diferencias.append({'dominio': dominio, 'campo': 'todos', 'rapido': campos, 'completo': None})
+            continue
+        pares = {
+            'expiracion': (_fecha_utc(campos[0]), _fecha_utc(esperado[0])),
+            'registrar': (_conjunto(campos[1]), _conjunto(esperado[1])),
+            'estado': (_conjunto(campos[2]), _conjunto(esperado[2]))
+        }
+        for campo, (rapido, completo) in pares.items():
+            if rapido != completo:
+                diferencias.append({'dominio': dominio, 'campo': campo, 'rapido': rapido, 'completo': completo})
+    resumen = {
+        'respuestas': len(corpus),
+        'camino_rapido': rapidas,
+        'respaldo_completo': len(corpus) - rapidas,
+        'tasa_camino_rapido': round(rapidas / len(corpus), 4) if corpus else 0.0,
+        'diferencias': len(diferencias)
+    }
+    return resumen, diferencias
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark del parseo WHOIS: python-whois frente a parser_whois')
+    parser.add_argument('--corpus', help='Directorio con respuestas WHOIS crudas (<dominio>.txt)')
+    parser.add_argument('--capturar', nargs='+', metavar='DOMINIO',
+                        help='Descargar las respuestas de estos dominios al directorio de --corpus')
+    parser.add_argument('--repeticiones', type=int, default=500,
+                        help='Veces que se parsea cada respuesta del corpus (por defecto 500)')
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 8],
+                        help='Cantidades de hilos a medir (por defecto: 1 8)')
+    parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+
+    args = parser.parse_args()
+    # python-whois registra cada fecha que no reconoce; no interesa durante la medición
+    logging.disable(logging.ERROR)
+
+    if args.capturar:
+        if not args.corpus:
+            parser.error('--capturar requiere --corpus')
+        print(f"Capturando {len(args.capturar)} respuestas en {args.corpus}...")
+        capturar_corpus(args.capturar, args.corpus)
+
+    corpus = cargar_corpus(args.corpus) if args.corpus else CORPUS_EJEMPLO
+    if not corpus:
+        parser.error(f'El corpus {args.corpus} no tiene archivos .txt')
+
+    resumen, diferencias = comparar(corpus)
+    print(f"Corpus: {resumen['respuestas']} respuestas, {resumen['camino_rapido']} por el camino rápido "
+          f"({resumen['tasa_camino_rapido']:.0%}), {resumen['respaldo_completo']} con el parser completo")
+    for diferencia in diferencias:
+        print(f"  ≠ {diferencia['dominio']} [{diferencia['campo']}]: rápido {diferencia['rapido']!r} "
+              f"/ completo {diferencia['completo']!r}")
+
+    trabajos = list(corpus.items()) * args.repeticiones
+    filas = []
+    for hilos in args.hilos:
+        for nombre, funcion in (('completo', parser_completo), ('rapido', parsear_respuesta_whois)):
+            fila = medir(nombre, funcion, trabajos, hilos)
+            filas.append(fila)
+            print(f"[{nombre:8}] {hilos:>3} hilos: {fila['segundos']:.2f}s, {fila['por_segundo']}/s, "
+                  f"{fila['cpu_us_por_respuesta']}µs de CPU por respuesta", flush=True)
+
+    print("\n" + "=" * 80)
+    print("RESULTADOS DEL BENCHMARK DE PARSEO WHOIS")
+    print("=" * 80)
+    tabla = pd.DataFrame(filas)
+    completo = tabla[tabla['parser'] == 'completo'].set_index('hilos')['cpu_us_por_respuesta']
+    tabla['aceleracion'] = (tabla['hilos'].map(completo) / tabla['cpu_us_por_respuesta']).round(1)
+    print(tabla.to_string(index=False))
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'fecha': datetime.now().isoformat(),
+                'parametros': vars(args),
+                'corpus': resumen,
+                'diferencias': diferencias,
+                'resultados': tabla.to_dict('records')
+            }, archivo, indent=2, ensure_ascii=False, default=str)
+        print(f"\n📁 Resultados guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Benchmark hermético de red: servidores WHOIS, TLS y SMTP falsos en local
+
+Levanta en un proceso aparte servidores locales que imitan un registro WHOIS
+(puerto 43), un sitio HTTPS y un servidor SMTP con STARTTLS, con latencia,
+jitter, tasa de error y límite de conexiones por segundo configurables, y
+mide AgenteLector.leer_dominios, SSLChecker.escanear_dominios y
+AgenteDecisor.enviar_correo contra ellos sin tocar la red real.
+
+Uso:
+    python benchmark_red.py --dominios 100 1000 10000
+    python benchmark_red.py --dominios 1000 --latencia 0.05 --jitter 0.02 --tasa-error 0.01
+    python benchmark_red.py --dominios 5000 --con-cache --salida benchmark.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import ssl
+import subprocess
+import tempfile
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from agente_lector import AgenteLector
+from agente_decisor import AgenteDecisor
+from envio_correo import EnviadorSMTP
+from ssl_checker import SSLChecker
+from whois_asincrono import ClienteWhoisAsincrono
+from resolucion_dns import ResolvedorDNS
+from cache_whois import CacheWhois
+from cache_ssl import CacheCertificados
+from planificador_whois import PlanificadorWhois
+
+SERVIDOR_WHOIS = 'whois.bench.test'
+SUFIJO_DOMINIOS = 'bench.test'
+ETAPAS = ('whois', 'ssl', 'smtp')
+
+
+class PerfilRed:
+    """
+    Comportamiento de un servidor falso: latencia, jitter, errores y limitación
+    """
+
+    def __init__(self, latencia: float = 0.02, jitter: float = 0.01, tasa_error: float = 0.0,
+                 limite_por_segundo: int = 0, semilla: int = 0):
+        """
+        Args:
+            latencia: Demora media por petición en segundos
+            jitter: Variación máxima (uniforme, +/-) sobre la latencia
+            tasa_error: Fracción de peticiones que fallan
+            limite_por_segundo: Peticiones atendidas por segundo (0 = sin límite);
+                                el resto se rechaza como lo haría un registro
+            semilla: Semilla del generador aleatorio
+        """
+        self.latencia = latencia
+        self.jitter = jitter
+        self.tasa_error = tasa_error
+        self.limite_por_segundo = limite_por_segundo
+        self.semilla = semilla
+        self._aleatorio = random.Random(semilla)
+        self._segundo_actual = 0
+        self._atendidas = 0
+
+    def demora(self) -> float:
+        """Segundos que debe tardar la respuesta actual"""
+        return max(0.0, self.latencia + self._aleatorio.uniform(-self.jitter, self.jitter))
+
+    def falla(self) -> bool:
+        """Indica si la petición actual debe fallar"""
+        return self._aleatorio.random() < self.tasa_error
+
+    def limitado(self) -> bool:
+        """Cuenta la petición y dice si supera el límite por segundo"""
+        if not self.limite_por_segundo:
+            return False
+        segundo = int(time.monotonic())
+        if segundo != self._segundo_actual:
+            self._segundo_actual = segundo
+            self._atendidas = 0
+        self._atendidas += 1
+        return self._atendidas > self.limite_por_segundo
+
+
+def nombres_dominios(cantidad: int) -> List[str]:
+    """Genera nombres de dominio sintéticos bajo SUFIJO_DOMINIOS"""
+    return [f"d{i:06d}.{SUFIJO_DOMINIOS}" for i in range(cantidad)]
+
+
+def respuesta_whois(dominio: str) -> str:
+    """
+    Arma una respuesta WHOIS estilo registro gTLD con datos deterministas
+
+    La fecha de expiración depende del nombre, así que una parte de los
+    dominios cae en la ventana crítica y de advertencia.
+    """
+    semilla = zlib.crc32(dominio.encode('utf-8'))
+    expiracion = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(days=semilla % 730 + 1)
+    return (
+        f"Domain Name: {dominio.upper()}\r\n"
+        f"Registry Domain ID: {semilla}_DOMAIN_BENCH\r\n"
+        f"Creation Date: 2015-01-01T00:00:00Z\r\n"
+        f"Registry Expiry Date: {expiracion:%Y-%m-%dT%H:%M:%SZ}\r\n"
+        f"Registrar: Registrador Falso {semilla % 20}\r\n"
+        f"Domain Status: clientTransferProhibited https://icann.org/epp#clientTransferProhibited\r\n"
+        f"Domain Status: clientDeleteProhibited https://icann.org/epp#clientDeleteProhibited\r\n"
+        f">>> Last update of WHOIS database: {datetime.now(timezone.utc):%Y-%m-%dT%H:%M:%SZ} <<<\r\n"
+    )
+
+
+async def _cerrar(writer: asyncio.StreamWriter):
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (ConnectionError, OSError, ssl.SSLError):
+        pass
+
+
+async def _atender_whois(reader, writer, perfil: PerfilRed):
+    try:
+        consulta = (await reader.readline()).decode('utf-8', errors='replace').strip()
+        limitado = perfil.limitado()
+        await asyncio.sleep(perfil.demora())
+        if limitado:
+            writer.write(b"%% Query rate limit exceeded. Try again later.\r\n")
+        elif perfil.falla():
+            writer.write(f'No match for "{consulta.upper()}".\r\n'.encode('utf-8'))
+        else:
+            writer.write(respuesta_whois(consulta).encode('utf-8'))
+        await writer.drain()
+    except (ConnectionError, OSError):
+        pass
+    finally:
+        await _cerrar(writer)
+
+
+class _ProtocoloTLS(asyncio.Protocol):
+    """
+    Servidor TLS que retrasa el handshake sin consumir el ClientHello
+
+    Con streams el ClientHello quedaría en el buffer del StreamReader durante
+    la demora, así que se pausa la lectura apenas se acepta la conexión.
+    """
+
+    def __init__(self, perfil: PerfilRed, contexto: ssl.SSLContext):
+        self.perfil = perfil
+        self.contexto = contexto
+        self.transport = None
+        self.tarea = None
+
+    def connection_made(self, transport):
+        transport.pause_reading()
+        self.transport = transport
+        self.tarea = asyncio.get_running_loop().create_task(self._negociar())
+
+    async def _negociar(self):
+        limitado = self.perfil.limitado()
+        await asyncio.sleep(self.perfil.demora())
+        if limitado or self.perfil.falla():
+            self.transport.close()
+            return
+        try:
+            self.transport = await asyncio.get_running_loop().start_tls(
+                self.transport, self, self.contexto, server_side=True)
+        except (ConnectionError, OSError, ssl.SSLError):
+            self.transport.close()
+
+
+async def _atender_smtp(reader, writer, perfil: PerfilRed, contexto):
+    def responder(texto: str):
+        writer.write(f"{texto}\r\n".encode('utf-8'))
+
+    try:
+        if perfil.limitado():
+            responder("421 bench.test Demasiadas conexiones, intente más tarde")
+            await writer.drain()
+            return
+        responder("220 bench.test ESMTP benchmark")
+        await writer.drain()
+        cifrado = False
+
+        while True:
+            linea = await reader.readline()
+            if not linea:
+                return
+            comando = linea.decode('utf-8', errors='replace').strip()
+            verbo = comando.split(' ', 1)[0].upper()
+
+            if verbo in ('EHLO', 'HELO'):
+                extension = '250-AUTH PLAIN LOGIN' if cifrado else '250-STARTTLS'
+                writer.write(f"250-bench.test\r\n{extension}\r\n250 SIZE 10485760\r\n".encode('ascii'))
+            elif verbo == 'STARTTLS':
+                responder("220 Listo para TLS")
+                await writer.drain()
+                await writer.start_tls(contexto)
+                cifrado = True
+                continue
+            elif verbo == 'AUTH':
+                responder("235 Autenticado")
+            elif verbo == 'DATA':
+                responder("354 Fin con <CRLF>.<CRLF>")
+                await writer.drain()
+                while True:
+                    linea = await reader.readline()
+                    if not linea or linea.rstrip(b'\r\n') == b'.':
+                        break
+                await asyncio.sleep(perfil.demora())
+                responder("451 Error temporal" if perfil.falla() else "250 Encolado")
+            elif verbo == 'QUIT':
+                responder("221 Adios")
+                await writer.drain()
+                return
+            else:
+                responder("250 OK")
+            await writer.drain()
+    except (ConnectionError, OSError, ssl.SSLError):
+        pass
+    finally:
+        await _cerrar(writer)
+
+
+async def _servir(perfiles: Dict[str, PerfilRed], ruta_cert: Optional[str], ruta_clave: Optional[str], cola):
+    contexto = None
+    if ruta_cert:
+        contexto = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        contexto.load_cert_chain(ruta_cert, ruta_clave)
+
+    servidores = {
+        'whois': await asyncio.start_server(lambda r, w: _atender_whois(r, w, perfiles['whois']),
+                                            '127.0.0.1', 0, backlog=4096)
+    }
+    if contexto is not None:
+        servidores['tls'] = await asyncio.get_running_loop().create_server(
+            lambda: _ProtocoloTLS(perfiles['tls'], contexto), '127.0.0.1', 0, backlog=4096)
+        servidores['smtp'] = await asyncio.start_server(lambda r, w: _atender_smtp(r, w, perfiles['smtp'], contexto),
+                                                        '127.0.0.1', 0, backlog=1024)
+
+    cola.put({nombre: servidor.sockets[0].getsockname()[1] for nombre, servidor in servidores.items()})
+    await asyncio.Event().wait()
+
+
+def _proceso_servidores(perfiles, ruta_cert, ruta_clave, cola):
+    try:
+        asyncio.run(_servir(perfiles, ruta_cert, ruta_clave, cola))
+    except KeyboardInterrupt:
+        pass
+
+
+class ServidoresFalsos:
+    """
+    Levanta los servidores falsos en un proceso hijo (no comparten GIL ni
+    memoria con el código medido) y expone sus puertos
+    """
+
+    def __init__(self, perfil: PerfilRed, directorio: str):
+        """
+        Args:
+            perfil: Comportamiento común de los tres servidores
+            directorio: Carpeta temporal para el certificado autofirmado
+        """
+        self.logger = logging.getLogger('ServidoresFalsos')
+        self.logger.setLevel(logging.INFO)
+        self.perfil = perfil
+        self.ruta_cert, self.ruta_clave = self._generar_certificado(directorio)
+        self.puertos: Dict[str, int] = {}
+        self._proceso = None
+
+    def _generar_certificado(self, directorio: str):
+        """Genera un certificado autofirmado *.bench.test con openssl (None si no está disponible)"""
+        if shutil.which('openssl') is None:
+            self.logger.warning("openssl no está disponible: se omiten las etapas TLS y SMTP")
+            return None, None
+        ruta_cert = os.path.join(directorio, 'bench_cert.pem')
+        ruta_clave = os.path.join(directorio, 'bench_clave.pem')
+        resultado = subprocess.run(
+            ['openssl', 'req', '-x509', '-newkey', 'ec', '-pkeyopt', 'ec_paramgen_curve:prime256v1',
+             '-nodes', '-keyout', ruta_clave, '-out', ruta_cert, '-days', '90',
+             '-subj', f'/CN=*.{SUFIJO_DOMINIOS}', '-addext', f'subjectAltName=DNS:*.{SUFIJO_DOMINIOS}'],
+            capture_output=True
+        )
+        if resultado.returncode != 0:
+            self.logger.warning(f"No se pudo generar el certificado: {resultado.stderr.decode(errors='replace')}")
+            return None, None
+        return ruta_cert, ruta_clave
+
+    def __enter__(self) -> 'ServidoresFalsos':
+        perfiles = {nombre: PerfilRed(self.perfil.latencia, self.perfil.jitter, self.perfil.tasa_error,
+                                      self.perfil.limite_por_segundo, self.perfil.semilla + i)
+                    for i, nombre in enumerate(('whois', 'tls', 'smtp'))}
+        cola = multiprocessing.Queue()
+        self._proceso = multiprocessing.Process(target=_proceso_servidores, daemon=True,
+                                                args=(perfiles, self.ruta_cert, self.ruta_clave, cola))
+        self._proceso.start()
+        self.puertos = cola.get(timeout=30)
+        self.logger.info(f"Servidores falsos escuchando en {self.puertos}")
+        return self
+
+    def __exit__(self, *exc):
+        if self._proceso is not None:
+            self._proceso.terminate()
+            self._proceso.join(5)
+
+
+class ClienteWhoisMedido(ClienteWhoisAsincrono):
+    """ClienteWhoisAsincrono que registra la latencia de cada dominio"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencias: List[float] = []
+
+    async def obtener_info_dominio(self, dominio: str) -> Optional[Dict]:
+        inicio = time.perf_counter()
+        try:
+            return await super().obtener_info_dominio(dominio)
+        finally:
+            self.latencias.append(time.perf_counter() - inicio)
+
+
+class SSLCheckerMedido(SSLChecker):
+    """SSLChecker que registra la latencia de cada verificación (incluidas las servidas por la cache)"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencias: List[float] = []
+
+    def _inspeccionar_certificado(self, dominio: str, puerto: int, timeout: float, usar_cache: bool = True) -> Dict:
+        inicio = time.perf_counter()
+        try:
+            return super()._inspeccionar_certificado(dominio, puerto, timeout, usar_cache)
+        finally:
+            self.latencias.append(time.perf_counter() - inicio)
+
+
+def memoria_pico_mb() -> float:
+    """Pico de memoria residente del proceso (ru_maxrss está en KB en Linux)"""
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def resumir(etapa: str, cantidad: int, pasada: str, duracion: float,
+            latencias: List[float], exitosos: int) -> Dict:
+    """
+    Arma la fila de resultados de una etapa
+
+    Args:
+        etapa: whois, ssl o smtp
+        cantidad: Dominios (o correos) procesados
+        pasada: 'unica', 'fria' o 'caliente'
+        duracion: Segundos de la etapa completa
+        latencias: Latencias medidas en segundos (WHOIS: solo consultas de red;
+                   SSL: cada verificación; SMTP: cada correo)
+        exitosos: Elementos procesados sin error
+
+    Returns:
+        Diccionario con rendimiento, percentiles y memoria
+    """
+    p50, p99 = (np.percentile(latencias, [50, 99]) * 1000).round(1) if latencias else (None, None)
+    return {
+        'etapa': etapa,
+        'cantidad': cantidad,
+        'pasada': pasada,
+        'segundos': round(duracion, 3),
+        'por_segundo': round(cantidad / duracion, 1) if duracion > 0 else 0.0,
+        'mediciones': len(latencias),
+        'p50_ms': None if p50 is None else float(p50),
+        'p99_ms': None if p99 is None else float(p99),
+        'exitosos': exitosos,
+        'errores': cantidad - exitosos,
+        'rss_pico_mb': memoria_pico_mb()
+    }
+
+
+def medir_whois(dominios: List[str], puerto: int, args, cache: Optional[CacheWhois], pasada: str):
+    """Mide AgenteLector.leer_dominios con el backend asíncrono contra el WHOIS falso"""
+    planificador = None
+    if args.planificador_tasa:
+        planificador = PlanificadorWhois(limites={
+            SERVIDOR_WHOIS: (args.planificador_tasa, max(1, int(args.planificador_tasa)), args.workers_whois)
+        })
+    cliente = ClienteWhoisMedido(servidor_raiz=SERVIDOR_WHOIS, timeout=args.timeout,
+                                 max_concurrencia=args.workers_whois,
+                                 direcciones={SERVIDOR_WHOIS: ('127.0.0.1', puerto)})
+    lector = AgenteLector(backend=cliente, planificador=planificador, cache=cache)
+
+    inicio = time.perf_counter()
+    df = lector.leer_dominios(dominios, max_workers=args.workers_whois)
+    duracion = time.perf_counter() - inicio
+    return resumir('whois', len(dominios), pasada, duracion, cliente.latencias, len(df)), df
+
+
+def medir_ssl(dominios: List[str], puerto: int, ruta_cert: str, args,
+              cache: Optional[CacheCertificados], pasada: str) -> Dict:
+    """Mide SSLChecker.escanear_dominios contra el servidor TLS falso"""
+    resolvedor = ResolvedorDNS(resolver=lambda dominio: ['127.0.0.1'])
+    checker = SSLCheckerMedido(max_workers=args.workers_ssl, timeout=args.timeout,
+                               cache=cache, resolvedor=resolvedor)
+    checker.contexto.load_verify_locations(ruta_cert)
+
+    inicio = time.perf_counter()
+    resultados = checker.escanear_dominios(dominios, puerto=puerto)
+    duracion = time.perf_counter() - inicio
+    exitosos = sum(1 for resultado in resultados if resultado['error'] is None)
+    return resumir('ssl', len(dominios), pasada, duracion, checker.latencias, exitosos)
+
+
+def medir_smtp(df: pd.DataFrame, puerto: int, args) -> Dict:
+    """
+    Mide AgenteDecisor.enviar_correo contra el SMTP falso con el reporte del WHOIS
+
+    Con --mensajes-por-conexion 1 cada correo abre su propia sesión (STARTTLS
+    y LOGIN incluidos), como antes de reutilizar las sesiones SMTP.
+    """
+    config_email = {
+        'smtp_server': '127.0.0.1',
+        'smtp_port': puerto,
+        'usuario': 'benchmark',
+        'contraseña': 'benchmark',
+        'remite': f'benchmark@{SUFIJO_DOMINIOS}'
+    }
+    enviador = EnviadorSMTP(config_email, max_conexiones=1, mensajes_por_conexion=args.mensajes_por_conexion,
+                            timeout=args.timeout)
+    decisor = AgenteDecisor(config_email, enviador=enviador)
+    decisiones = decisor.evaluar_dominios(df)
+
+    latencias = []
+    exitosos = 0
+    inicio = time.perf_counter()
+    for _ in range(args.correos):
+        inicio_correo = time.perf_counter()
+        exitosos += decisor.enviar_correo(decisiones, [f'alertas@{SUFIJO_DOMINIOS}'])
+        latencias.append(time.perf_counter() - inicio_correo)
+    duracion = time.perf_counter() - inicio
+    decisor.cerrar()
+
+    fila = resumir('smtp', args.correos, 'unica', duracion, latencias, exitosos)
+    fila['conexiones_smtp'] = enviador.estadisticas()['conexiones_abiertas']
+    return fila
+
+
+def ejecutar_benchmark(args) -> List[Dict]:
+    """
+    Ejecuta todas las etapas para cada tamaño de lista
+
+    Returns:
+        Lista de filas de resultados (ver resumir)
+    """
+    filas = []
+    pasadas = ('fria', 'caliente') if args.con_cache else ('unica',)
+    perfil = PerfilRed(args.latencia, args.jitter, args.tasa_error, args.limite_por_segundo, args.semilla)
+
+    with tempfile.TemporaryDirectory(prefix='benchmark_red_') as directorio:
+        with ServidoresFalsos(perfil, directorio) as servidores:
+            for cantidad in args.dominios:
+                dominios = nombres_dominios(cantidad)
+                cache_whois = CacheWhois(os.path.join(directorio, f'whois_{cantidad}.db')) if args.con_cache else None
+                cache_ssl = CacheCertificados(os.path.join(directorio, f'ssl_{cantidad}.db')) if args.con_cache else None
+                df = None
+
+                for pasada in pasadas:
+                    if 'whois' in args.etapas:
+                        fila, df = medir_whois(dominios, servidores.puertos['whois'], args, cache_whois, pasada)
+                        filas.append(fila)
+                        print(formatear_fila(fila), flush=True)
+                    if 'ssl' in args.etapas and 'tls' in servidores.puertos:
+                        fila = medir_ssl(dominios, servidores.puertos['tls'], servidores.ruta_cert,
+                                         args, cache_ssl, pasada)
+                        filas.append(fila)
+                        print(formatear_fila(fila), flush=True)
+
+                if 'smtp' in args.etapas and 'smtp' in servidores.puertos and args.correos > 0:
+                    if df is None:
+                        df = pd.DataFrame({'dominio': dominios, 'dias_hasta_vencimiento': [10] * cantidad,
+                                           'fecha_expiracion': [datetime.now() + timedelta(days=10)] * cantidad})
+                    fila = medir_smtp(df, servidores.puertos['smtp'], args)
+                    fila['cantidad_dominios'] = cantidad
+                    filas.append(fila)
+                    print(formatear_fila(fila), flush=True)
+
+                for cache in (cache_whois, cache_ssl):
+                    if cache is not None:
+                        cache.cerrar()
+    return filas
+
+
+def formatear_fila(fila: Dict) -> str:
+    """Línea de progreso legible para una fila de resultados"""
+    p50 = '-' if fila['p50_ms'] is None else f"{fila['p50_ms']}ms"
+    p99 = '-' if fila['p99_ms'] is None else f"{fila['p99_ms']}ms"
+    return (f"[{fila['etapa']:5}] {fila['cantidad']:>7} ({fila['pasada']}): {fila['segundos']:.2f}s, "
+            f"{fila['por_segundo']}/s, p50 {p50}, p99 {p99}, errores {fila['errores']}, "
+            f"RSS pico {fila['rss_pico_mb']} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark hermético de WHOIS, SSL y SMTP con servidores locales')
+    parser.add_argument('--dominios', type=int, nargs='+', default=[100, 1000],
+                        help='Tamaños de lista a medir (por defecto: 100 1000)')
+    parser.add_argument('--etapas', nargs='+', choices=ETAPAS, default=list(ETAPAS),
+                        help='Etapas a medir (por defecto: todas)')
+    parser.add_argument('--workers-whois', type=int, default=100, help='Consultas WHOIS simultáneas')
+    parser.add_argument('--workers-ssl', type=int, default=20, help='Handshakes TLS simultáneos')
+    parser.add_argument('--latencia', type=float, default=0.02, help='Latencia media de los servidores (segundos)')
+    parser.add_argument('--jitter', type=float, default=0.01, help='Variación de la latencia (segundos, +/-)')
+    parser.add_argument('--tasa-error', type=float, default=0.0, help='Fracción de peticiones que fallan (0-1)')
+    parser.add_argument('--limite-por-segundo', type=int, default=0,
+                        help='Peticiones por segundo que atiende cada servidor (0 = sin límite)')
+    parser.add_argument('--planificador-tasa', type=float, default=0,
+                        help='Consultas por segundo permitidas por PlanificadorWhois (0 = sin planificador)')
+    parser.add_argument('--con-cache', action='store_true',
+                        help='Usar CacheWhois y CacheCertificados y medir pasada fría y caliente')
+    parser.add_argument('--correos', type=int, default=20, help='Correos a enviar en la etapa SMTP')
+    parser.add_argument('--mensajes-por-conexion', type=int, default=100,
+                        help='Correos por sesión SMTP antes de reconectar (1 = una sesión por correo)')
+    parser.add_argument('--timeout', type=float, default=5, help='Timeout por petición (segundos)')
+    parser.add_argument('--semilla', type=int, default=0, help='Semilla para latencias y errores')
+    parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Mostrar el log por dominio de los agentes')
+
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if not args.verbose:
+        # El log por dominio de los agentes distorsiona la medición
+        logging.disable(logging.ERROR)
+
+    filas = ejecutar_benchmark(args)
+
+    print("\n" + "=" * 80)
+    print("RESULTADOS DEL BENCHMARK DE RED")
+    print("=" * 80)
+    print(pd.DataFrame(filas).to_string(index=False))
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump({
+                'fecha': datetime.now().isoformat(),
+                'parametros': vars(args),
+                'resultados': filas
+            }, archivo, indent=2, ensure_ascii=False)
+        print(f"\n📁 Resultados guardados en: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Cache persistente (SQLite) de certificados SSL por host y huella digital
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+HORA = 3600
+DIA = 24 * HORA
+
+CAMPOS_FECHA = ('fecha_inicio', 'fecha_fin', 'fecha_verificacion')
+
+
+class CacheCertificados:
+    """
+    Cache en disco de la información de certificados SSL
+
+    Cada entrada guarda el info_cert ya procesado, la huella SHA-256 del
+    certificado en DER y el momento de la próxima verificación, calculado a
+    partir de notAfter: cuanto más lejos está el vencimiento, más se espera
+    antes de volver a conectar.
+    """
+
+    def __init__(self, ruta: str = 'cache_ssl.db', fraccion_intervalo: float = 0.1,
+                 intervalo_minimo: int = HORA, intervalo_maximo: int = 7 * DIA):
+        """
+        Args:
+            ruta: Archivo SQLite de la cache
+            fraccion_intervalo: Fracción del tiempo restante hasta notAfter usada
+                                como intervalo de re-verificación
+            intervalo_minimo: Intervalo mínimo en segundos
+            intervalo_maximo: Intervalo máximo en segundos
+        """
+        self.logger = logging.getLogger('CacheCertificados')
+        self.logger.setLevel(logging.INFO)
+        self.ruta = ruta
+        self.fraccion_intervalo = fraccion_intervalo
+        self.intervalo_minimo = intervalo_minimo
+        self.intervalo_maximo = intervalo_maximo
+
+        # aciertos: sin conexión; sin_cambios: handshake con la misma huella
+        self.aciertos = 0
+        self.sin_cambios = 0
+        self.fallos = 0
+
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        with self._conexion:
+            self._conexion.execute(
+                'CREATE TABLE IF NOT EXISTS certificados ('
+                'host TEXT PRIMARY KEY, huella TEXT NOT NULL, datos TEXT NOT NULL, '
+                'proxima_verificacion REAL NOT NULL)'
+            )
+
+    def calcular_intervalo(self, fecha_fin: Optional[datetime]) -> int:
+        """
+        Calcula cuántos segundos esperar antes de volver a verificar un certificado
+
+        Args:
+            fecha_fin: notAfter del certificado
+
+        Returns:
+            Intervalo en segundos
+        """
+        if fecha_fin is None:
+            return self.intervalo_minimo
+        restante = (fecha_fin - datetime.now()).total_seconds()
+        intervalo = int(restante * self.fraccion_intervalo)
+        return max(self.intervalo_minimo, min(self.intervalo_maximo, intervalo))
+
+    def _clave(self, dominio: str, puerto: int) -> str:
+        return f"{dominio.strip().lower()}:{puerto}"
+
+    def _cargar(self, fila: Tuple[str, str]) -> Tuple[str, Dict]:
+        huella, datos = fila
+        info = json.loads(datos)
+        for campo in CAMPOS_FECHA:
+            if info.get(campo):
+                info[campo] = datetime.fromisoformat(info[campo])
+        # JSON convierte las tuplas de subjectAltName en listas
+        info['alternativos'] = tuple(tuple(entrada) for entrada in info.get('alternativos', []))
+        if info.get('fecha_fin'):
+            info['dias_hasta_expiracion'] = (info['fecha_fin'] - datetime.now()).days
+        return huella, info
+
+    def obtener_vigente(self, dominio: str, puerto: int = 443) -> Optional[Dict]:
+        """
+        Devuelve el certificado cacheado si aún no toca volver a verificarlo
+
+        Args:
+            dominio: Nombre del dominio
+            puerto: Puerto SSL
+
+        Returns:
+            info_cert con días recalculados a hoy, o None si hay que conectar
+        """
+        with self._lock:
+            fila = self._conexion.execute(
+                'SELECT huella, datos FROM certificados WHERE host = ? AND proxima_verificacion > ?',
+                (self._clave(dominio, puerto), time.time())
+            ).fetchone()
+            if fila is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+        return self._cargar(fila)[1]
+
+    def obtener_por_huella(self, dominio: str, puerto: int, huella: str) -> Optional[Dict]:
+        """
+        Devuelve el certificado cacheado si su huella coincide, aunque esté vencido el intervalo
+
+        Si coincide, la entrada se renueva con un nuevo intervalo y fecha de verificación.
+
+        Args:
+            dominio: Nombre del dominio
+            puerto: Puerto SSL
+            huella: SHA-256 hexadecimal del certificado DER recién recibido
+
+        Returns:
+            info_cert cacheado o None si el certificado cambió
+        """
+        clave = self._clave(dominio, puerto)
+        with self._lock:
+            fila = self._conexion.execute(
+                'SELECT huella, datos FROM certificados WHERE host = ? AND huella = ?', (clave, huella)
+            ).fetchone()
+        if fila is None:
+            return None
+
+        _, info = self._cargar(fila)
+        info['fecha_verificacion'] = datetime.now()
+        self.guardar(dominio, puerto, huella, info)
+        with self._lock:
+            self.sin_cambios += 1
+        return info
+
+    def guardar(self, dominio: str, puerto: int, huella: str, info_cert: Dict):
+        """
+        Guarda o reemplaza la información de un certificado
+
+        Args:
+            dominio: Nombre del dominio
+            puerto: Puerto SSL
+            huella: SHA-256 hexadecimal del certificado DER
+            info_cert: Diccionario devuelto por SSLChecker
+        """
+        datos = {k: v for k, v in info_cert.items() if k != 'error'}
+        for campo in CAMPOS_FECHA:
+            if datos.get(campo):
+                datos[campo] = datos[campo].isoformat()
+        proxima = time.time() + self.calcular_intervalo(info_cert.get('fecha_fin'))
+
+        with self._lock:
+            with self._conexion:
+                self._conexion.execute(
+                    'INSERT OR REPLACE INTO certificados (host, huella, datos, proxima_verificacion) VALUES (?, ?, ?, ?)',
+                    (self._clave(dominio, puerto), huella, json.dumps(datos, default=str), proxima)
+                )
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los contadores de uso de la cache
+
+        Returns:
+            Diccionario con aciertos, certificados sin cambios y fallos
+        """
+        return {
+            'aciertos': self.aciertos,
+            'sin_cambios': self.sin_cambios,
+            'fallos': self.fallos
+        }
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos"""
+        with self._lock:
+            self._conexion.close()
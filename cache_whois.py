@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Cache persistente (SQLite) de resultados WHOIS con TTL según vencimiento
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from agente_lector import armar_info_dominio
+
+HORA = 3600
+DIA = 24 * HORA
+
+# Espera máxima (segundos) por el bloqueo de escritura de otro proceso
+ESPERA_BLOQUEO = 30
+
+
+def normalizar_dominio(dominio: str) -> str:
+    """
+    Normaliza un dominio para usarlo como clave de cache
+
+    Args:
+        dominio: Dominio tal como lo ingresó el usuario
+
+    Returns:
+        Dominio en minúsculas, sin espacios, punto final ni prefijo www.
+    """
+    dominio = dominio.strip().rstrip('.').lower()
+    if dominio.startswith('www.'):
+        dominio = dominio[4:]
+    try:
+        return dominio.encode('idna').decode('ascii')
+    except UnicodeError:
+        return dominio
+
+
+class CacheWhois:
+    """
+    Cache en disco de la información WHOIS por dominio
+
+    El TTL de cada entrada es proporcional a los días que faltan para el
+    vencimiento: corto cerca de la fecha (para detectar renovaciones) y
+    largo cuando el dominio está lejos de vencer.
+
+    Varios procesos pueden compartir el archivo (LectorFragmentado): la base
+    se abre en modo WAL, para que las lecturas no esperen a las escrituras,
+    y las escrituras esperan hasta ESPERA_BLOQUEO segundos el bloqueo de otro
+    proceso.
+    """
+
+    def __init__(self, ruta: str = 'cache_whois.db', fraccion_ttl: float = 0.1,
+                 ttl_minimo: int = 6 * HORA, ttl_maximo: int = 30 * DIA,
+                 ttl_vencido: int = HORA):
+        """
+        Args:
+            ruta: Archivo SQLite de la cache
+            fraccion_ttl: Fracción del tiempo restante hasta el vencimiento usada como TTL
+            ttl_minimo: TTL mínimo en segundos
+            ttl_maximo: TTL máximo en segundos
+            ttl_vencido: TTL para dominios vencidos o sin fecha de expiración
+        """
+        self.logger = logging.getLogger('CacheWhois')
+        self.logger.setLevel(logging.INFO)
+        self.ruta = ruta
+        self.fraccion_ttl = fraccion_ttl
+        self.ttl_minimo = ttl_minimo
+        self.ttl_maximo = ttl_maximo
+        self.ttl_vencido = ttl_vencido
+
+        self.aciertos = 0
+        self.fallos = 0
+        self.escrituras = 0
+
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, timeout=ESPERA_BLOQUEO, check_same_thread=False)
+        self._conexion.execute(f'PRAGMA busy_timeout = {ESPERA_BLOQUEO * 1000}')
+        self._conexion.execute('PRAGMA journal_mode = WAL')
+        with self._conexion:
+            self._conexion.execute(
+                'CREATE TABLE IF NOT EXISTS whois ('
+                'dominio TEXT PRIMARY KEY, datos TEXT NOT NULL, '
+                'guardado REAL NOT NULL, expira REAL NOT NULL)'
+            )
+
+    def calcular_ttl(self, dias_hasta_vencimiento: Optional[int]) -> int:
+        """
+        Calcula el TTL de una entrada según los días hasta el vencimiento
+
+        Args:
+            dias_hasta_vencimiento: Días restantes (None si se desconoce)
+
+        Returns:
+            TTL en segundos
+        """
+        if dias_hasta_vencimiento is None or dias_hasta_vencimiento <= 0:
+            return self.ttl_vencido
+        ttl = int(dias_hasta_vencimiento * DIA * self.fraccion_ttl)
+        return max(self.ttl_minimo, min(self.ttl_maximo, ttl))
+
+    def obtener(self, dominio: str) -> Optional[Dict]:
+        """
+        Busca un dominio vigente en la cache
+
+        Args:
+            dominio: Nombre del dominio
+
+        Returns:
+            Diccionario de información (con días recalculados a hoy) o None
+        """
+        with self._lock:
+            try:
+                fila = self._conexion.execute(
+                    'SELECT datos FROM whois WHERE dominio = ? AND expira > ?',
+                    (normalizar_dominio(dominio), time.time())
+                ).fetchone()
+            except sqlite3.Error as e:
+                self.logger.error(f"Error leyendo {dominio} de la cache WHOIS: {str(e)}")
+                fila = None
+            if fila is None:
+                self.fallos += 1
+                return None
+            self.aciertos += 1
+
+        datos = json.loads(fila[0])
+        expiracion = datetime.fromisoformat(datos['fecha_expiracion']) if datos['fecha_expiracion'] else None
+        info = armar_info_dominio(dominio, expiracion, datos['registrar'], datos['estado'])
+        info['fecha_consulta'] = datetime.fromisoformat(datos['fecha_consulta'])
+        return info
+
+    def guardar(self, info: Dict) -> bool:
+        """
+        Guarda la información de un dominio con su TTL
+
+        Un error de SQLite (base bloqueada por otro proceso demasiado tiempo,
+        disco lleno...) se registra y la entrada no se guarda: el dominio ya
+        fue consultado y solo se pierde la cache.
+
+        Args:
+            info: Diccionario devuelto por AgenteLector.obtener_info_dominio
+
+        Returns:
+            True si se guardó correctamente
+        """
+        expiracion = info.get('fecha_expiracion')
+        datos = json.dumps({
+            'fecha_expiracion': expiracion.isoformat() if expiracion else None,
+            'registrar': info.get('registrar'),
+            'estado': info.get('estado'),
+            'fecha_consulta': info['fecha_consulta'].isoformat()
+        }, default=str)
+        ahora = time.time()
+        ttl = self.calcular_ttl(info.get('dias_hasta_vencimiento'))
+
+        with self._lock:
+            try:
+                with self._conexion:
+                    self._conexion.execute(
+                        'INSERT OR REPLACE INTO whois (dominio, datos, guardado, expira) VALUES (?, ?, ?, ?)',
+                        (normalizar_dominio(info['dominio']), datos, ahora, ahora + ttl)
+                    )
+            except sqlite3.Error as e:
+                self.logger.error(f"Error guardando {info['dominio']} en la cache WHOIS: {str(e)}")
+                return False
+            self.escrituras += 1
+        return True
+
+    def invalidar(self, dominio: Optional[str] = None):
+        """
+        Elimina un dominio de la cache, o todas las entradas si no se indica
+
+        Args:
+            dominio: Dominio a eliminar (None para vaciar la cache)
+        """
+        with self._lock:
+            with self._conexion:
+                if dominio is None:
+                    self._conexion.execute('DELETE FROM whois')
+                else:
+                    self._conexion.execute('DELETE FROM whois WHERE dominio = ?', (normalizar_dominio(dominio),))
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los contadores de uso de la cache
+
+        Returns:
+            Diccionario con aciertos, fallos, escrituras y tasa de aciertos
+        """
+        consultas = self.aciertos + self.fallos
+        return {
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'escrituras': self.escrituras,
+            'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0.0
+        }
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos"""
+        with self._lock:
+            self._conexion.close()
@@ -7,27 +7,37 @@ import pandas as pd
 from typing import Dict, List, Optional
 import logging
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait
 import json
 
 from ssl_checker import SSLChecker
 from agente_lector import AgenteLector
+from instantanea_monitoreo import InstantaneaMonitoreo
 
 class AsistenteDominios:
     """
     Asistente simple para consultas sobre resultados de monitoreo de dominios
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 16, tiempo_limite: float = 30, trazador=None):
         """
         Inicializar el asistente sin dependencia de APIs externas
+        
+        Args:
+            max_workers: Consultas WHOIS/SSL simultáneas en las consultas masivas
+            tiempo_limite: Segundos máximos por consulta antes de devolver resultados parciales
+            trazador: Trazador opcional compartido por las consultas WHOIS y SSL
+                      (conexión TCP, handshake TLS y procesamiento del certificado)
         """
         # Configurar logger
         self.logger = logging.getLogger('AsistenteDominios')
         self.logger.setLevel(logging.INFO)
         
         # Herramientas de consulta
-        self.ssl_checker = SSLChecker()
-        self.agente_lector = AgenteLector()
+        self.ssl_checker = SSLChecker(trazador=trazador)
+        self.agente_lector = AgenteLector(trazador=trazador)
+        self.max_workers = max(2, max_workers)
+        self.tiempo_limite = tiempo_limite
         
         # Contexto del sistema para el asistente
         self.system_context = """
@@ -250,32 +260,32 @@ class AsistenteDominios:
         
         return "Para poder analizar los datos, primero ejecuta un monitoreo de dominios desde el panel principal."
     
-    def consultar_dominio_completo(self, dominio: str) -> Dict:
+    def _normalizar_contexto(self, contexto: Optional[Dict]) -> Optional[Dict]:
+        """
+        Convierte una InstantaneaMonitoreo al formato de contexto del asistente
+        """
+        if isinstance(contexto, InstantaneaMonitoreo):
+            return {'dataframe_completo': contexto.dataframe, 'instantanea': contexto}
+        return contexto
+    
+    def consultar_dominio_completo(self, dominio: str, instantanea: Optional[InstantaneaMonitoreo] = None,
+                                   tiempo_limite: Optional[float] = None) -> Dict:
         """
         Obtiene información completa de un dominio (WHOIS + SSL)
         
+        Las consultas WHOIS y SSL se ejecutan en paralelo.
+        
         Args:
             dominio: Nombre del dominio a consultar
+            instantanea: Instantánea del monitoreo; si contiene el dominio se
+                         reutiliza su información WHOIS en lugar de consultarla
+            tiempo_limite: Segundos máximos de espera (por defecto self.tiempo_limite)
             
         Returns:
             Diccionario con información completa
         """
         try:
-            # Obtener información WHOIS
-            info_whois = self.agente_lector.obtener_info_dominio(dominio)
-            
-            # Obtener información SSL
-            info_ssl = self.ssl_checker.obtener_info_ssl(dominio)
-            
-            # Combinar información
-            resultado = {
-                'dominio': dominio,
-                'whois': info_whois,
-                'ssl': info_ssl,
-                'fecha_consulta': datetime.now(),
-                'estado': 'completo' if info_whois and info_ssl else 'parcial'
-            }
-            
+            resultado = self._consultar_en_paralelo([dominio], instantanea, tiempo_limite)[0]
             self.logger.info(f"Consulta completa realizada para {dominio}")
             return resultado
             
@@ -288,6 +298,57 @@ class AsistenteDominios:
                 'estado': 'error'
             }
     
+    def _consultar_en_paralelo(self, dominios: List[str], instantanea: Optional[InstantaneaMonitoreo] = None,
+                               tiempo_limite: Optional[float] = None) -> List[Dict]:
+        """
+        Lanza todas las consultas WHOIS y SSL de los dominios a la vez
+        
+        Al vencer el tiempo límite se devuelve lo obtenido hasta ese momento;
+        las consultas sin respuesta quedan en None y se listan en 'sin_respuesta'.
+        
+        Args:
+            dominios: Dominios a consultar
+            instantanea: Instantánea cuya información WHOIS se reutiliza
+            tiempo_limite: Segundos máximos para todo el lote
+            
+        Returns:
+            Lista de resultados en el mismo orden que dominios
+        """
+        tiempo_limite = tiempo_limite or self.tiempo_limite
+        whois = {}
+        if instantanea is not None:
+            for dominio in dominios:
+                whois[dominio] = instantanea.info_dominio(dominio)
+        
+        executor = ThreadPoolExecutor(max_workers=min(self.max_workers, 2 * max(1, len(dominios))),
+                                      thread_name_prefix='asistente')
+        futuros = {}
+        for dominio in dominios:
+            if whois.get(dominio) is None:
+                futuros[executor.submit(self.agente_lector.obtener_info_dominio, dominio)] = (dominio, 'whois')
+            futuros[executor.submit(self.ssl_checker.obtener_info_ssl, dominio)] = (dominio, 'ssl')
+        
+        terminados, pendientes = wait(futuros, timeout=tiempo_limite)
+        # No bloquear la interfaz esperando a las consultas colgadas
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        if pendientes:
+            self.logger.warning(f"Tiempo límite de {tiempo_limite}s alcanzado: {len(pendientes)} consultas sin respuesta")
+        
+        resultados = {dominio: {'dominio': dominio, 'whois': whois.get(dominio), 'ssl': None,
+                                'sin_respuesta': []} for dominio in dominios}
+        for futuro, (dominio, tipo) in futuros.items():
+            if futuro in terminados:
+                resultados[dominio][tipo] = futuro.result()
+            else:
+                resultados[dominio]['sin_respuesta'].append(tipo)
+        
+        for resultado in resultados.values():
+            resultado['fecha_consulta'] = datetime.now()
+            resultado['estado'] = 'completo' if resultado['whois'] and resultado['ssl'] else 'parcial'
+        
+        return [resultados[dominio] for dominio in dominios]
+    
     def generar_respuesta_chatgpt(self, pregunta: str, contexto_dominios: Optional[Dict] = None) -> str:
         """
         Genera respuesta usando ChatGPT
@@ -343,13 +404,14 @@ class AsistenteDominios:
         
         Args:
             pregunta: Pregunta del usuario
-            contexto_monitoreo: Resultados del monitoreo disponibles
+            contexto_monitoreo: Resultados del monitoreo disponibles (dict o InstantaneaMonitoreo)
             
         Returns:
             Diccionario con respuesta y metadatos
         """
         try:
             # Generar respuesta basada en contexto de monitoreo
+            contexto_monitoreo = self._normalizar_contexto(contexto_monitoreo)
             respuesta = self.generar_respuesta_contexto(pregunta, contexto_monitoreo)
             
             resultado = {
@@ -405,22 +467,24 @@ class AsistenteDominios:
         
         return list(encontrados)
     
-    def obtener_resumen_dominios(self, dominios: List[str]) -> Dict:
+    def obtener_resumen_dominios(self, dominios: List[str], instantanea: Optional[InstantaneaMonitoreo] = None,
+                                 tiempo_limite: Optional[float] = None) -> Dict:
         """
         Obtiene un resumen de múltiples dominios
         
+        Todas las consultas se lanzan en paralelo bajo un tiempo límite total;
+        si se alcanza, el resumen se arma con los resultados parciales.
+        
         Args:
             dominios: Lista de dominios a analizar
+            instantanea: Instantánea del monitoreo cuya información WHOIS se reutiliza
+            tiempo_limite: Segundos máximos para todo el resumen (por defecto self.tiempo_limite)
             
         Returns:
             Resumen con información consolidada
         """
         try:
-            resultados = []
-            
-            for dominio in dominios:
-                info = self.consultar_dominio_completo(dominio)
-                resultados.append(info)
+            resultados = self._consultar_en_paralelo(dominios, instantanea, tiempo_limite)
             
             # Analizar resultados
             total_dominios = len(resultados)
@@ -449,6 +513,8 @@ class AsistenteDominios:
                 'dominios_con_whois': dominios_con_whois,
                 'alertas_ssl': alertas_ssl,
                 'alertas_whois': alertas_whois,
+                'completo': not any(r['sin_respuesta'] for r in resultados),
+                'dominios_sin_respuesta': [r['dominio'] for r in resultados if r['sin_respuesta']],
                 'detalles': resultados,
                 'fecha_analisis': datetime.now()
             }
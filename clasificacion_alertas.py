@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Clasificación vectorizada de dominios por nivel de alerta
+"""
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Optional
+
+UMBRAL_CRITICO = 30
+UMBRAL_ADVERTENCIA = 50
+
+NIVELES_ALERTA = ['CRÍTICO', 'ADVERTENCIA', 'NORMAL']
+
+
+class ClasificadorAlertas:
+    """
+    Clasifica días hasta vencimiento en CRÍTICO / ADVERTENCIA / NORMAL
+
+    Todas las operaciones trabajan sobre la columna completa (np.select) y
+    devuelven columnas categóricas, así que traducir o renombrar etiquetas
+    cuesta lo mismo para diez filas que para un millón.
+    """
+
+    def __init__(self, umbral_critico: int = UMBRAL_CRITICO, umbral_advertencia: int = UMBRAL_ADVERTENCIA):
+        """
+        Args:
+            umbral_critico: Días o menos para considerar un dominio crítico
+            umbral_advertencia: Días o menos para considerar un dominio en advertencia
+        """
+        if umbral_critico > umbral_advertencia:
+            raise ValueError("El umbral crítico no puede ser mayor que el de advertencia")
+        self.umbral_critico = umbral_critico
+        self.umbral_advertencia = umbral_advertencia
+
+    def codigos(self, dias: pd.Series) -> np.ndarray:
+        """
+        Calcula el código de nivel de cada fila: 0 crítico, 1 advertencia, 2 normal
+
+        Los días desconocidos (NaN) se consideran normales.
+
+        Args:
+            dias: Serie con días hasta vencimiento
+
+        Returns:
+            Array int8 con un código por fila
+        """
+        valores = pd.to_numeric(dias, errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+        return np.select(
+            [valores <= self.umbral_critico, valores <= self.umbral_advertencia],
+            [0, 1],
+            default=2
+        ).astype('int8')
+
+    def clasificar(self, dias: pd.Series, etiquetas: Optional[Dict[str, str]] = None) -> pd.Series:
+        """
+        Devuelve el nivel de alerta de cada fila como columna categórica
+
+        Args:
+            dias: Serie con días hasta vencimiento
+            etiquetas: Mapa opcional nivel -> texto (por ejemplo traducciones)
+
+        Returns:
+            Serie categórica con el mismo índice que dias
+        """
+        categorias = [etiquetas.get(nivel, nivel) for nivel in NIVELES_ALERTA] if etiquetas else NIVELES_ALERTA
+        return pd.Series(
+            pd.Categorical.from_codes(self.codigos(dias), categories=categorias, ordered=True),
+            index=dias.index, name='estado_alerta'
+        )
+
+    def prioridad(self, dias: pd.Series) -> pd.Series:
+        """
+        Devuelve la prioridad de cada fila (1 crítico, 2 advertencia, 3 normal)
+
+        Args:
+            dias: Serie con días hasta vencimiento
+
+        Returns:
+            Serie int8 con el mismo índice que dias
+        """
+        return pd.Series(self.codigos(dias) + 1, index=dias.index, name='prioridad', dtype='int8')
+
+    def agregar_columnas(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Agrega 'estado_alerta' y 'prioridad' a partir de 'dias_hasta_vencimiento'
+
+        Args:
+            df: DataFrame con la columna dias_hasta_vencimiento
+
+        Returns:
+            El mismo DataFrame con las columnas agregadas
+        """
+        codigos = self.codigos(df['dias_hasta_vencimiento'])
+        df['estado_alerta'] = pd.Categorical.from_codes(codigos, categories=NIVELES_ALERTA, ordered=True)
+        df['prioridad'] = (codigos + 1).astype('int8')
+        return df
+
+    def mascaras(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """
+        Devuelve máscaras booleanas por nivel para filtrar el DataFrame
+
+        Args:
+            df: DataFrame con la columna dias_hasta_vencimiento
+
+        Returns:
+            Diccionario 'critico' / 'advertencia' / 'normal' -> array booleano
+        """
+        codigos = self.codigos(df['dias_hasta_vencimiento'])
+        return {'critico': codigos == 0, 'advertencia': codigos == 1, 'normal': codigos == 2}
+
+    def descripcion_rangos(self) -> Dict[str, str]:
+        """
+        Texto del rango de días de cada nivel (por ejemplo para leyendas)
+
+        Returns:
+            Diccionario nivel -> rango
+        """
+        return {
+            'CRÍTICO': f"≤{self.umbral_critico} días",
+            'ADVERTENCIA': f"{self.umbral_critico + 1}-{self.umbral_advertencia} días",
+            'NORMAL': f">{self.umbral_advertencia} días"
+        }
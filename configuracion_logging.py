@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Logging de la aplicación a través de una cola con un hilo escritor, configurado una vez por proceso
+"""
+
+import atexit
+import json
+import queue
+import threading
+import logging
+import logging.handlers
+from datetime import datetime
+from typing import Dict, Optional
+
+FORMATO_TEXTO = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Fracción de líneas de éxito por dominio que se registran en ejecuciones grandes
+MUESTREO_POR_DEFECTO = {'AgenteLector': 0.01, 'ClienteWhoisAsincrono': 0.01, 'SSLChecker': 0.01}
+
+# Campos propios de LogRecord que no se copian como extras en JSON lines
+_CAMPOS_RECORD = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'por_dominio'}
+
+
+class FormateadorJSON(logging.Formatter):
+    """Formatea cada registro como una línea JSON (los extras, como dominio, van como campos)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        datos = {
+            'fecha': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage()
+        }
+        datos.update({clave: valor for clave, valor in vars(record).items() if clave not in _CAMPOS_RECORD})
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class FiltroMuestreo(logging.Filter):
+    """
+    Muestrea las líneas de éxito por dominio (extra={'por_dominio': True})
+
+    Mientras está activo deja pasar 1 de cada round(1 / fracción) líneas
+    de cada logger configurado y cuenta todas, para registrar al final de
+    la ejecución una línea con los totales en lugar de una por dominio.
+    Las advertencias y errores nunca se descartan.
+    """
+
+    def __init__(self, fracciones: Dict[str, float]):
+        """
+        Args:
+            fracciones: Logger -> fracción de líneas por dominio a registrar (0-1)
+        """
+        super().__init__()
+        self.fracciones = dict(fracciones)
+        self.activo = False
+        self._lock = threading.Lock()
+        self._vistas: Dict[str, int] = {}
+        self._registradas: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not getattr(record, 'por_dominio', False) or record.levelno > logging.INFO:
+            return True
+        fraccion = self.fracciones.get(record.name, 1.0) if self.activo else 1.0
+        cada = max(1, round(1 / fraccion)) if fraccion > 0 else 0
+        with self._lock:
+            vistas = self._vistas.get(record.name, 0)
+            self._vistas[record.name] = vistas + 1
+            registrar = cada > 0 and vistas % cada == 0
+            if registrar:
+                self._registradas[record.name] = self._registradas.get(record.name, 0) + 1
+        return registrar
+
+    def resumen(self, reiniciar: bool = True) -> Dict[str, Dict[str, int]]:
+        """
+        Devuelve cuántas líneas por dominio hubo y cuántas se registraron, por logger
+
+        Args:
+            reiniciar: Si True, pone los contadores en cero
+
+        Returns:
+            Diccionario logger -> {'lineas': ..., 'registradas': ...}
+        """
+        with self._lock:
+            resumen = {nombre: {'lineas': vistas, 'registradas': self._registradas.get(nombre, 0)}
+                       for nombre, vistas in self._vistas.items()}
+            if reiniciar:
+                self._vistas = {}
+                self._registradas = {}
+        return resumen
+
+
+_lock = threading.Lock()
+_escuchador: Optional[logging.handlers.QueueListener] = None
+_filtro: Optional[FiltroMuestreo] = None
+
+
+def configurar_logging(ruta: str = 'sistema_dominios.log', formato: str = 'texto', nivel: int = logging.INFO,
+                       muestreo: Optional[Dict[str, float]] = None, consola: bool = True) -> FiltroMuestreo:
+    """
+    Configura el logging del proceso: los loggers solo encolan y un hilo escribe
+
+    El logger raíz recibe un QueueHandler y un QueueListener en segundo
+    plano escribe en el archivo (y la consola), así un logger.info por
+    dominio no hace una escritura a disco en el camino de la consulta.
+    Solo la primera llamada del proceso tiene efecto; las siguientes
+    devuelven el filtro ya creado. Al salir se vacía la cola.
+
+    Args:
+        ruta: Archivo de log
+        formato: 'texto' o 'jsonl' (una línea JSON por registro, para el archivo)
+        nivel: Nivel del logger raíz
+        muestreo: Logger -> fracción de líneas de éxito por dominio a registrar
+                  en ejecuciones grandes (por defecto MUESTREO_POR_DEFECTO)
+        consola: Si True, también escribe en la consola (siempre en texto)
+
+    Returns:
+        Filtro de muestreo compartido
+    """
+    global _escuchador, _filtro
+    with _lock:
+        if _filtro is not None:
+            return _filtro
+
+        archivo = logging.FileHandler(ruta, encoding='utf-8')
+        archivo.setFormatter(FormateadorJSON() if formato == 'jsonl' else logging.Formatter(FORMATO_TEXTO))
+        destinos = [archivo]
+        if consola:
+            pantalla = logging.StreamHandler()
+            pantalla.setFormatter(logging.Formatter(FORMATO_TEXTO))
+            destinos.append(pantalla)
+
+        _filtro = FiltroMuestreo(MUESTREO_POR_DEFECTO if muestreo is None else muestreo)
+        cola = queue.SimpleQueue()
+        encolador = logging.handlers.QueueHandler(cola)
+        encolador.addFilter(_filtro)
+
+        raiz = logging.getLogger()
+        raiz.setLevel(nivel)
+        raiz.addHandler(encolador)
+
+        _escuchador = logging.handlers.QueueListener(cola, *destinos, respect_handler_level=True)
+        _escuchador.start()
+        atexit.register(detener_logging)
+        return _filtro
+
+
+def filtro_muestreo() -> Optional[FiltroMuestreo]:
+    """Devuelve el filtro de muestreo del proceso (None si el logging no se configuró aquí)"""
+    return _filtro
+
+
+def detener_logging():
+    """Escribe los registros pendientes y detiene el hilo escritor"""
+    global _escuchador
+    with _lock:
+        if _escuchador is not None:
+            _escuchador.stop()
+            _escuchador = None
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Modo demonio: monitoreo periódico con los agentes, caches y conexiones ya inicializados
+"""
+
+import json
+import os
+import random
+import signal
+import threading
+import time
+import logging
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from agente_principal import AgentePrincipal
+
+
+def leer_archivo_dominios(ruta: str) -> List[str]:
+    """
+    Lee una lista de dominios (uno por línea; se ignoran líneas vacías y comentarios #)
+
+    Args:
+        ruta: Archivo de texto con los dominios
+
+    Returns:
+        Dominios sin duplicados, en el orden del archivo
+    """
+    with open(ruta, encoding='utf-8') as archivo:
+        dominios = (linea.split('#', 1)[0].strip() for linea in archivo)
+        return list(dict.fromkeys(dominio for dominio in dominios if dominio))
+
+
+class DemonioMonitoreo:
+    """
+    Ejecuta monitorear_dominios cada intervalo segundos sin reiniciar el proceso
+
+    El AgentePrincipal (con su cache WHOIS, estado incremental, sesiones
+    SMTP y logging) se crea una sola vez y se reutiliza en cada ciclo. El
+    intervalo se cuenta desde el inicio de cada ejecución y se le suma un
+    desvío aleatorio de ±jitter para que varias instancias no consulten
+    los servidores WHOIS al mismo tiempo. Antes de cada ciclo se vuelve a
+    leer el archivo de dominios si cambió. El archivo de latido (JSON) se
+    reescribe al cambiar de estado y periódicamente mientras espera, así
+    un supervisor puede detectar un proceso colgado por su antigüedad.
+    SIGTERM y SIGINT detienen el demonio al terminar el ciclo en curso.
+    """
+
+    def __init__(self, agente_principal: AgentePrincipal, dominios: Optional[List[str]] = None,
+                 archivo_dominios: Optional[str] = None, destinatarios_correo: Optional[List[str]] = None,
+                 intervalo: float = 3600, jitter: float = 0.1, ruta_latido: Optional[str] = 'estado_daemon.json',
+                 periodo_latido: float = 30, opciones_monitoreo: Optional[Dict] = None,
+                 al_terminar_ciclo: Optional[Callable[[Dict], None]] = None):
+        """
+        Args:
+            agente_principal: Agente ya configurado que se reutiliza en cada ciclo
+            dominios: Dominios fijos a monitorear (se suman a los del archivo)
+            archivo_dominios: Archivo con un dominio por línea, releído cuando cambia
+            destinatarios_correo: Destinatarios de las notificaciones
+            intervalo: Segundos entre el inicio de una ejecución y el de la siguiente
+            jitter: Fracción del intervalo usada como desvío aleatorio (0.1 = ±10%)
+            ruta_latido: Archivo JSON de estado/latido (None = no escribir)
+            periodo_latido: Segundos entre latidos mientras espera
+            opciones_monitoreo: Argumentos extra de monitorear_dominios (incremental, usar_cache...)
+            al_terminar_ciclo: Función opcional llamada con los resultados de cada ciclo
+        """
+        if not dominios and not archivo_dominios:
+            raise ValueError("Se requieren dominios o un archivo de dominios")
+        self.logger = logging.getLogger('DemonioMonitoreo')
+        self.logger.setLevel(logging.INFO)
+        self.agente = agente_principal
+        self.dominios_fijos = list(dominios or [])
+        self.archivo_dominios = archivo_dominios
+        self.destinatarios_correo = destinatarios_correo
+        self.intervalo = intervalo
+        self.jitter = jitter
+        self.ruta_latido = ruta_latido
+        self.periodo_latido = periodo_latido
+        self.opciones_monitoreo = opciones_monitoreo or {}
+        self.al_terminar_ciclo = al_terminar_ciclo
+
+        self.detener = threading.Event()
+        self.ejecuciones = 0
+        self.ciclos_fallidos = 0
+        self.inicio = datetime.now()
+        self.estado = 'iniciando'
+        self.ultima_ejecucion: Optional[Dict] = None
+        self._ultimos_resultados: Optional[Dict] = None
+        self.proxima_ejecucion: Optional[float] = None
+        self.ultimo_error: Optional[str] = None
+
+        self._firma_archivo: Optional[Tuple[float, int]] = None
+        self._dominios_archivo: List[str] = []
+
+    def dominios(self) -> List[str]:
+        """
+        Devuelve la lista de dominios vigente, releyendo el archivo si cambió
+
+        Si el archivo no se puede leer se mantiene la última lista leída.
+
+        Returns:
+            Dominios fijos más los del archivo, sin duplicados
+        """
+        if self.archivo_dominios:
+            try:
+                estado = os.stat(self.archivo_dominios)
+                firma = (estado.st_mtime, estado.st_size)
+                if firma != self._firma_archivo:
+                    self._dominios_archivo = leer_archivo_dominios(self.archivo_dominios)
+                    if self._firma_archivo is not None:
+                        self.logger.info(f"Archivo de dominios recargado: {len(self._dominios_archivo)} dominios")
+                    self._firma_archivo = firma
+            except OSError as e:
+                self.logger.error(f"No se pudo leer {self.archivo_dominios}: {str(e)}")
+        return list(dict.fromkeys(self.dominios_fijos + self._dominios_archivo))
+
+    def calcular_espera(self) -> float:
+        """
+        Calcula el intervalo hasta la próxima ejecución con su desvío aleatorio
+
+        Returns:
+            Segundos entre el inicio de esta ejecución y el de la siguiente
+        """
+        return max(0.0, self.intervalo * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def escribir_latido(self):
+        """Escribe el archivo de estado de forma atómica (temporal + os.replace)"""
+        if not self.ruta_latido:
+            return
+        if self.ultima_ejecucion and self._ultimos_resultados is not None:
+            # Con correo en segundo plano la entrega se confirma después del ciclo
+            self.ultima_ejecucion['correo_enviado'] = self._ultimos_resultados['correo_enviado']
+        datos = {
+            'pid': os.getpid(),
+            'estado': self.estado,
+            'latido': datetime.now().isoformat(timespec='seconds'),
+            'inicio': self.inicio.isoformat(timespec='seconds'),
+            'ejecuciones': self.ejecuciones,
+            'ciclos_fallidos': self.ciclos_fallidos,
+            'intervalo_segundos': self.intervalo,
+            'proxima_ejecucion': (datetime.fromtimestamp(self.proxima_ejecucion).isoformat(timespec='seconds')
+                                  if self.proxima_ejecucion else None),
+            'ultima_ejecucion': self.ultima_ejecucion,
+            'ultimo_error': self.ultimo_error
+        }
+        temporal = f"{self.ruta_latido}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(datos, archivo, ensure_ascii=False, indent=2, default=str)
+            os.replace(temporal, self.ruta_latido)
+        except OSError as e:
+            self.logger.error(f"No se pudo escribir el latido en {self.ruta_latido}: {str(e)}")
+
+    def ejecutar_ciclo(self) -> Dict:
+        """
+        Ejecuta un monitoreo completo con la lista de dominios vigente
+
+        Returns:
+            Resultados de monitorear_dominios
+        """
+        dominios = self.dominios()
+        self.estado = 'ejecutando'
+        self.escribir_latido()
+
+        inicio = time.time()
+        resultados = self.agente.monitorear_dominios(dominios, self.destinatarios_correo, **self.opciones_monitoreo)
+        decisiones = resultados['decisiones'] or {}
+        self.ejecuciones += 1
+        self._ultimos_resultados = resultados
+        self.ultimo_error = resultados['errores'][-1] if resultados['errores'] else None
+        self.ultima_ejecucion = {
+            'inicio': datetime.fromtimestamp(inicio).isoformat(timespec='seconds'),
+            'duracion_segundos': round(time.time() - inicio, 2),
+            'dominios': len(dominios),
+            'dominios_procesados': resultados['dominios_procesados'],
+            'dominios_error': resultados['dominios_error'],
+            'criticos': decisiones.get('criticos_count', 0),
+            'advertencia': decisiones.get('advertencia_count', 0),
+            'correo_encolado': resultados['correo_encolado'],
+            'correo_enviado': resultados['correo_enviado'],
+            'errores': len(resultados['errores'])
+        }
+        self.logger.info(f"Ciclo {self.ejecuciones} completado en {self.ultima_ejecucion['duracion_segundos']}s "
+                         f"({len(dominios)} dominios)")
+        return resultados
+
+    def _instalar_senales(self):
+        # Las señales solo pueden instalarse desde el hilo principal
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for senal in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(senal, lambda numero, marco: self.detener.set())
+
+    def ejecutar(self, max_ejecuciones: Optional[int] = None):
+        """
+        Ciclo principal: ejecuta, espera el intervalo (con latidos) y repite
+
+        Args:
+            max_ejecuciones: Ciclos a intentar antes de salir, incluidos los que fallan
+                             (None = hasta recibir una señal)
+        """
+        self._instalar_senales()
+        self.logger.info(f"Demonio iniciado: cada {self.intervalo:.0f}s (±{self.jitter:.0%})")
+
+        intentos = 0
+        while not self.detener.is_set():
+            inicio = time.time()
+            intentos += 1
+            try:
+                resultados = self.ejecutar_ciclo()
+                if self.al_terminar_ciclo is not None:
+                    self.al_terminar_ciclo(resultados)
+            except Exception as e:
+                self.ciclos_fallidos += 1
+                self.ultimo_error = f"Error en ciclo de monitoreo: {str(e)}"
+                self.logger.error(self.ultimo_error)
+
+            if max_ejecuciones is not None and intentos >= max_ejecuciones:
+                break
+
+            self.proxima_ejecucion = inicio + self.calcular_espera()
+            self.estado = 'esperando'
+            while not self.detener.is_set():
+                self.escribir_latido()
+                restante = self.proxima_ejecucion - time.time()
+                if restante <= 0:
+                    break
+                self.detener.wait(min(restante, self.periodo_latido))
+
+        self.estado = 'detenido'
+        self.proxima_ejecucion = None
+        self.escribir_latido()
+        self.logger.info(f"Demonio detenido tras {self.ejecuciones} ejecuciones ({self.ciclos_fallidos} fallidas)")
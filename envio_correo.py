@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Envío de correo SMTP con sesiones reutilizables y cola en segundo plano
+"""
+
+import queue
+import smtplib
+import threading
+import time
+import logging
+from concurrent.futures import Future
+from email.message import Message
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def es_error_de_sesion(error: Exception) -> bool:
+    """
+    Indica si un error de envío se debe a que la sesión SMTP ya no sirve
+
+    Las respuestas 421 y los cortes de conexión se resuelven reconectando;
+    los rechazos del mensaje o de los destinatarios no.
+
+    Args:
+        error: Excepción capturada al enviar
+
+    Returns:
+        True si conviene reconectar y reintentar
+    """
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(error, smtplib.SMTPResponseException):
+        return error.smtp_code == 421
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return False
+    # smtplib.SMTPException hereda de OSError: lo que queda son errores de red
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class _Conexion:
+    """Sesión SMTP autenticada con sus contadores de uso"""
+
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.mensajes = 0
+        self.ultimo_uso = time.monotonic()
+
+
+class EnviadorSMTP:
+    """
+    Envía correos reutilizando sesiones SMTP ya autenticadas
+
+    Cada sesión hace STARTTLS y LOGIN una sola vez y envía muchos mensajes
+    seguidos; se renueva al llegar a mensajes_por_conexion o si estuvo
+    inactiva más de inactividad_maxima segundos (los servidores cortan las
+    sesiones ociosas). Si una sesión reutilizada resulta cortada, se abre
+    otra y se reintenta el mensaje una vez.
+
+    encolar() entrega el mensaje a hilos en segundo plano (uno por conexión)
+    para que el monitoreo no espere al servidor de correo.
+    """
+
+    def __init__(self, config_email: Dict, max_conexiones: int = 2, mensajes_por_conexion: int = 100,
+                 inactividad_maxima: float = 60, timeout: float = 30,
+                 fabrica_smtp: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        """
+        Args:
+            config_email: Configuración con smtp_server, smtp_port, usuario y contraseña
+                          ('starttls': False para servidores sin STARTTLS)
+            max_conexiones: Sesiones SMTP simultáneas (y hilos de la cola)
+            mensajes_por_conexion: Mensajes por sesión antes de renovarla
+            inactividad_maxima: Segundos sin uso tras los que se descarta una sesión
+            timeout: Timeout de red de cada sesión en segundos
+            fabrica_smtp: Clase o función que crea la conexión (smtplib.SMTP por defecto)
+        """
+        self.logger = logging.getLogger('EnviadorSMTP')
+        self.logger.setLevel(logging.INFO)
+        self.config_email = config_email
+        self.max_conexiones = max(1, max_conexiones)
+        self.mensajes_por_conexion = max(1, mensajes_por_conexion)
+        self.inactividad_maxima = inactividad_maxima
+        self.timeout = timeout
+        self.fabrica_smtp = fabrica_smtp
+
+        self.conexiones_abiertas = 0
+        self.mensajes_enviados = 0
+        self.errores = 0
+        self.reintentos = 0
+
+        self._lock = threading.Lock()
+        self._libres: List[_Conexion] = []
+        self._cupos = threading.BoundedSemaphore(self.max_conexiones)
+        self._cola: Optional[queue.Queue] = None
+        self._hilos: List[threading.Thread] = []
+
+    def _abrir(self) -> _Conexion:
+        """Abre y autentica una sesión SMTP nueva"""
+        servidor = self.config_email['smtp_server']
+        puerto = self.config_email['smtp_port']
+        self.logger.info(f"Conectando a servidor SMTP: {servidor}:{puerto}")
+        smtp = self.fabrica_smtp(servidor, puerto, timeout=self.timeout)
+        try:
+            if self.config_email.get('starttls', True):
+                smtp.starttls()
+            if self.config_email.get('usuario'):
+                self.logger.info(f"Iniciando sesión como: {self.config_email['usuario']}")
+                smtp.login(self.config_email['usuario'], self.config_email.get('contraseña', ''))
+        except Exception:
+            self._descartar_smtp(smtp)
+            raise
+        with self._lock:
+            self.conexiones_abiertas += 1
+        return _Conexion(smtp)
+
+    def _descartar_smtp(self, smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _descartar(self, conexion: _Conexion):
+        self._descartar_smtp(conexion.smtp)
+
+    def _tomar(self) -> _Conexion:
+        """Devuelve una sesión libre y vigente o abre una nueva (respetando max_conexiones)"""
+        self._cupos.acquire()
+        try:
+            while True:
+                with self._lock:
+                    conexion = self._libres.pop() if self._libres else None
+                if conexion is None:
+                    return self._abrir()
+                if time.monotonic() - conexion.ultimo_uso <= self.inactividad_maxima:
+                    return conexion
+                self._descartar(conexion)
+        except Exception:
+            self._cupos.release()
+            raise
+
+    def _devolver(self, conexion: Optional[_Conexion]):
+        """Devuelve la sesión al pool (o la cierra si ya envió su cupo de mensajes)"""
+        try:
+            if conexion is not None:
+                if conexion.mensajes >= self.mensajes_por_conexion:
+                    self._descartar(conexion)
+                else:
+                    conexion.ultimo_uso = time.monotonic()
+                    with self._lock:
+                        self._libres.append(conexion)
+        finally:
+            self._cupos.release()
+
+    def enviar(self, mensaje: Message, destinatarios: List[str]) -> bool:
+        """
+        Envía un mensaje por una sesión del pool, esperando la respuesta del servidor
+
+        Args:
+            mensaje: Mensaje armado (From, To, Subject y cuerpo)
+            destinatarios: Direcciones de destino
+
+        Returns:
+            True si el servidor aceptó el mensaje
+        """
+        conexion = None
+        cupo_tomado = False
+        try:
+            conexion = self._tomar()
+            cupo_tomado = True
+            for intento in range(2):
+                try:
+                    conexion.smtp.sendmail(mensaje['From'], destinatarios, mensaje.as_string())
+                    conexion.mensajes += 1
+                    break
+                except Exception as e:
+                    if not es_error_de_sesion(e):
+                        raise
+                    # La sesión se cortó: se descarta y se reintenta una vez con otra
+                    self._descartar(conexion)
+                    conexion = None
+                    if intento == 1:
+                        raise
+                    self.logger.warning(f"Sesión SMTP cortada ({e}), reconectando")
+                    with self._lock:
+                        self.reintentos += 1
+                    conexion = self._abrir()
+
+            with self._lock:
+                self.mensajes_enviados += 1
+            self.logger.info(f"Correo enviado exitosamente a {len(destinatarios)} destinatarios")
+            return True
+
+        except Exception as e:
+            with self._lock:
+                self.errores += 1
+            self.logger.error(f"Error al enviar correo: {str(e)}")
+            return False
+        finally:
+            if cupo_tomado:
+                self._devolver(conexion)
+
+    def enviar_lote(self, mensajes: List[Tuple[Message, List[str]]]) -> List[bool]:
+        """
+        Envía varios mensajes seguidos reutilizando sesiones
+
+        Args:
+            mensajes: Lista de tuplas (mensaje, destinatarios)
+
+        Returns:
+            Lista de resultados en el mismo orden
+        """
+        return [self.enviar(mensaje, destinatarios) for mensaje, destinatarios in mensajes]
+
+    def _iniciar_cola(self) -> queue.Queue:
+        with self._lock:
+            if self._cola is not None:
+                return self._cola
+            self._cola = queue.Queue()
+            for i in range(self.max_conexiones):
+                hilo = threading.Thread(target=self._procesar_cola, args=(self._cola,),
+                                        name=f'enviador-smtp-{i}', daemon=True)
+                hilo.start()
+                self._hilos.append(hilo)
+            return self._cola
+
+    def _procesar_cola(self, cola: queue.Queue):
+        # La cola llega como argumento: cerrar() con timeout puede soltar self._cola
+        # mientras un hilo sigue enviando, y el hilo termina con su propia referencia
+        while True:
+            tarea = cola.get()
+            try:
+                if tarea is None:
+                    return
+                mensaje, destinatarios, futuro = tarea
+                if futuro.set_running_or_notify_cancel():
+                    futuro.set_result(self.enviar(mensaje, destinatarios))
+            finally:
+                cola.task_done()
+
+    def encolar(self, mensaje: Message, destinatarios: List[str]) -> Future:
+        """
+        Agrega un mensaje a la cola de envío en segundo plano
+
+        Args:
+            mensaje: Mensaje armado
+            destinatarios: Direcciones de destino
+
+        Returns:
+            Future que se resuelve con el resultado de enviar()
+        """
+        cola = self._iniciar_cola()
+        futuro = Future()
+        cola.put((mensaje, destinatarios, futuro))
+        return futuro
+
+    def pendientes(self) -> int:
+        """Mensajes en cola aún no procesados"""
+        return self._cola.unfinished_tasks if self._cola is not None else 0
+
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que la cola de envío se vacíe
+
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            True si no quedan mensajes pendientes
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while self.pendientes():
+            if limite is not None and time.monotonic() >= limite:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def cerrar(self, esperar: bool = True, timeout: Optional[float] = None):
+        """
+        Detiene la cola y cierra las sesiones abiertas
+
+        Args:
+            esperar: Si True, envía antes lo que quede en la cola
+            timeout: Segundos máximos para vaciar la cola
+        """
+        with self._lock:
+            cola, hilos = self._cola, self._hilos
+        if cola is not None:
+            if esperar:
+                self.esperar(timeout)
+            for _ in hilos:
+                cola.put(None)
+            for hilo in hilos:
+                hilo.join(timeout)
+            vivos = [hilo for hilo in hilos if hilo.is_alive()]
+            if vivos:
+                self.logger.warning(f"{len(vivos)} hilos de envío siguen activos al cerrar; terminan al acabar su envío")
+            with self._lock:
+                if self._cola is cola:
+                    self._cola = None
+                    self._hilos = []
+
+        with self._lock:
+            libres, self._libres = self._libres, []
+        for conexion in libres:
+            self._descartar(conexion)
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve los contadores del enviador
+
+        Returns:
+            Diccionario con conexiones abiertas, mensajes enviados, errores,
+            reintentos y mensajes pendientes en cola
+        """
+        return {
+            'conexiones_abiertas': self.conexiones_abiertas,
+            'mensajes_enviados': self.mensajes_enviados,
+            'errores': self.errores,
+            'reintentos': self.reintentos,
+            'pendientes': self.pendientes()
+        }
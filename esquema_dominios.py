@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Esquema columnar compacto para los DataFrames de dominios
+"""
+
+import logging
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Tipos de cada columna del DataFrame de dominios
+ESQUEMA_DOMINIOS = {
+    'dominio': 'string',
+    'fecha_expiracion': 'datetime64[us, UTC]',
+    'dias_hasta_vencimiento': 'Int32',
+    'registrar': 'category',
+    'estado': 'category',
+    'fecha_consulta': 'datetime64[us, UTC]',
+    'transferencia_bloqueada': 'boolean',
+    'suspendido': 'boolean',
+    'en_redencion': 'boolean',
+    'pendiente_eliminacion': 'boolean'
+}
+
+# Códigos de estado EPP (RFC 5731) con su forma canónica
+ESTADOS_EPP = {codigo.lower(): codigo for codigo in (
+    'ok', 'active', 'inactive', 'addPeriod', 'autoRenewPeriod', 'renewPeriod', 'transferPeriod',
+    'redemptionPeriod', 'pendingCreate', 'pendingDelete', 'pendingRenew', 'pendingRestore',
+    'pendingTransfer', 'pendingUpdate', 'clientHold', 'serverHold',
+    'clientDeleteProhibited', 'serverDeleteProhibited', 'clientRenewProhibited',
+    'serverRenewProhibited', 'clientTransferProhibited', 'serverTransferProhibited',
+    'clientUpdateProhibited', 'serverUpdateProhibited'
+)}
+
+# Indicadores booleanos derivados del estado
+INDICADORES_ESTADO = {
+    'transferencia_bloqueada': {'clientTransferProhibited', 'serverTransferProhibited'},
+    'suspendido': {'clientHold', 'serverHold'},
+    'en_redencion': {'redemptionPeriod', 'pendingRestore'},
+    'pendiente_eliminacion': {'pendingDelete'}
+}
+
+SEPARADOR_ESTADOS = ','
+
+logger = logging.getLogger('EsquemaDominios')
+logger.setLevel(logging.INFO)
+
+_LIMITE_DIAS = np.iinfo(np.int32).max
+
+
+def normalizar_estados(estado) -> List[str]:
+    """
+    Normaliza el estado WHOIS de un dominio a una lista ordenada de códigos
+
+    Acepta una cadena, una lista de cadenas o None. Se descarta la URL que
+    algunos registros agregan ("clientHold https://icann.org/epp#clientHold")
+    y los códigos EPP se devuelven con su forma canónica.
+
+    Args:
+        estado: Estado tal como lo devuelve WHOIS
+
+    Returns:
+        Lista ordenada y sin duplicados de códigos de estado
+    """
+    if estado is None or (not isinstance(estado, (list, tuple, set)) and pd.isna(estado)):
+        return []
+    if isinstance(estado, str):
+        estado = estado.split(SEPARADOR_ESTADOS)
+
+    codigos = set()
+    for valor in estado:
+        partes = str(valor).split()
+        if not partes:
+            continue
+        codigo = partes[0].strip(' ,;()')
+        codigos.add(ESTADOS_EPP.get(codigo.lower(), codigo.lower()))
+    codigos.discard('')
+    return sorted(codigos)
+
+
+def calcular_dias_serie(fechas: pd.Series, ahora: Optional[pd.Timestamp] = None) -> pd.Series:
+    """
+    Versión vectorizada de calcular_dias_hasta_vencimiento para una columna UTC
+
+    Args:
+        fechas: Serie datetime64 con zona UTC
+        ahora: Momento de referencia (por defecto ahora en UTC)
+
+    Returns:
+        Serie Int32 con los días hasta cada fecha (NA si no hay fecha)
+    """
+    ahora = ahora if ahora is not None else pd.Timestamp.now(tz='UTC')
+    return _dias_enteros((fechas - ahora).dt.days)
+
+
+def _dias_enteros(dias: pd.Series, dominios: Optional[pd.Series] = None) -> pd.Series:
+    """
+    Convierte una columna de días a Int32; los valores que no entran quedan en NA
+
+    Un marcador del registro (9999-12-31) o una fecha mal leída no debe
+    hacer fallar la conversión de toda la lectura: esos dominios se registran
+    en el log y quedan sin días, como un dominio sin fecha.
+    """
+    dias = np.floor(pd.to_numeric(dias, errors='coerce').astype('float64'))
+    fuera_de_rango = dias.abs() > _LIMITE_DIAS
+    if fuera_de_rango.any():
+        nombres = dominios[fuera_de_rango].tolist() if dominios is not None else dias.index[fuera_de_rango].tolist()
+        logger.error(f"Días hasta el vencimiento fuera de rango, se descartan: {nombres}")
+        dias = dias.mask(fuera_de_rango)
+    return dias.astype('Int32')
+
+
+def _a_utc(serie: pd.Series, naive_local: bool) -> pd.Series:
+    """Convierte una columna de fechas (naive, con zona o mezcladas) a datetime64 UTC"""
+    if isinstance(serie.dtype, pd.DatetimeTZDtype):
+        convertida = serie.dt.tz_convert('UTC')
+    elif naive_local and pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        zona_local = datetime.now().astimezone().tzinfo
+        convertida = serie.dt.tz_localize(zona_local).dt.tz_convert('UTC')
+    else:
+        # Las fechas WHOIS sin zona vienen en UTC
+        convertida = pd.to_datetime(serie, utc=True, errors='coerce')
+    return convertida.astype(ESQUEMA_DOMINIOS['fecha_expiracion'])
+
+
+def aplicar_esquema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convierte un DataFrame de dominios al esquema compacto
+
+    fecha_expiracion pasa a datetime64 UTC (las fechas sin zona se toman
+    como UTC); fecha_consulta, que se genera con datetime.now(), se toma
+    como hora local. registrar y estado pasan a categóricos, el estado se
+    normaliza a códigos EPP separados por comas y se derivan los indicadores
+    booleanos de INDICADORES_ESTADO. Es idempotente.
+
+    Args:
+        df: DataFrame devuelto por AgenteLector (o ya convertido)
+
+    Returns:
+        Nuevo DataFrame con los tipos de ESQUEMA_DOMINIOS
+    """
+    if df.empty:
+        return df
+
+    df = df.copy()
+    if 'dominio' in df:
+        df['dominio'] = df['dominio'].astype('string')
+    if 'fecha_expiracion' in df:
+        df['fecha_expiracion'] = _a_utc(df['fecha_expiracion'], naive_local=False)
+    if 'fecha_consulta' in df:
+        df['fecha_consulta'] = _a_utc(df['fecha_consulta'], naive_local=True)
+    if 'dias_hasta_vencimiento' in df:
+        df['dias_hasta_vencimiento'] = _dias_enteros(df['dias_hasta_vencimiento'], df.get('dominio'))
+    if 'registrar' in df:
+        registrar = df['registrar'].astype('object').where(df['registrar'].notna(), None)
+        df['registrar'] = registrar.map(lambda valor: str(valor).strip() if valor is not None else None).astype('category')
+
+    if 'estado' in df:
+        # Los mismos estados se repiten en toda la cartera: se normaliza cada valor distinto una sola vez
+        claves = df['estado'].astype('object').map(
+            lambda valor: tuple(valor) if isinstance(valor, (list, tuple, set)) else valor
+        )
+        # Una columna sin ningún estado sale de map() como float64 y where() dejaría NaN
+        claves = claves.astype('object').where(claves.notna(), None)
+        normalizados = {clave: normalizar_estados(clave) for clave in pd.unique(claves)}
+        estados = claves.map(lambda clave: SEPARADOR_ESTADOS.join(normalizados[clave]) or None)
+        df['estado'] = estados.astype('category')
+
+        for indicador, codigos in INDICADORES_ESTADO.items():
+            por_valor = {clave: bool(codigos.intersection(lista)) for clave, lista in normalizados.items()}
+            df[indicador] = claves.map(lambda clave: por_valor[clave]).astype('boolean')
+
+    return df
+
+
+def reporte_memoria(df: pd.DataFrame) -> Dict:
+    """
+    Calcula el uso de memoria de un DataFrame de dominios
+
+    Args:
+        df: DataFrame a medir
+
+    Returns:
+        Diccionario con filas, bytes totales, bytes por fila y bytes por columna
+    """
+    por_columna = df.memory_usage(deep=True, index=False)
+    total = int(por_columna.sum())
+    return {
+        'filas': len(df),
+        'bytes_total': total,
+        'bytes_por_fila': round(total / len(df), 1) if len(df) else 0.0,
+        'columnas': {columna: int(bytes_) for columna, bytes_ in por_columna.items()}
+    }
+
+
+def formatear_bytes(cantidad: float) -> str:
+    """
+    Formatea una cantidad de bytes en la unidad más legible
+
+    Args:
+        cantidad: Número de bytes
+
+    Returns:
+        Texto como "12.3 MB"
+    """
+    for unidad in ('B', 'KB', 'MB', 'GB'):
+        if cantidad < 1024 or unidad == 'GB':
+            return f"{cantidad:.1f} {unidad}" if unidad != 'B' else f"{int(cantidad)} B"
+        cantidad /= 1024
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Estado persistente (SQLite) de las alertas por dominio para no repetir notificaciones
+"""
+
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from cache_whois import DIA, normalizar_dominio
+from clasificacion_alertas import ClasificadorAlertas, NIVELES_ALERTA
+
+# Motivos por los que una alerta se notifica
+MOTIVOS_NOTIFICACION = ['nuevo', 'escalada', 'recordatorio']
+
+# Cada cuánto se vuelve a notificar una alerta que no cambió de nivel (None = nunca)
+RECORDATORIOS = {'CRÍTICO': 7 * DIA, 'ADVERTENCIA': 30 * DIA}
+
+NIVEL_NORMAL = NIVELES_ALERTA.index('NORMAL')
+
+
+class EstadoAlertas:
+    """
+    Recuerda el nivel de alerta de cada dominio y cuándo se notificó
+
+    Un dominio se notifica cuando entra en alerta, cuando sube de nivel
+    respecto de la última notificación o cuando pasó el intervalo de
+    recordatorio de su nivel. Para bajar de nivel los días tienen que
+    superar el umbral en histeresis_dias, así un dominio que oscila entre
+    30 y 31 días no alterna entre CRÍTICO y ADVERTENCIA. Al volver a
+    NORMAL (renovación) la alerta se da por resuelta y la próxima vez
+    que entre en alerta se notifica como nueva.
+
+    Los dominios sin días conocidos (error de consulta) conservan su estado.
+    """
+
+    def __init__(self, ruta: str = 'estado_alertas.db', recordatorios: Optional[Dict[str, Optional[int]]] = None,
+                 histeresis_dias: int = 3):
+        """
+        Args:
+            ruta: Archivo SQLite del estado
+            recordatorios: Segundos entre recordatorios por nivel ('CRÍTICO', 'ADVERTENCIA');
+                           None en un nivel desactiva sus recordatorios
+            histeresis_dias: Días por encima del umbral necesarios para bajar de nivel
+        """
+        self.logger = logging.getLogger('EstadoAlertas')
+        self.logger.setLevel(logging.INFO)
+        self.ruta = ruta
+        self.recordatorios = {**RECORDATORIOS, **(recordatorios or {})}
+        self.histeresis_dias = histeresis_dias
+
+        self.cerrado = False
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, check_same_thread=False)
+        with self._conexion:
+            # nivel: índice en NIVELES_ALERTA (0 crítico, 1 advertencia, 2 normal)
+            self._conexion.execute(
+                'CREATE TABLE IF NOT EXISTS alertas ('
+                'dominio TEXT PRIMARY KEY, nivel INTEGER NOT NULL, dias INTEGER, '
+                'nivel_notificado INTEGER, notificado REAL, actualizado REAL NOT NULL)'
+            )
+
+    def _cargar(self) -> pd.DataFrame:
+        with self._lock:
+            filas = self._conexion.execute(
+                'SELECT dominio, nivel, nivel_notificado, notificado FROM alertas'
+            ).fetchall()
+        estado = pd.DataFrame(filas, columns=['dominio', 'nivel', 'nivel_notificado', 'notificado'])
+        return estado.set_index('dominio').astype('float64')
+
+    def evaluar(self, dominios: pd.Series, dias: pd.Series, clasificador: ClasificadorAlertas,
+                ahora: Optional[float] = None) -> pd.DataFrame:
+        """
+        Compara la evaluación actual con el estado guardado (no escribe nada)
+
+        Args:
+            dominios: Serie con los nombres de dominio
+            dias: Serie con días hasta vencimiento (mismo índice que dominios)
+            clasificador: Clasificador con los umbrales vigentes
+            ahora: Momento de referencia en epoch (por defecto ahora)
+
+        Returns:
+            DataFrame con el índice de dominios y las columnas clave, dias, nivel
+            (con histéresis), nivel_alerta, notificar, motivo y resuelto
+        """
+        ahora = time.time() if ahora is None else ahora
+        claves = dominios.astype(str).map(normalizar_dominio)
+        conocido = dias.notna().to_numpy()
+        codigos = clasificador.codigos(dias).astype('float64')
+        relajado = ClasificadorAlertas(clasificador.umbral_critico + self.histeresis_dias,
+                                       clasificador.umbral_advertencia + self.histeresis_dias).codigos(dias)
+
+        previo = self._cargar().reindex(claves.to_numpy())
+        nivel_previo = previo['nivel'].to_numpy()
+        nivel_notificado = previo['nivel_notificado'].to_numpy()
+        notificado = previo['notificado'].to_numpy()
+
+        # Subir de nivel es inmediato; bajar exige superar el umbral más la histéresis
+        nivel = np.where(np.isnan(nivel_previo) | (codigos <= nivel_previo),
+                         codigos, np.maximum(nivel_previo, relajado))
+        # Sin días conocidos se conserva el nivel anterior
+        nivel = np.where(conocido, nivel, nivel_previo)
+
+        intervalos = np.array([
+            np.inf if self.recordatorios.get(etiqueta) is None else self.recordatorios[etiqueta]
+            for etiqueta in NIVELES_ALERTA
+        ])
+        en_alerta = conocido & (nivel < NIVEL_NORMAL)
+        indice_nivel = np.nan_to_num(nivel, nan=NIVEL_NORMAL).astype('int64')
+        sin_notificar = np.isnan(nivel_notificado)
+
+        nuevo = en_alerta & sin_notificar
+        escalada = en_alerta & ~sin_notificar & (nivel < nivel_notificado)
+        recordatorio = en_alerta & ~sin_notificar & ~escalada & (ahora - notificado >= intervalos[indice_nivel])
+        motivo = np.select([nuevo, escalada, recordatorio], [0, 1, 2], default=-1)
+
+        return pd.DataFrame({
+            'clave': claves.to_numpy(),
+            'dias': dias.to_numpy(),
+            'nivel': pd.array(np.where(np.isnan(nivel), pd.NA, nivel), dtype='Int8'),
+            'nivel_alerta': pd.Categorical.from_codes(np.where(np.isnan(nivel), -1, nivel).astype('int8'),
+                                                      categories=NIVELES_ALERTA, ordered=True),
+            'notificar': motivo >= 0,
+            'motivo': pd.Categorical.from_codes(motivo, categories=MOTIVOS_NOTIFICACION),
+            'resuelto': conocido & (nivel == NIVEL_NORMAL) & ~sin_notificar
+        }, index=dominios.index)
+
+    def registrar_niveles(self, evaluacion: pd.DataFrame, ahora: Optional[float] = None):
+        """
+        Guarda el nivel actual de cada dominio evaluado con días conocidos
+
+        Las alertas resueltas pierden su última notificación, de modo que
+        una alerta futura se notifica como nueva.
+
+        Args:
+            evaluacion: DataFrame devuelto por evaluar()
+            ahora: Momento de referencia en epoch (por defecto ahora)
+        """
+        ahora = time.time() if ahora is None else ahora
+        conocidos = evaluacion[evaluacion['dias'].notna() & evaluacion['nivel'].notna()]
+        filas = [
+            (clave, int(nivel), None if pd.isna(dias) else int(dias), bool(resuelto), ahora)
+            for clave, nivel, dias, resuelto in zip(conocidos['clave'], conocidos['nivel'],
+                                                    conocidos['dias'], conocidos['resuelto'])
+        ]
+        with self._lock:
+            with self._conexion:
+                self._conexion.executemany(
+                    'INSERT INTO alertas (dominio, nivel, dias, actualizado) VALUES (?1, ?2, ?3, ?5) '
+                    'ON CONFLICT(dominio) DO UPDATE SET nivel = ?2, dias = ?3, actualizado = ?5, '
+                    'nivel_notificado = CASE WHEN ?4 THEN NULL ELSE nivel_notificado END, '
+                    'notificado = CASE WHEN ?4 THEN NULL ELSE notificado END',
+                    filas
+                )
+
+    def marcar_notificados(self, evaluacion: pd.DataFrame, ahora: Optional[float] = None) -> int:
+        """
+        Registra que las alertas pendientes de la evaluación ya se notificaron
+
+        Args:
+            evaluacion: DataFrame devuelto por evaluar() (o sus filas a notificar)
+            ahora: Momento de la notificación en epoch (por defecto ahora)
+
+        Returns:
+            Cantidad de dominios marcados
+        """
+        ahora = time.time() if ahora is None else ahora
+        pendientes = evaluacion[evaluacion['notificar']]
+        filas = [(int(nivel), ahora, clave) for clave, nivel in zip(pendientes['clave'], pendientes['nivel'])]
+        with self._lock:
+            with self._conexion:
+                self._conexion.executemany(
+                    'UPDATE alertas SET nivel_notificado = ?, notificado = ? WHERE dominio = ?', filas
+                )
+        self.logger.info(f"{len(filas)} alertas marcadas como notificadas")
+        return len(filas)
+
+    def invalidar(self, dominio: Optional[str] = None):
+        """
+        Olvida el estado de un dominio, o de todos si no se indica
+
+        Args:
+            dominio: Dominio a olvidar (None para vaciar el estado)
+        """
+        with self._lock:
+            with self._conexion:
+                if dominio is None:
+                    self._conexion.execute('DELETE FROM alertas')
+                else:
+                    self._conexion.execute('DELETE FROM alertas WHERE dominio = ?', (normalizar_dominio(dominio),))
+
+    def estadisticas(self) -> Dict:
+        """
+        Devuelve cuántos dominios hay guardados por nivel
+
+        Returns:
+            Diccionario nivel -> cantidad de dominios
+        """
+        with self._lock:
+            filas = self._conexion.execute('SELECT nivel, COUNT(*) FROM alertas GROUP BY nivel').fetchall()
+        conteos = dict(filas)
+        return {etiqueta: conteos.get(i, 0) for i, etiqueta in enumerate(NIVELES_ALERTA)}
+
+    def cerrar(self):
+        """Cierra la conexión a la base de datos"""
+        with self._lock:
+            self._conexion.close()
+            self.cerrado = True
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Instantánea inmutable de una ronda de consultas de dominios
+"""
+
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class InstantaneaMonitoreo:
+    """
+    Resultado de consultar una lista de dominios una sola vez
+
+    La producen AgentePrincipal.crear_instantanea y monitorear_dominios, y la
+    leen InterfazPandas, AgenteDecisor, la aplicación web y el asistente, de
+    modo que cada dominio se consulta exactamente una vez por ejecución.
+    Los datos no se pueden modificar: las propiedades devuelven copias.
+    """
+
+    __slots__ = ('_dominios', '_dataframe', '_estadisticas', '_timestamp')
+
+    def __init__(self, dominios: Iterable[str], dataframe: pd.DataFrame,
+                 estadisticas: Optional[Dict] = None, timestamp: Optional[datetime] = None):
+        """
+        Args:
+            dominios: Dominios solicitados (en el orden original)
+            dataframe: DataFrame devuelto por AgenteLector.leer_dominios
+            estadisticas: Estadísticas de la consulta (AgenteLector.estadisticas_ejecucion)
+            timestamp: Momento de la consulta (por defecto ahora)
+        """
+        object.__setattr__(self, '_dominios', tuple(dominios))
+        object.__setattr__(self, '_dataframe', dataframe.copy())
+        object.__setattr__(self, '_estadisticas', dict(estadisticas or {}))
+        object.__setattr__(self, '_timestamp', timestamp or datetime.now())
+
+    def __setattr__(self, nombre, valor):
+        raise AttributeError("InstantaneaMonitoreo es inmutable")
+
+    def __len__(self) -> int:
+        return len(self._dataframe)
+
+    def __repr__(self) -> str:
+        return (f"InstantaneaMonitoreo({len(self._dominios)} dominios, "
+                f"{len(self._dataframe)} con datos, {self._timestamp:%Y-%m-%d %H:%M:%S})")
+
+    @property
+    def dominios(self) -> Tuple[str, ...]:
+        return self._dominios
+
+    @property
+    def dataframe(self) -> pd.DataFrame:
+        """Copia del DataFrame de la consulta"""
+        return self._dataframe.copy()
+
+    @property
+    def estadisticas(self) -> Dict:
+        return dict(self._estadisticas)
+
+    @property
+    def timestamp(self) -> datetime:
+        return self._timestamp
+
+    @property
+    def vacia(self) -> bool:
+        return self._dataframe.empty
+
+    def corresponde_a(self, lista_dominios: List[str]) -> bool:
+        """
+        Indica si la instantánea se tomó para la misma lista de dominios
+
+        Args:
+            lista_dominios: Lista de dominios a comparar
+
+        Returns:
+            True si los dominios coinciden (sin importar el orden)
+        """
+        return sorted(self._dominios) == sorted(lista_dominios)
+
+    def info_dominio(self, dominio: str) -> Optional[Dict]:
+        """
+        Devuelve la fila de un dominio como diccionario
+
+        Args:
+            dominio: Nombre del dominio
+
+        Returns:
+            Diccionario con la información del dominio o None si no está
+        """
+        if self._dataframe.empty:
+            return None
+        filas = self._dataframe[self._dataframe['dominio'].str.lower() == dominio.lower()]
+        if filas.empty:
+            return None
+        return filas.iloc[0].to_dict()
@@ -4,7 +4,8 @@ from datetime import datetime, timedelta
 import matplotlib.pyplot as plt
 import seaborn as sns
 from agente_principal import AgentePrincipal
-from typing import List, Dict
+from instantanea_monitoreo import InstantaneaMonitoreo
+from typing import List, Dict, Optional
 
 class InterfazPandas:
     """
@@ -14,8 +15,33 @@ class InterfazPandas:
     def __init__(self, agente_principal: AgentePrincipal):
         self.agente = agente_principal
         self.df_actual = None
+        self.instantanea = None
+    
+    def cargar_instantanea(self, instantanea: InstantaneaMonitoreo):
+        """
+        Usa una instantánea ya tomada (por ejemplo la de monitorear_dominios)
         
-    def crear_tablero_resumen(self, lista_dominios: List[str]) -> pd.DataFrame:
+        Args:
+            instantanea: Instantánea de la ejecución actual
+        """
+        self.instantanea = instantanea
+        self.df_actual = self.agente.obtener_reporte_pandas(instantanea=instantanea)
+    
+    def _actualizar_datos(self, lista_dominios: Optional[List[str]] = None):
+        """
+        Carga los datos de los dominios consultándolos solo si la instantánea
+        actual no corresponde a la lista solicitada
+        
+        Args:
+            lista_dominios: Lista de dominios a analizar (None reutiliza la instantánea actual)
+        """
+        if self.instantanea is not None and (lista_dominios is None or self.instantanea.corresponde_a(lista_dominios)):
+            if self.df_actual is None:
+                self.df_actual = self.agente.obtener_reporte_pandas(instantanea=self.instantanea)
+            return
+        self.cargar_instantanea(self.agente.crear_instantanea(lista_dominios or []))
+        
+    def crear_tablero_resumen(self, lista_dominios: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Crea un tablero resumen con información clave
         
@@ -25,12 +51,14 @@ class InterfazPandas:
         Returns:
             DataFrame con tablero resumen
         """
-        # Obtener datos del agente
-        self.df_actual = self.agente.obtener_reporte_pandas(lista_dominios)
+        # Obtener datos del agente (reutiliza la instantánea si ya existe)
+        self._actualizar_datos(lista_dominios)
         
         if self.df_actual.empty:
             return pd.DataFrame()
         
+        mascaras = self.agente.clasificador.mascaras(self.df_actual)
+        
         # Crear tablero resumen
         resumen_data = {
             'Métrica': [
@@ -44,10 +72,10 @@ class InterfazPandas:
             ],
             'Valor': [
                 len(self.df_actual),
-                len(self.df_actual[self.df_actual['dias_hasta_vencimiento'] <= 30]),
-                len(self.df_actual[(self.df_actual['dias_hasta_vencimiento'] > 30) & 
-                                 (self.df_actual['dias_hasta_vencimiento'] <= 50)]),
-                len(self.df_actual[self.df_actual['dias_hasta_vencimiento'] > 50]),
+                int(mascaras['critico'].sum()),
+                int(mascaras['advertencia'].sum()),
+                # El clasificador toma como normales los días desconocidos; aquí solo cuentan los >50
+                int((mascaras['normal'] & self.df_actual['dias_hasta_vencimiento'].notna().to_numpy()).sum()),
                 f"{self.df_actual['dias_hasta_vencimiento'].mean():.1f} días",
                 self.df_actual.loc[self.df_actual['dias_hasta_vencimiento'].idxmin(), 'dominio'] if not self.df_actual.empty else 'N/A',
                 self.df_actual.loc[self.df_actual['dias_hasta_vencimiento'].idxmin(), 'fecha_expiracion'].strftime('%Y-%m-%d') if not self.df_actual.empty else 'N/A'
@@ -139,7 +167,7 @@ class InterfazPandas:
         """
         try:
             # Actualizar datos
-            self.df_actual = self.agente.obtener_reporte_pandas(lista_dominios)
+            self._actualizar_datos(lista_dominios)
             
             if self.df_actual.empty:
                 print("No hay datos para exportar")
@@ -189,7 +217,7 @@ class InterfazPandas:
         print("="*80)
         
         # Actualizar datos
-        self.df_actual = self.agente.obtener_reporte_pandas(lista_dominios)
+        self._actualizar_datos(lista_dominios)
         
         if self.df_actual.empty:
             print("No se pudo obtener información de los dominios")
@@ -229,8 +257,10 @@ class InterfazPandas:
         
         alertas = []
         
+        mascaras = self.agente.clasificador.mascaras(self.df_actual)
+        
         # Alertas críticas
-        criticos = self.df_actual[self.df_actual['dias_hasta_vencimiento'] <= 30]
+        criticos = self.df_actual[mascaras['critico']]
         for _, dominio in criticos.iterrows():
             alertas.append({
                 'tipo': '🚨 CRÍTICO',
@@ -240,8 +270,7 @@ class InterfazPandas:
             })
         
         # Alertas de advertencia
-        advertencias = self.df_actual[(self.df_actual['dias_hasta_vencimiento'] > 30) & 
-                                     (self.df_actual['dias_hasta_vencimiento'] <= 50)]
+        advertencias = self.df_actual[mascaras['advertencia']]
         for _, dominio in advertencias.iterrows():
             alertas.append({
                 'tipo': '⚠️ ADVERTENCIA',
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Lectura de dominios repartida en fragmentos entre varios procesos
+"""
+
+import multiprocessing
+import time
+import zlib
+import logging
+import logging.handlers
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+from agente_lector import AgenteLector
+from cache_whois import CacheWhois, normalizar_dominio
+from esquema_dominios import aplicar_esquema
+from metricas_monitoreo import MetricasMonitoreo
+from planificador_whois import PlanificadorWhois
+
+ASIGNACIONES = ('hash', 'tld')
+
+
+def fragmento_dominio(dominio: str, fragmentos: int,
+                      asignacion: Union[str, Callable[[str], int]] = 'hash') -> int:
+    """
+    Calcula el fragmento de un dominio de forma estable entre ejecuciones y procesos
+
+    hash() de Python cambia en cada proceso (PYTHONHASHSEED), por eso se usa CRC32.
+
+    Args:
+        dominio: Nombre del dominio
+        fragmentos: Cantidad de fragmentos
+        asignacion: 'hash' (dominio normalizado), 'tld' (todos los dominios de un
+                    TLD, y por lo tanto de un servidor WHOIS, en el mismo fragmento)
+                    o una función dominio -> entero
+
+    Returns:
+        Número de fragmento entre 0 y fragmentos - 1
+    """
+    if callable(asignacion):
+        return asignacion(dominio) % fragmentos
+    clave = normalizar_dominio(dominio)
+    if asignacion == 'tld':
+        clave = clave.rsplit('.', 1)[-1]
+    return zlib.crc32(clave.encode('utf-8')) % fragmentos
+
+
+def repartir_dominios(lista_dominios: List[str], fragmentos: int,
+                      asignacion: Union[str, Callable[[str], int]] = 'hash') -> List[List[str]]:
+    """
+    Reparte una lista de dominios en fragmentos (se omiten los vacíos)
+
+    Args:
+        lista_dominios: Dominios a repartir
+        fragmentos: Cantidad de fragmentos
+        asignacion: Criterio de fragmento_dominio
+
+    Returns:
+        Lista de fragmentos, cada uno con sus dominios en el orden original
+    """
+    partes = [[] for _ in range(fragmentos)]
+    for dominio in lista_dominios:
+        partes[fragmento_dominio(dominio, fragmentos, asignacion)].append(dominio)
+    return [parte for parte in partes if parte]
+
+
+class _ReenvioLog(logging.Handler):
+    """Entrega los registros de los procesos hijos al logger del mismo nombre en este proceso"""
+
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger(record.name).handle(record)
+
+
+# Lector del proceso hijo, creado una vez por proceso en _iniciar_proceso
+_lector: Optional[AgenteLector] = None
+
+
+def _iniciar_proceso(opciones: Dict, cola_log):
+    """Inicializador de cada proceso: logging hacia el padre y un AgenteLector propio"""
+    global _lector
+    raiz = logging.getLogger()
+    raiz.handlers = [logging.handlers.QueueHandler(cola_log)]
+    raiz.setLevel(logging.INFO)
+
+    planificador = PlanificadorWhois() if opciones['limitar_tasa_whois'] else None
+    cache = CacheWhois(opciones['ruta_cache_whois']) if opciones['ruta_cache_whois'] else None
+    _lector = AgenteLector(max_workers=opciones['max_workers'], backend=opciones['backend_whois'],
+                           planificador=planificador, cache=cache, metricas=MetricasMonitoreo())
+
+
+def _leer_fragmento(dominios: List[str], usar_cache: bool):
+    """Lee un fragmento en el proceso hijo; devuelve (DataFrame, estadísticas, contadores de consultas)"""
+    _lector.metricas.reiniciar()
+    escrituras = _lector.cache.escrituras if _lector.cache is not None else 0
+    df = _lector.leer_dominios(dominios, usar_cache=usar_cache)
+    estadisticas = dict(_lector.estadisticas_ejecucion)
+    if _lector.cache is not None:
+        estadisticas['escrituras_cache'] = _lector.cache.escrituras - escrituras
+    return df, estadisticas, _lector.metricas.consultas_como_diccionario()
+
+
+class LectorFragmentado:
+    """
+    Reparte la lectura de dominios entre procesos para no quedar limitado por el GIL
+
+    El parseo de python-whois es trabajo de expresiones regulares en
+    Python y con hilos no escala más allá de un núcleo. La lista se divide
+    en fragmentos por un hash estable del dominio; cada fragmento lo lee
+    un AgenteLector propio de un proceso del pool (con sus hilos o su event
+    loop) y los DataFrames se unen en el orden de la lista original.
+
+    El pool se crea en la primera lectura y se reutiliza hasta cerrar().
+    Los procesos se inician con 'spawn' (el proceso padre tiene hilos de
+    logging y de correo) y envían sus registros de log al padre. Cada
+    proceso abre la cache WHOIS por su cuenta y tiene su propio
+    planificador: con asignacion='tld' cada servidor WHOIS queda en un solo
+    proceso y los límites por servidor se siguen respetando; con 'hash' el
+    límite efectivo se multiplica por la cantidad de procesos.
+
+    Tiene la misma interfaz de lectura que AgenteLector (leer_dominios,
+    iterar_dominios y estadisticas_ejecucion).
+    """
+
+    def __init__(self, procesos: int, fragmentos: Optional[int] = None,
+                 asignacion: Union[str, Callable[[str], int]] = 'hash', max_workers: int = 1,
+                 backend_whois: str = 'whois', limitar_tasa_whois: bool = False,
+                 ruta_cache_whois: Optional[str] = None, metricas: Optional[MetricasMonitoreo] = None):
+        """
+        Args:
+            procesos: Procesos del pool
+            fragmentos: Fragmentos en que se divide cada lectura (por defecto uno por
+                        proceso; más fragmentos reparten mejor la carga si hay dominios lentos)
+            asignacion: 'hash', 'tld' o función dominio -> entero (ver fragmento_dominio)
+            max_workers: Consultas WHOIS simultáneas dentro de cada proceso
+            backend_whois: Backend WHOIS de cada proceso ('whois' o 'asincrono')
+            limitar_tasa_whois: Si True, cada proceso usa un PlanificadorWhois
+            ruta_cache_whois: Archivo SQLite de cache WHOIS compartido por los procesos
+            metricas: MetricasMonitoreo donde sumar las consultas de los procesos
+        """
+        if not callable(asignacion) and asignacion not in ASIGNACIONES:
+            raise ValueError(f"Asignación de fragmentos no soportada: {asignacion}. Opciones: {', '.join(ASIGNACIONES)}")
+        self.logger = logging.getLogger('LectorFragmentado')
+        self.logger.setLevel(logging.INFO)
+        self.procesos = max(1, procesos)
+        self.fragmentos = max(1, fragmentos or self.procesos)
+        self.asignacion = asignacion
+        self.metricas = metricas
+        self.opciones = {
+            'max_workers': max_workers,
+            'backend_whois': backend_whois,
+            'limitar_tasa_whois': limitar_tasa_whois,
+            'ruta_cache_whois': ruta_cache_whois
+        }
+        self.cache = None
+        self.estadisticas_ejecucion = {}
+
+        self._contexto = multiprocessing.get_context('spawn')
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._cola_log = None
+        self._escuchador_log: Optional[logging.handlers.QueueListener] = None
+
+    def _obtener_pool(self) -> ProcessPoolExecutor:
+        """Crea el pool y el reenvío de logs la primera vez"""
+        if self._pool is None:
+            if self._escuchador_log is None:
+                self._cola_log = self._contexto.Queue()
+                self._escuchador_log = logging.handlers.QueueListener(self._cola_log, _ReenvioLog())
+                self._escuchador_log.start()
+            self._pool = ProcessPoolExecutor(max_workers=self.procesos, mp_context=self._contexto,
+                                             initializer=_iniciar_proceso, initargs=(self.opciones, self._cola_log))
+        return self._pool
+
+    def _iterar_fragmentos(self, lista_dominios: List[str], usar_cache: bool) -> Iterator[pd.DataFrame]:
+        """
+        Lanza un fragmento por tarea y entrega cada DataFrame al terminar
+
+        Un fragmento que falla (o un proceso que muere) se registra como error
+        y sus dominios quedan sin datos, igual que una consulta fallida.
+        Al agotarse el iterador se actualiza self.estadisticas_ejecucion.
+        """
+        inicio = time.perf_counter()
+        partes = repartir_dominios(lista_dominios, self.fragmentos, self.asignacion)
+        pool = self._obtener_pool()
+        futuros = {pool.submit(_leer_fragmento, parte, usar_cache): parte for parte in partes}
+
+        estadisticas = []
+        for futuro in as_completed(futuros):
+            try:
+                df, estadisticas_fragmento, consultas = futuro.result()
+            except Exception as e:
+                self.logger.error(f"Error en el fragmento de {len(futuros[futuro])} dominios: {str(e)}")
+                if isinstance(e, BrokenProcessPool):
+                    # El pool no se puede reutilizar: se recrea en la próxima lectura
+                    self._pool = None
+                continue
+            estadisticas.append(estadisticas_fragmento)
+            if self.metricas is not None:
+                self.metricas.sumar_consultas(consultas)
+            yield df
+
+        self._registrar_estadisticas(len(lista_dominios), len(partes), estadisticas, time.perf_counter() - inicio,
+                                     usar_cache)
+
+    def _registrar_estadisticas(self, total: int, fragmentos: int, estadisticas: List[Dict], duracion: float,
+                                usar_cache: bool = True):
+        """
+        Suma las estadísticas de los fragmentos en self.estadisticas_ejecucion
+
+        Cada proceso tiene su propia CacheWhois, así que el uso de la cache de
+        la lectura ('cache', con el formato de CacheWhois.estadisticas) se arma
+        con los aciertos sumados de los fragmentos.
+        """
+        def suma(clave: str) -> int:
+            return sum(e.get(clave, 0) for e in estadisticas)
+
+        exitosos = suma('exitosos')
+        self.estadisticas_ejecucion = {
+            'total_dominios': total,
+            'exitosos': exitosos,
+            'errores': total - exitosos,
+            'consultas_whois': suma('consultas_whois'),
+            'aciertos_cache': suma('aciertos_cache'),
+            'sin_dns': suma('sin_dns'),
+            'workers': max((e.get('workers', 0) for e in estadisticas), default=0) * min(self.procesos, fragmentos),
+            'procesos': self.procesos,
+            'fragmentos': fragmentos,
+            'duracion_segundos': round(duracion, 3),
+            'dominios_por_segundo': round(total / duracion, 2) if duracion > 0 else 0.0
+        }
+        if self.opciones['ruta_cache_whois']:
+            aciertos = suma('aciertos_cache')
+            fallos = total - aciertos if usar_cache else 0
+            self.estadisticas_ejecucion['cache'] = {
+                'aciertos': aciertos,
+                'fallos': fallos,
+                'escrituras': suma('escrituras_cache'),
+                'tasa_aciertos': round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else 0.0
+            }
+        self.logger.info(
+            f"Se procesaron {exitosos} dominios exitosamente en {duracion:.1f}s "
+            f"({self.estadisticas_ejecucion['dominios_por_segundo']} dominios/s, "
+            f"{fragmentos} fragmentos en {self.procesos} procesos)"
+        )
+
+    def leer_dominios(self, lista_dominios: List[str], usar_cache: bool = True) -> pd.DataFrame:
+        """
+        Lee los dominios en paralelo por fragmentos y une los resultados
+
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            usar_cache: Si False, ignora la cache y consulta todos los dominios
+
+        Returns:
+            DataFrame con el esquema compacto, en el orden de lista_dominios
+        """
+        bloques = [df for df in self._iterar_fragmentos(lista_dominios, usar_cache) if not df.empty]
+        if not bloques:
+            return aplicar_esquema(pd.DataFrame())
+
+        # concat de categóricos con distintas categorías da object: se reaplica el esquema
+        df = aplicar_esquema(pd.concat(bloques, ignore_index=True))
+        posicion = {dominio: i for i, dominio in reversed(list(enumerate(lista_dominios)))}
+        return df.sort_values('dominio', key=lambda serie: serie.map(posicion), kind='stable').reset_index(drop=True)
+
+    def iterar_dominios(self, lista_dominios: List[str], usar_cache: bool = True) -> Iterator[Dict]:
+        """
+        Entrega la información de cada dominio a medida que termina su fragmento
+
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            usar_cache: Si False, ignora la cache y consulta todos los dominios
+
+        Yields:
+            Diccionario con información de un dominio
+        """
+        for df in self._iterar_fragmentos(lista_dominios, usar_cache):
+            yield from df.astype('object').where(df.notna(), None).to_dict('records')
+
+    def cerrar(self):
+        """Termina los procesos del pool y el reenvío de logs"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self._escuchador_log is not None:
+            self._escuchador_log.stop()
+            self._escuchador_log = None
@@ -9,6 +9,9 @@ import argparse
 from agente_principal import AgentePrincipal
 from interfaz_pandas import InterfazPandas
 from config_email import obtener_config_email, configurar_correo_manual
+from cache_whois import DIA, HORA
+from registro_alertas import RegistroAlertas
+from demonio_monitoreo import DemonioMonitoreo, leer_archivo_dominios
 
 def main():
     """
@@ -24,6 +27,62 @@ def main():
     parser.add_argument('--exportar', '-e', help='Exportar reporte a Excel')
     parser.add_argument('--interactivo', action='store_true', 
                        help='Ejecutar en modo interactivo')
+    parser.add_argument('--workers', '-w', type=int, default=1,
+                       help='Consultas WHOIS simultáneas (por defecto 1, secuencial)')
+    parser.add_argument('--procesos', type=int, default=1,
+                       help='Procesos entre los que se reparte la lectura WHOIS (por defecto 1; cada uno con --workers consultas)')
+    parser.add_argument('--fragmentos', type=int,
+                       help='Fragmentos en que se divide la lista de dominios (por defecto uno por proceso)')
+    parser.add_argument('--asignacion-fragmentos', choices=['hash', 'tld'], default='hash',
+                       help='Reparto de dominios: hash estable del dominio o por TLD (un servidor WHOIS por proceso)')
+    parser.add_argument('--backend-whois', choices=['whois', 'asincrono'], default='whois',
+                       help='Cliente WHOIS: python-whois o cliente asyncio propio (puerto 43)')
+    parser.add_argument('--limitar-tasa', action='store_true',
+                       help='Aplicar límite de tasa y concurrencia por servidor WHOIS')
+    parser.add_argument('--cache-whois', metavar='RUTA',
+                       help='Archivo SQLite para cachear resultados WHOIS entre ejecuciones')
+    parser.add_argument('--sin-cache', action='store_true',
+                       help='Ignorar la cache WHOIS en esta ejecución (los resultados sí se guardan)')
+    parser.add_argument('--progreso', action='store_true',
+                       help='Mostrar cada dominio en cuanto se obtiene su información')
+    parser.add_argument('--incremental', action='store_true',
+                       help='Re-consultar solo dominios nuevos, antiguos o en ventana de alerta')
+    parser.add_argument('--estado', default='estado_monitoreo.pkl',
+                       help='Archivo con el estado de la ejecución anterior (modo incremental)')
+    parser.add_argument('--metricas-prometheus', metavar='RUTA',
+                       help='Archivo .prom donde escribir las métricas de la ejecución (textfile collector de node_exporter)')
+    parser.add_argument('--trazas', metavar='RUTA',
+                       help='Archivo de trazas por dominio: .jsonl (JSON lines) u otro (Chrome trace para chrome://tracing)')
+    parser.add_argument('--correo-segundo-plano', action='store_true',
+                       help='Encolar el correo y enviarlo en segundo plano mientras continúa la ejecución')
+    parser.add_argument('--estado-alertas', metavar='RUTA',
+                       help='Archivo SQLite con el estado de las alertas: solo se notifican alertas nuevas, escaladas o recordatorios')
+    parser.add_argument('--recordatorio-criticos', type=float, default=7, metavar='DIAS',
+                       help='Días entre recordatorios de una alerta crítica sin cambios (por defecto 7)')
+    parser.add_argument('--recordatorio-advertencia', type=float, default=30, metavar='DIAS',
+                       help='Días entre recordatorios de una advertencia sin cambios (por defecto 30)')
+    parser.add_argument('--log-alertas', default='dominios_log.txt', metavar='RUTA',
+                       help='Archivo del log de alertas (por defecto dominios_log.txt)')
+    parser.add_argument('--log-formato', choices=['texto', 'jsonl'], default='texto',
+                       help='Formato del log de alertas: bloques de texto o un JSON por alerta')
+    parser.add_argument('--log-max-mb', type=float, default=10,
+                       help='Tamaño a partir del cual se rota el log de alertas (MB, 0 = sin límite)')
+    parser.add_argument('--log-rotacion-horas', type=float, default=0,
+                       help='Rotar el log de alertas al cambiar de período de N horas (0 = solo por tamaño)')
+    parser.add_argument('--log-json', action='store_true',
+                       help='Escribir sistema_dominios.log en JSON lines (un objeto por registro)')
+    parser.add_argument('--archivo-dominios', metavar='RUTA',
+                       help='Archivo con un dominio por línea (# para comentarios); en modo demonio se relee al cambiar')
+    parser.add_argument('--daemon', action='store_true',
+                       help='Quedar en ejecución y repetir el monitoreo cada --intervalo-minutos')
+    parser.add_argument('--intervalo-minutos', type=float, default=60,
+                       help='Minutos entre el inicio de dos monitoreos en modo demonio (por defecto 60)')
+    parser.add_argument('--jitter', type=float, default=0.1,
+                       help='Desvío aleatorio del intervalo como fracción (por defecto 0.1 = ±10%%)')
+    parser.add_argument('--estado-daemon', default='estado_daemon.json', metavar='RUTA',
+                       help='Archivo JSON de latido/estado del demonio (por defecto estado_daemon.json)')
+    parser.add_argument('--max-ejecuciones', type=int, metavar='N',
+                       help='Terminar el demonio después de N monitoreos (incluidos los que fallan)')
     
     args = parser.parse_args()
     
@@ -31,7 +90,25 @@ def main():
     config_email = obtener_config_email(args.proveedor)
     
     # Inicializar agentes
-    agente_principal = AgentePrincipal(config_email)
+    agente_principal = AgentePrincipal(config_email, max_workers=args.workers,
+                                       backend_whois=args.backend_whois,
+                                       limitar_tasa_whois=args.limitar_tasa,
+                                       ruta_cache_whois=args.cache_whois,
+                                       ruta_estado=args.estado,
+                                       ruta_metricas=args.metricas_prometheus,
+                                       ruta_trazas=args.trazas,
+                                       correo_en_segundo_plano=args.correo_segundo_plano,
+                                       ruta_estado_alertas=args.estado_alertas,
+                                       recordatorios={'CRÍTICO': args.recordatorio_criticos * DIA,
+                                                      'ADVERTENCIA': args.recordatorio_advertencia * DIA},
+                                       registro_alertas=RegistroAlertas(
+                                           args.log_alertas, formato=args.log_formato,
+                                           tamano_maximo=int(args.log_max_mb * 1024 * 1024),
+                                           rotacion_segundos=int(args.log_rotacion_horas * HORA) or None),
+                                       formato_log='jsonl' if args.log_json else 'texto',
+                                       procesos=args.procesos,
+                                       fragmentos=args.fragmentos,
+                                       asignacion_fragmentos=args.asignacion_fragmentos)
     interfaz = InterfazPandas(agente_principal)
     
     if args.interactivo:
@@ -40,26 +117,58 @@ def main():
         return
     
     # Modo no interactivo requiere dominios
-    if not args.dominios:
-        print("Error: Se requiere especificar dominios con --dominios o usar --interactivo")
+    if not args.dominios and not args.archivo_dominios:
+        print("Error: Se requiere especificar dominios con --dominios, --archivo-dominios o usar --interactivo")
         sys.exit(1)
     
-    print(f"🚀 Iniciando monitoreo de {len(args.dominios)} dominios...")
-    print(f"Dominios: {', '.join(args.dominios)}")
+    al_recibir = None
+    if args.progreso:
+        def al_recibir(info):
+            print(f"  ✔ {info['dominio']}: {info['dias_hasta_vencimiento']} días hasta vencimiento")
+    
+    if args.daemon:
+        # Modo demonio: los agentes, caches y sesiones SMTP se reutilizan entre monitoreos
+        demonio = DemonioMonitoreo(agente_principal, dominios=args.dominios,
+                                   archivo_dominios=args.archivo_dominios,
+                                   destinatarios_correo=args.correos,
+                                   intervalo=args.intervalo_minutos * 60,
+                                   jitter=args.jitter,
+                                   ruta_latido=args.estado_daemon,
+                                   opciones_monitoreo={'usar_cache': not args.sin_cache,
+                                                       'al_recibir': al_recibir,
+                                                       'incremental': args.incremental},
+                                   al_terminar_ciclo=agente_principal.mostrar_resumen)
+        print(f"🔁 Modo demonio: monitoreo cada {args.intervalo_minutos:g} minutos (estado en {args.estado_daemon})")
+        demonio.ejecutar(args.max_ejecuciones)
+        agente_principal.cerrar()
+        return
+    
+    dominios = list(dict.fromkeys((args.dominios or []) +
+                                  (leer_archivo_dominios(args.archivo_dominios) if args.archivo_dominios else [])))
+    
+    print(f"🚀 Iniciando monitoreo de {len(dominios)} dominios...")
+    print(f"Dominios: {', '.join(dominios)}")
     
     # Ejecutar monitoreo
-    resultados = agente_principal.monitorear_dominios(args.dominios, args.correos)
+    resultados = agente_principal.monitorear_dominios(dominios, args.correos,
+                                                      usar_cache=not args.sin_cache,
+                                                      al_recibir=al_recibir,
+                                                      incremental=args.incremental)
     
     # Mostrar resumen
     agente_principal.mostrar_resumen(resultados)
     
+    # La interfaz reutiliza los datos del monitoreo en lugar de consultar de nuevo
+    if resultados['instantanea'] is not None:
+        interfaz.cargar_instantanea(resultados['instantanea'])
+    
     # Mostrar interfaz pandas si se solicita
     if args.interfaz:
-        interfaz.mostrar_interfaz_completa(args.dominios)
+        interfaz.mostrar_interfaz_completa(dominios)
     
     # Exportar a Excel si se solicita
     if args.exportar:
-        interfaz.exportar_reporte_completo(args.dominios, args.exportar)
+        interfaz.exportar_reporte_completo(dominios, args.exportar)
     
     # Mostrar alertas visuales
     alertas = interfaz.generar_alertas_visual()
@@ -69,6 +178,9 @@ def main():
             print(f"  {alerta['tipo']}: {alerta['mensaje']}")
     else:
         print("\n✅ No hay alertas activas")
+    
+    # Terminar los envíos de correo encolados antes de salir
+    agente_principal.cerrar()
 
 if __name__ == "__main__":
     main()
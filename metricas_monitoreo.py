@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Métricas por etapa de monitorear_dominios con exportación en formato Prometheus
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+# Límites (segundos) de los buckets del histograma de latencia por dominio
+LIMITES_LATENCIA = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+PREFIJO_PROMETHEUS = 'monitoreo_dominios'
+
+
+def clasificar_error(error: Exception) -> str:
+    """
+    Reduce una excepción de consulta WHOIS a un tipo de error estable para métricas
+
+    Args:
+        error: Excepción capturada
+
+    Returns:
+        Tipo de error (timeout, dns, conexion, sin_datos o el nombre de la clase)
+    """
+    if isinstance(error, (socket.timeout, TimeoutError, asyncio.TimeoutError)):
+        return 'timeout'
+    if isinstance(error, socket.gaierror):
+        return 'dns'
+    if isinstance(error, (ConnectionError, OSError)):
+        return 'conexion'
+    if isinstance(error, ValueError):
+        return 'sin_datos'
+    return type(error).__name__.lower()
+
+
+def _escapar_etiqueta(valor: str) -> str:
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+class MetricasMonitoreo:
+    """
+    Recolecta métricas de una ejecución de monitoreo
+
+    AgentePrincipal crea una instancia, la comparte con AgenteLector (y el
+    cliente WHOIS asíncrono) y la reinicia al comienzo de cada ejecución.
+    Los registros son seguros entre hilos. Los valores describen la última
+    ejecución, por eso en Prometheus se publican como gauges.
+    """
+
+    def __init__(self, limites_latencia: Tuple[float, ...] = LIMITES_LATENCIA):
+        """
+        Args:
+            limites_latencia: Límites superiores de los buckets del histograma
+        """
+        self.limites_latencia = tuple(sorted(limites_latencia))
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta las métricas de la ejecución anterior"""
+        with self._lock:
+            self.inicio = time.time()
+            self.etapas: Dict[str, float] = {}
+            self.buckets = [0] * (len(self.limites_latencia) + 1)
+            self.suma_latencia = 0.0
+            self.consultas = 0
+            self.exitosas = 0
+            self.errores: Dict[str, int] = {}
+            self.valores: Dict[str, float] = {}
+
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        """
+        Mide el tiempo de pared de una etapa (se acumula si se repite)
+
+        Args:
+            nombre: Nombre de la etapa (lectura, evaluacion, log, correo...)
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            duracion = time.perf_counter() - inicio
+            with self._lock:
+                self.etapas[nombre] = self.etapas.get(nombre, 0.0) + duracion
+
+    def registrar_consulta(self, segundos: float, error: Optional[Exception] = None):
+        """
+        Registra una consulta WHOIS de red (las respuestas de cache no pasan por aquí)
+
+        Args:
+            segundos: Latencia de la consulta
+            error: Excepción si la consulta falló
+        """
+        indice = len(self.limites_latencia)
+        for i, limite in enumerate(self.limites_latencia):
+            if segundos <= limite:
+                indice = i
+                break
+
+        with self._lock:
+            self.buckets[indice] += 1
+            self.suma_latencia += segundos
+            self.consultas += 1
+            if error is None:
+                self.exitosas += 1
+            else:
+                tipo = clasificar_error(error)
+                self.errores[tipo] = self.errores.get(tipo, 0) + 1
+
+    def consultas_como_diccionario(self) -> Dict:
+        """
+        Devuelve los contadores de consultas WHOIS (para sumarlos en otro proceso)
+
+        Returns:
+            Diccionario con buckets, suma_latencia, consultas, exitosas y errores
+        """
+        with self._lock:
+            return {
+                'buckets': list(self.buckets),
+                'suma_latencia': self.suma_latencia,
+                'consultas': self.consultas,
+                'exitosas': self.exitosas,
+                'errores': dict(self.errores)
+            }
+
+    def sumar_consultas(self, contadores: Dict):
+        """
+        Suma los contadores de consultas WHOIS registrados en otro proceso
+
+        Args:
+            contadores: Diccionario devuelto por consultas_como_diccionario() con los mismos límites
+        """
+        with self._lock:
+            self.buckets = [a + b for a, b in zip(self.buckets, contadores['buckets'])]
+            self.suma_latencia += contadores['suma_latencia']
+            self.consultas += contadores['consultas']
+            self.exitosas += contadores['exitosas']
+            for tipo, cantidad in contadores['errores'].items():
+                self.errores[tipo] = self.errores.get(tipo, 0) + cantidad
+
+    def registrar_valor(self, nombre: str, valor: float):
+        """
+        Guarda un valor puntual de la ejecución (dominios críticos, correo enviado...)
+
+        Args:
+            nombre: Nombre de la métrica sin prefijo
+            valor: Valor numérico
+        """
+        with self._lock:
+            self.valores[nombre] = float(valor)
+
+    def registrar_lectura(self, estadisticas: Dict):
+        """
+        Toma conteos y tasa de aciertos de cache de AgenteLector.estadisticas_ejecucion
+
+        Args:
+            estadisticas: Estadísticas de la lectura
+        """
+        total = estadisticas.get('total_dominios', 0)
+        aciertos = estadisticas.get('aciertos_cache', 0)
+        self.registrar_valor('dominios_total', total)
+        self.registrar_valor('dominios_exitosos', estadisticas.get('exitosos', 0))
+        self.registrar_valor('dominios_sin_dns', estadisticas.get('sin_dns', 0))
+        self.registrar_valor('aciertos_cache_whois', aciertos)
+        self.registrar_valor('tasa_aciertos_cache_whois', round(aciertos / total, 4) if total else 0.0)
+        if 'reutilizados_estado' in estadisticas:
+            self.registrar_valor('reutilizados_estado', estadisticas['reutilizados_estado'])
+        with self._lock:
+            if estadisticas.get('sin_dns'):
+                self.errores['nxdomain'] = self.errores.get('nxdomain', 0) + estadisticas['sin_dns']
+
+    def registrar_cache_ssl(self, estadisticas: Dict):
+        """
+        Toma los contadores de CacheCertificados de un escaneo SSL
+
+        Args:
+            estadisticas: Aciertos (sin conexión), sin_cambios (handshake con la misma
+                          huella) y fallos del escaneo, como en CacheCertificados.estadisticas()
+        """
+        aciertos = estadisticas.get('aciertos', 0)
+        consultas = aciertos + estadisticas.get('fallos', 0)
+        self.registrar_valor('aciertos_cache_ssl', aciertos)
+        self.registrar_valor('certificados_sin_cambios_ssl', estadisticas.get('sin_cambios', 0))
+        self.registrar_valor('tasa_aciertos_cache_ssl', round(aciertos / consultas, 4) if consultas else 0.0)
+
+    def percentil_latencia(self, fraccion: float) -> Optional[float]:
+        """
+        Estima un percentil de latencia a partir del histograma (límite del bucket)
+
+        Args:
+            fraccion: Percentil entre 0 y 1
+
+        Returns:
+            Segundos (None si no hubo consultas, inf si cae en el último bucket)
+        """
+        with self._lock:
+            if not self.consultas:
+                return None
+            objetivo = fraccion * self.consultas
+            acumulado = 0
+            for limite, cantidad in zip(self.limites_latencia + (float('inf'),), self.buckets):
+                acumulado += cantidad
+                if acumulado >= objetivo:
+                    return limite
+        return float('inf')
+
+    def como_diccionario(self) -> Dict:
+        """
+        Devuelve las métricas de la ejecución para resultados['metricas']
+
+        Returns:
+            Diccionario con etapas, latencias, consultas, errores y valores
+        """
+        with self._lock:
+            acumulado = 0
+            histograma = {}
+            for limite, cantidad in zip(self.limites_latencia, self.buckets):
+                acumulado += cantidad
+                histograma[str(limite)] = acumulado
+            histograma['+Inf'] = self.consultas
+            resumen = {
+                'inicio': self.inicio,
+                'etapas_segundos': {nombre: round(valor, 4) for nombre, valor in self.etapas.items()},
+                'consultas_whois': self.consultas,
+                'consultas_exitosas': self.exitosas,
+                'errores_por_tipo': dict(self.errores),
+                'latencia_whois': {
+                    'histograma': histograma,
+                    'suma_segundos': round(self.suma_latencia, 4),
+                    'media_segundos': round(self.suma_latencia / self.consultas, 4) if self.consultas else None
+                },
+                'valores': dict(self.valores)
+            }
+        resumen['latencia_whois']['p50_segundos'] = self.percentil_latencia(0.5)
+        resumen['latencia_whois']['p99_segundos'] = self.percentil_latencia(0.99)
+        return resumen
+
+    def texto_prometheus(self, prefijo: str = PREFIJO_PROMETHEUS) -> str:
+        """
+        Genera las métricas en el formato de texto de Prometheus
+
+        Args:
+            prefijo: Prefijo de los nombres de métrica
+
+        Returns:
+            Texto listo para el textfile collector de node_exporter
+        """
+        lineas = []
+
+        def gauge(nombre: str, ayuda: str, muestras: Dict[str, float]):
+            lineas.append(f"# HELP {prefijo}_{nombre} {ayuda}")
+            lineas.append(f"# TYPE {prefijo}_{nombre} gauge")
+            for etiquetas, valor in muestras.items():
+                lineas.append(f"{prefijo}_{nombre}{etiquetas} {valor}")
+
+        with self._lock:
+            gauge('ultima_ejecucion_timestamp_segundos', 'Inicio de la última ejecución (epoch)',
+                  {'': round(self.inicio, 3)})
+            gauge('etapa_segundos', 'Duración de cada etapa de la última ejecución',
+                  {f'{{etapa="{_escapar_etiqueta(nombre)}"}}': round(valor, 6) for nombre, valor in self.etapas.items()})
+
+            nombre = f"{prefijo}_consulta_whois_segundos"
+            lineas.append(f"# HELP {nombre} Latencia de las consultas WHOIS de red de la última ejecución")
+            lineas.append(f"# TYPE {nombre} histogram")
+            acumulado = 0
+            for limite, cantidad in zip(self.limites_latencia, self.buckets):
+                acumulado += cantidad
+                lineas.append(f'{nombre}_bucket{{le="{limite}"}} {acumulado}')
+            lineas.append(f'{nombre}_bucket{{le="+Inf"}} {self.consultas}')
+            lineas.append(f"{nombre}_sum {round(self.suma_latencia, 6)}")
+            lineas.append(f"{nombre}_count {self.consultas}")
+
+            resultados = {'{resultado="exito",tipo=""}': self.exitosas}
+            resultados.update({f'{{resultado="error",tipo="{_escapar_etiqueta(tipo)}"}}': cantidad
+                               for tipo, cantidad in sorted(self.errores.items())})
+            gauge('consultas', 'Consultas de la última ejecución por resultado y tipo de error', resultados)
+
+            for nombre_valor, valor in sorted(self.valores.items()):
+                gauge(nombre_valor, f'Valor de la última ejecución: {nombre_valor}', {'': valor})
+
+        return '\n'.join(lineas) + '\n'
+
+    def exportar_prometheus(self, ruta: str, prefijo: str = PREFIJO_PROMETHEUS) -> bool:
+        """
+        Escribe las métricas en un archivo .prom de forma atómica
+
+        node_exporter puede leer el archivo en cualquier momento, por eso se
+        escribe en un temporal y se reemplaza con os.replace.
+
+        Args:
+            ruta: Archivo de destino (por ejemplo /var/lib/node_exporter/dominios.prom)
+            prefijo: Prefijo de los nombres de métrica
+
+        Returns:
+            True si se escribió correctamente
+        """
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        try:
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                archivo.write(self.texto_prometheus(prefijo))
+            os.replace(temporal, ruta)
+            return True
+        except OSError:
+            if os.path.exists(temporal):
+                os.remove(temporal)
+            return False
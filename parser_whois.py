@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Extracción rápida de expiración, registrador y estado de respuestas WHOIS por TLD
+"""
+
+import re
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+import whois
+from whois.parser import WhoisEntry
+
+_M = re.MULTILINE
+
+
+def _fecha_iso(texto: str) -> datetime:
+    return datetime.fromisoformat(texto)
+
+
+def _fecha_formato(formato: str) -> Callable[[str], datetime]:
+    return lambda texto: datetime.strptime(texto, formato)
+
+
+# Formato de respuesta de un TLD: patrones precompilados de los tres campos
+# (grupo 1 = valor) y función que convierte el texto de la fecha. Solo se
+# leen las líneas que interesan, en lugar de las ~25 expresiones genéricas
+# de python-whois (contactos, emails, servidores de nombres...).
+FORMATO_ICANN = {
+    'expiracion': re.compile(
+        r'^[ \t]*(?:Registry Expiry Date|Registrar Registration Expiration Date):[ \t]*(\S+)', _M),
+    'registrar': re.compile(r'^[ \t]*Registrar:[ \t]*(\S.*)$', _M),
+    'estado': re.compile(r'^[ \t]*Domain Status:[ \t]*(\S.*)$', _M),
+    'fecha': _fecha_iso
+}
+
+FORMATO_RU = {
+    'expiracion': re.compile(r'^paid-till:[ \t]*(\S+)', _M),
+    'registrar': re.compile(r'^registrar:[ \t]*(\S.*)$', _M),
+    'estado': re.compile(r'^state:[ \t]*(\S.*)$', _M),
+    'fecha': _fecha_iso
+}
+
+FORMATOS_TLD: Dict[str, Dict] = {
+    # Nominet: el valor va en la línea siguiente a la etiqueta
+    'uk': {
+        'expiracion': re.compile(r'^[ \t]*Expiry date:[ \t]*(\S+)', _M),
+        'registrar': re.compile(r'^[ \t]*Registrar:[ \t]*\r?\n[ \t]*(\S.*)$', _M),
+        'estado': re.compile(r'^[ \t]*Registration status:[ \t]*\r?\n[ \t]*(\S.*)$', _M),
+        'fecha': _fecha_formato('%d-%b-%Y')
+    },
+    'ru': FORMATO_RU,
+    'su': FORMATO_RU,
+    'xn--p1ai': FORMATO_RU,
+    'fr': {
+        'expiracion': re.compile(r'^Expiry Date:[ \t]*(\S+)', _M),
+        'registrar': re.compile(r'^registrar:[ \t]*(\S.*)$', _M),
+        'estado': re.compile(r'^(?:epp)?status:[ \t]*(\S.*)$', _M),
+        'fecha': _fecha_iso
+    },
+    'br': {
+        'expiracion': re.compile(r'^expires:[ \t]*(\d{8})', _M),
+        'registrar': None,
+        'estado': re.compile(r'^status:[ \t]*(\S.*)$', _M),
+        'fecha': _fecha_formato('%Y%m%d')
+    },
+    'jp': {
+        'expiracion': re.compile(r'^\[Expires on\][ \t]*(\S+)', _M),
+        'registrar': None,
+        'estado': re.compile(r'^\[(?:State|Status)\][ \t]*(\S.*)$', _M),
+        'fecha': _fecha_formato('%Y/%m/%d')
+    },
+    'cn': {
+        'expiracion': re.compile(r'^Expiration Time:[ \t]*(\S.*)$', _M),
+        'registrar': re.compile(r'^Sponsoring Registrar:[ \t]*(\S.*)$', _M),
+        'estado': re.compile(r'^Domain Status:[ \t]*(\S.*)$', _M),
+        'fecha': _fecha_formato('%Y-%m-%d %H:%M:%S')
+    },
+    'it': {
+        'expiracion': re.compile(r'^Expire Date:[ \t]*(\S+)', _M),
+        'registrar': re.compile(r'^Registrar\s*\n[ \t]+Organization:[ \t]*(\S.*)$', _M),
+        'estado': re.compile(r'^Status:[ \t]*(\S.*)$', _M),
+        'fecha': _fecha_formato('%Y-%m-%d')
+    },
+    'pl': {
+        'expiracion': re.compile(r'^renewal date:[ \t]*(\S.*)$', _M),
+        'registrar': re.compile(r'^REGISTRAR:[ \t]*\r?\n?[ \t]*(\S.*)$', _M),
+        'estado': None,
+        'fecha': _fecha_formato('%Y.%m.%d %H:%M:%S')
+    },
+}
+
+
+def formato_tld(dominio: str) -> Dict:
+    """
+    Devuelve el formato de respuesta del TLD de un dominio
+
+    Los gTLD (y los ccTLD que siguen el formato de ICANN, como .io o .co)
+    usan FORMATO_ICANN; si un ccTLD tiene otro formato, el patrón no
+    coincide y se recurre al parser completo. Los TLD en Unicode se buscan
+    por su forma punycode.
+
+    Args:
+        dominio: Nombre del dominio
+
+    Returns:
+        Diccionario con los patrones y la función de fecha del TLD
+    """
+    tld = dominio.strip().rstrip('.').rsplit('.', 1)[-1].lower()
+    try:
+        # La tabla usa la forma punycode de los TLD internacionalizados (.рф -> xn--p1ai)
+        tld = tld.encode('idna').decode('ascii')
+    except UnicodeError:
+        pass
+    return FORMATOS_TLD.get(tld, FORMATO_ICANN)
+
+
+def _valores(patron, texto: str) -> List[str]:
+    """Valores distintos (sin distinguir mayúsculas) en orden de aparición, como python-whois"""
+    vistos = {}
+    for valor in patron.findall(texto):
+        valor = valor.strip()
+        if valor:
+            vistos.setdefault(valor.lower(), valor)
+    return list(vistos.values())
+
+
+def extraer_campos_rapido(dominio: str, texto: str) -> Optional[Tuple[datetime, Optional[str], Optional[object]]]:
+    """
+    Extrae los tres campos con los patrones del TLD del dominio
+
+    Args:
+        dominio: Dominio consultado (define el TLD)
+        texto: Respuesta WHOIS cruda
+
+    Returns:
+        Tupla (fecha_expiracion, registrar, estado) con el mismo formato que
+        python-whois, o None si no se encontró o no se pudo leer la fecha
+    """
+    formato = formato_tld(dominio)
+    coincidencia = formato['expiracion'].search(texto)
+    if coincidencia is None:
+        return None
+    try:
+        expiracion = formato['fecha'](coincidencia.group(1).strip())
+    except ValueError:
+        return None
+    if expiracion.tzinfo is None:
+        expiracion = expiracion.replace(tzinfo=timezone.utc)
+
+    registrar = None
+    if formato['registrar'] is not None:
+        registradores = _valores(formato['registrar'], texto)
+        # Con respuestas encadenadas (registro + registrador) vale la última, como en python-whois
+        registrar = registradores[-1] if registradores else None
+
+    estado = None
+    if formato['estado'] is not None:
+        estados = _valores(formato['estado'], texto)
+        if estados:
+            estado = estados[0] if len(estados) == 1 else estados
+
+    return expiracion, registrar, estado
+
+
+def parsear_respuesta_whois(dominio: str, texto: str, rapido: bool = True) -> Tuple[object, Optional[str], Optional[object]]:
+    """
+    Obtiene expiración, registrador y estado, con el parser completo como respaldo
+
+    Args:
+        dominio: Dominio consultado
+        texto: Respuesta WHOIS cruda
+        rapido: Si False, usa directamente el parser completo de python-whois
+
+    Returns:
+        Tupla (fecha_expiracion, registrar, estado)
+
+    Raises:
+        WhoisDomainNotFoundError (u otra excepción de python-whois) si el parser
+        completo no reconoce la respuesta
+    """
+    if rapido:
+        campos = extraer_campos_rapido(dominio, texto)
+        if campos is not None:
+            return campos
+    entrada = WhoisEntry.load(dominio, texto)
+    return entrada.expiration_date, entrada.registrar, entrada.status
+
+
+def descargar_texto_whois(dominio: str, timeout: int = 10) -> str:
+    """
+    Descarga la respuesta WHOIS cruda igual que whois.whois(), sin parsearla
+
+    Args:
+        dominio: Nombre del dominio
+        timeout: Timeout de la consulta en segundos
+
+    Returns:
+        Texto de la respuesta (incluye la del registrador si el registro la refiere)
+
+    Raises:
+        whois.WhoisError si no hubo respuesta
+    """
+    nombre = whois.extract_domain(dominio).encode('idna').decode('utf-8')
+    texto = whois.NICClient().whois_lookup(None, nombre, 0, timeout=timeout)
+    if not texto:
+        raise whois.WhoisError("Whois command returned no output")
+    return texto
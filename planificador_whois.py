@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Planificador de consultas WHOIS con límite de tasa por servidor
+"""
+
+import asyncio
+import threading
+import time
+import logging
+import weakref
+from collections import OrderedDict, deque
+from contextlib import contextmanager, asynccontextmanager
+from typing import Dict, List, Optional, Tuple
+
+# Servidor WHOIS autoritativo de los TLD más comunes
+SERVIDORES_WHOIS_TLD = {
+    'com': 'whois.verisign-grs.com',
+    'net': 'whois.verisign-grs.com',
+    'org': 'whois.publicinterestregistry.org',
+    'info': 'whois.nic.info',
+    'biz': 'whois.nic.biz',
+    'io': 'whois.nic.io',
+    'co': 'whois.nic.co',
+    'xyz': 'whois.nic.xyz',
+    'app': 'whois.nic.google',
+    'dev': 'whois.nic.google',
+    'es': 'whois.nic.es',
+    'mx': 'whois.mx',
+    'ar': 'whois.nic.ar',
+    'cl': 'whois.nic.cl',
+    'uk': 'whois.nic.uk',
+    'de': 'whois.denic.de',
+    'fr': 'whois.nic.fr',
+    'it': 'whois.nic.it',
+    'eu': 'whois.eu',
+    'us': 'whois.nic.us',
+    'ca': 'whois.cira.ca',
+    'br': 'whois.registro.br',
+}
+
+# Límites por servidor: (consultas por segundo, ráfaga máxima, consultas simultáneas)
+LIMITES_SERVIDORES = {
+    'whois.verisign-grs.com': (5.0, 10, 8),
+    'whois.publicinterestregistry.org': (2.0, 5, 4),
+    'whois.denic.de': (0.5, 1, 1),
+    'whois.nic.uk': (1.0, 2, 2),
+    'whois.nic.es': (0.5, 1, 1),
+    'whois.eu': (0.5, 1, 1),
+}
+
+LIMITE_POR_DEFECTO = (1.0, 3, 2)
+
+
+class CuboTokens:
+    """
+    Cubo de tokens seguro entre hilos
+
+    Cada adquisición reserva un token aunque el cubo esté vacío y devuelve
+    cuánto hay que esperar, de modo que las esperas quedan en orden de llegada.
+    """
+
+    def __init__(self, tasa: float, capacidad: int):
+        """
+        Args:
+            tasa: Tokens repuestos por segundo
+            capacidad: Tokens máximos acumulables (tamaño de ráfaga)
+        """
+        self.tasa = tasa
+        self.capacidad = max(1, capacidad)
+        self.tokens = float(self.capacidad)
+        self.ultima_recarga = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reservar(self) -> float:
+        """Reserva un token y devuelve los segundos de espera necesarios"""
+        with self._lock:
+            ahora = time.monotonic()
+            self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultima_recarga) * self.tasa)
+            self.ultima_recarga = ahora
+            self.tokens -= 1
+            return max(0.0, -self.tokens / self.tasa)
+
+    def adquirir(self) -> float:
+        """Bloquea hasta disponer de un token; devuelve el tiempo esperado"""
+        espera = self._reservar()
+        if espera > 0:
+            time.sleep(espera)
+        return espera
+
+    async def adquirir_async(self) -> float:
+        """Versión asíncrona de adquirir()"""
+        espera = self._reservar()
+        if espera > 0:
+            await asyncio.sleep(espera)
+        return espera
+
+
+class PlanificadorWhois:
+    """
+    Asigna cada dominio a su servidor WHOIS y aplica un cubo de tokens y un
+    tope de concurrencia por servidor
+    """
+
+    def __init__(self, limites: Optional[Dict[str, Tuple[float, int, int]]] = None,
+                 limite_por_defecto: Tuple[float, int, int] = LIMITE_POR_DEFECTO,
+                 servidores_tld: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            limites: Límites por servidor (tasa, ráfaga, simultáneas) que se
+                     suman o reemplazan a LIMITES_SERVIDORES
+            limite_por_defecto: Límite para servidores sin configuración propia
+            servidores_tld: Mapa TLD -> servidor que amplía SERVIDORES_WHOIS_TLD
+        """
+        self.logger = logging.getLogger('PlanificadorWhois')
+        self.logger.setLevel(logging.INFO)
+        self.limites = {**LIMITES_SERVIDORES, **(limites or {})}
+        self.limite_por_defecto = limite_por_defecto
+        self.servidores_tld = {**SERVIDORES_WHOIS_TLD, **(servidores_tld or {})}
+
+        self._lock = threading.Lock()
+        self._cubos: Dict[str, CuboTokens] = {}
+        self._semaforos: Dict[str, threading.BoundedSemaphore] = {}
+        self._semaforos_async = weakref.WeakKeyDictionary()
+        self._estadisticas: Dict[str, Dict] = {}
+
+    def servidor_para(self, dominio: str) -> str:
+        """
+        Devuelve el servidor WHOIS que atiende un dominio
+
+        Args:
+            dominio: Nombre del dominio
+
+        Returns:
+            Nombre del servidor (whois.nic.<tld> si el TLD no está registrado)
+        """
+        tld = dominio.strip().rstrip('.').rsplit('.', 1)[-1].lower()
+        return self.servidores_tld.get(tld, f'whois.nic.{tld}')
+
+    def intercalar(self, lista_dominios: List[str]) -> List[int]:
+        """
+        Ordena los dominios alternando servidores (round-robin)
+
+        Así los workers no se acumulan esperando el límite de un único
+        servidor mientras los demás están ociosos.
+
+        Args:
+            lista_dominios: Lista de dominios a consultar
+
+        Returns:
+            Índices de lista_dominios en el orden de consulta sugerido
+        """
+        colas: Dict[str, deque] = OrderedDict()
+        for indice, dominio in enumerate(lista_dominios):
+            colas.setdefault(self.servidor_para(dominio), deque()).append(indice)
+
+        orden = []
+        while colas:
+            for servidor in list(colas):
+                cola = colas[servidor]
+                orden.append(cola.popleft())
+                if not cola:
+                    del colas[servidor]
+        return orden
+
+    def _recursos(self, servidor: str) -> Tuple[CuboTokens, threading.BoundedSemaphore]:
+        """Crea bajo demanda el cubo y el semáforo de un servidor"""
+        with self._lock:
+            if servidor not in self._cubos:
+                tasa, rafaga, simultaneas = self.limites.get(servidor, self.limite_por_defecto)
+                self._cubos[servidor] = CuboTokens(tasa, rafaga)
+                self._semaforos[servidor] = threading.BoundedSemaphore(simultaneas)
+                self._estadisticas[servidor] = {'consultas': 0, 'espera_segundos': 0.0}
+            return self._cubos[servidor], self._semaforos[servidor]
+
+    def _registrar(self, servidor: str, espera: float):
+        with self._lock:
+            estadisticas = self._estadisticas[servidor]
+            estadisticas['consultas'] += 1
+            estadisticas['espera_segundos'] += espera
+
+    @contextmanager
+    def permiso(self, servidor: str):
+        """
+        Bloquea hasta que el servidor admite una consulta más
+
+        Args:
+            servidor: Nombre del servidor WHOIS (ver servidor_para)
+        """
+        cubo, semaforo = self._recursos(servidor)
+        inicio = time.monotonic()
+        with semaforo:
+            cubo.adquirir()
+            self._registrar(servidor, time.monotonic() - inicio)
+            yield
+
+    @asynccontextmanager
+    async def permiso_async(self, servidor: str):
+        """
+        Versión asíncrona de permiso() para el cliente WHOIS asyncio
+
+        Args:
+            servidor: Nombre del servidor WHOIS
+        """
+        cubo, _ = self._recursos(servidor)
+
+        # Los semáforos de asyncio pertenecen a un event loop concreto
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaforos = self._semaforos_async.setdefault(loop, {})
+            if servidor not in semaforos:
+                semaforos[servidor] = asyncio.Semaphore(self.limites.get(servidor, self.limite_por_defecto)[2])
+            semaforo = semaforos[servidor]
+
+        inicio = time.monotonic()
+        async with semaforo:
+            await cubo.adquirir_async()
+            self._registrar(servidor, time.monotonic() - inicio)
+            yield
+
+    def estadisticas(self) -> Dict[str, Dict]:
+        """
+        Devuelve consultas y tiempo de espera acumulado por servidor
+
+        Returns:
+            Diccionario servidor -> {'consultas', 'espera_segundos'}
+        """
+        with self._lock:
+            return {servidor: dict(valores) for servidor, valores in self._estadisticas.items()}
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Cuerpo del correo de alertas a partir de plantillas, con secciones acotadas y CSV comprimido
+"""
+
+import gzip
+from datetime import datetime
+from string import Template
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+PLANTILLA_CORREO = Template("""
+REPORTE DE DOMINIOS POR VENCER
+Fecha: $fecha
+$novedades
+=== DOMINIOS CRÍTICOS (Vencen en 30 días o menos) ===
+$criticos
+=== DOMINIOS EN ADVERTENCIA (Vencen entre 31-50 días) ===
+$advertencia
+=== RESUMEN ===
+Total dominios evaluados: $total
+Dominios críticos: $criticos_count
+Dominios en advertencia: $advertencia_count
+
+Acción recomendada: $accion
+""")
+
+PLANTILLA_CRITICO = Template("""
+Dominio: $dominio
+Días hasta vencimiento: $dias
+Fecha de expiración: $fecha
+Registrar: $registrar
+----------------------------------------""")
+
+PLANTILLA_ADVERTENCIA = Template("""
+Dominio: $dominio
+Días hasta vencimiento: $dias
+Fecha de expiración: $fecha
+----------------------------------------""")
+
+PLANTILLA_NOVEDAD = Template("- $dominio: $nivel, $dias días ($motivo)")
+
+COLUMNAS_CSV = ['dominio', 'nivel_alerta', 'dias_hasta_vencimiento', 'fecha_expiracion', 'registrar', 'estado']
+
+
+def tabla_seccion(decisiones: Dict, clave_tabla: str, clave_lista: str) -> pd.DataFrame:
+    """
+    Devuelve una sección de las decisiones como DataFrame
+
+    Args:
+        decisiones: Diccionario devuelto por AgenteDecisor.evaluar_dominios
+        clave_tabla: Clave del DataFrame (tabla_criticos, tabla_advertencia, tabla_notificar)
+        clave_lista: Clave de la lista de registros equivalente, usada si no está la tabla
+
+    Returns:
+        DataFrame de la sección (vacío si no hay filas)
+    """
+    tabla = decisiones.get(clave_tabla)
+    if tabla is None:
+        tabla = pd.DataFrame(decisiones.get(clave_lista) or [])
+    return tabla
+
+
+def _texto_columna(tabla: pd.DataFrame, columna: str) -> pd.Series:
+    """Columna como texto, con 'N/A' para valores faltantes"""
+    if columna not in tabla:
+        return pd.Series('N/A', index=tabla.index)
+    serie = tabla[columna]
+    if columna == 'fecha_expiracion':
+        serie = pd.to_datetime(serie, errors='coerce', utc=True).dt.strftime('%Y-%m-%d %H:%M UTC')
+    return serie.astype('object').where(serie.notna(), 'N/A').astype(str)
+
+
+class RenderizadorCorreo:
+    """
+    Arma el cuerpo del correo de alertas en una sola pasada por tabla
+
+    Cada sección muestra como máximo max_filas_seccion dominios (los más
+    urgentes primero) y cierra con una línea que resume cuántos quedaron
+    afuera; la lista completa puede ir como CSV comprimido adjunto. Así el
+    costo de armar el cuerpo no depende de cuántos miles de dominios haya
+    en alerta.
+    """
+
+    def __init__(self, max_filas_seccion: int = 100, adjuntar_csv: Optional[bool] = None):
+        """
+        Args:
+            max_filas_seccion: Dominios como máximo por sección del cuerpo
+            adjuntar_csv: True siempre que haya alertas, False nunca,
+                          None solo si alguna sección quedó recortada
+        """
+        self.max_filas_seccion = max_filas_seccion
+        self.adjuntar_csv = adjuntar_csv
+
+    def _seccion(self, tabla: pd.DataFrame, plantilla: Template, vacio: str) -> Tuple[str, bool]:
+        """Renderiza una sección y devuelve (texto, recortada)"""
+        if tabla.empty:
+            return f"\n{vacio}\n", False
+
+        recortada = len(tabla) > self.max_filas_seccion
+        if recortada and 'dias_hasta_vencimiento' in tabla:
+            dias = pd.to_numeric(tabla['dias_hasta_vencimiento'], errors='coerce')
+            visibles = tabla.loc[dias.nsmallest(self.max_filas_seccion).index]
+        else:
+            visibles = tabla.head(self.max_filas_seccion)
+
+        columnas = {
+            'dominio': _texto_columna(visibles, 'dominio'),
+            'dias': _texto_columna(visibles, 'dias_hasta_vencimiento'),
+            'fecha': _texto_columna(visibles, 'fecha_expiracion'),
+            'registrar': _texto_columna(visibles, 'registrar'),
+            'nivel': _texto_columna(visibles, 'nivel_alerta'),
+            'motivo': _texto_columna(visibles, 'motivo')
+        }
+        lineas = [plantilla.substitute(dict(zip(columnas, fila))) for fila in zip(*columnas.values())]
+        if recortada:
+            # Con una sección recortada, debe_adjuntar() adjunta el CSV salvo con adjuntar_csv=False
+            referencia = " (lista completa en el CSV adjunto)" if self.adjuntar_csv is not False else ""
+            lineas.append(f"\n... y {len(tabla) - len(visibles)} dominios más{referencia}")
+        return '\n'.join(lineas) + '\n', recortada
+
+    def renderizar(self, decisiones: Dict) -> Tuple[str, bool]:
+        """
+        Arma el cuerpo del correo
+
+        Args:
+            decisiones: Diccionario devuelto por AgenteDecisor.evaluar_dominios
+
+        Returns:
+            Tupla (cuerpo, recortado) donde recortado indica si alguna sección no entró completa
+        """
+        criticos, recorte_criticos = self._seccion(
+            tabla_seccion(decisiones, 'tabla_criticos', 'dominios_criticos'),
+            PLANTILLA_CRITICO, "No hay dominios críticos.")
+        advertencia, recorte_advertencia = self._seccion(
+            tabla_seccion(decisiones, 'tabla_advertencia', 'dominios_advertencia'),
+            PLANTILLA_ADVERTENCIA, "No hay dominios en advertencia.")
+
+        # Con estado de alertas, primero lo que motivó el aviso (nuevas, escaladas, recordatorios)
+        novedades = ''
+        recorte_novedades = False
+        if decisiones.get('dominios_notificar'):
+            texto, recorte_novedades = self._seccion(
+                tabla_seccion(decisiones, 'tabla_notificar', 'dominios_notificar'), PLANTILLA_NOVEDAD, '')
+            novedades = f"\n=== NOVEDADES ===\n{texto}"
+        if decisiones.get('resueltos'):
+            novedades += f"\nAlertas resueltas (renovados): {', '.join(decisiones['resueltos'])}\n"
+
+        cuerpo = PLANTILLA_CORREO.substitute(
+            fecha=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            novedades=novedades,
+            criticos=criticos,
+            advertencia=advertencia,
+            total=decisiones['total_evaluados'],
+            criticos_count=decisiones['criticos_count'],
+            advertencia_count=decisiones['advertencia_count'],
+            accion='RENOVAR URGENTEMENTE' if decisiones['criticos_count'] > 0 else 'Monitoreo continuo'
+        )
+        return cuerpo, recorte_criticos or recorte_advertencia or recorte_novedades
+
+    def debe_adjuntar(self, decisiones: Dict, recortado: bool) -> bool:
+        """
+        Indica si corresponde adjuntar el CSV según adjuntar_csv
+
+        Args:
+            decisiones: Diccionario con decisiones
+            recortado: Si alguna sección del cuerpo quedó recortada
+
+        Returns:
+            True si hay que adjuntar el CSV
+        """
+        if self.adjuntar_csv is None:
+            return recortado
+        return self.adjuntar_csv and (decisiones['criticos_count'] + decisiones['advertencia_count']) > 0
+
+    def csv_comprimido(self, decisiones: Dict) -> bytes:
+        """
+        Genera el CSV (gzip) con todos los dominios críticos y en advertencia
+
+        Args:
+            decisiones: Diccionario con decisiones
+
+        Returns:
+            Contenido del archivo .csv.gz
+        """
+        partes = []
+        for nivel, clave_tabla, clave_lista in (('CRÍTICO', 'tabla_criticos', 'dominios_criticos'),
+                                                ('ADVERTENCIA', 'tabla_advertencia', 'dominios_advertencia')):
+            tabla = tabla_seccion(decisiones, clave_tabla, clave_lista)
+            if not tabla.empty:
+                partes.append(tabla.assign(nivel_alerta=nivel))
+        tabla = pd.concat(partes, ignore_index=True) if partes else pd.DataFrame(columns=COLUMNAS_CSV)
+        tabla = tabla[[columna for columna in COLUMNAS_CSV if columna in tabla]]
+        if 'fecha_expiracion' in tabla:
+            # Formatear Timestamps uno por uno en to_csv domina el costo: se convierten en bloque a ISO 8601
+            fechas = pd.to_datetime(tabla['fecha_expiracion'], errors='coerce', utc=True).dt.tz_localize(None)
+            texto = np.datetime_as_string(fechas.to_numpy('datetime64[s]'), unit='s', timezone='UTC')
+            tabla = tabla.assign(fecha_expiracion=np.where(fechas.isna().to_numpy(), '', texto))
+        return gzip.compress(tabla.to_csv(index=False).encode('utf-8'), compresslevel=6)
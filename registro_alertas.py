@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Log de alertas con buffer, rotación por tamaño o período y compresión de segmentos rotados
+"""
+
+import gzip
+import os
+import shutil
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: solo se sincronizan los hilos del proceso
+    fcntl = None
+
+FORMATOS = ('texto', 'jsonl')
+
+
+class RegistroAlertas:
+    """
+    Escribe el log de alertas acumulando en memoria y volcando de a bloques
+
+    Cada vaciado hace una sola escritura en modo append bajo un lock de
+    hilos y un flock sobre "<ruta>.lock", así varios hilos o procesos que
+    comparten el archivo no intercalan líneas y la rotación no se pisa.
+    Antes de escribir se rota si el archivo superaría tamano_maximo o si
+    su última escritura fue en un período anterior (rotacion_segundos,
+    por ejemplo un día). Los segmentos rotados se guardan como
+    <ruta>.1, <ruta>.2... (comprimidos con gzip si comprimir=True) y se
+    conservan como máximo copias.
+    """
+
+    def __init__(self, ruta: str = 'dominios_log.txt', formato: str = 'texto',
+                 tamano_maximo: int = 10 * 1024 * 1024, rotacion_segundos: Optional[int] = None,
+                 copias: int = 5, comprimir: bool = True, tamano_buffer: int = 64 * 1024):
+        """
+        Args:
+            ruta: Archivo de log
+            formato: 'texto' (bloques legibles) o 'jsonl' (un JSON por alerta)
+            tamano_maximo: Bytes a partir de los cuales se rota (0 = sin límite)
+            rotacion_segundos: Duración de cada período de rotación (None = solo por tamaño)
+            copias: Segmentos rotados a conservar
+            comprimir: Si True, los segmentos rotados se guardan con gzip
+            tamano_buffer: Bytes acumulados que fuerzan un vaciado
+        """
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato de log no soportado: {formato}")
+        self.logger = logging.getLogger('RegistroAlertas')
+        self.logger.setLevel(logging.INFO)
+        self.ruta = ruta
+        self.formato = formato
+        self.tamano_maximo = tamano_maximo
+        self.rotacion_segundos = rotacion_segundos
+        self.copias = copias
+        self.comprimir = comprimir
+        self.tamano_buffer = tamano_buffer
+
+        self.rotaciones = 0
+        self.bytes_escritos = 0
+
+        self._lock = threading.Lock()
+        self._buffer = []
+        self._pendientes = 0
+
+    def escribir(self, texto: str):
+        """
+        Agrega texto al buffer (se vuelca solo si supera tamano_buffer)
+
+        Args:
+            texto: Líneas a escribir, terminadas en salto de línea
+        """
+        datos = texto.encode('utf-8')
+        with self._lock:
+            self._buffer.append(datos)
+            self._pendientes += len(datos)
+            lleno = self._pendientes >= self.tamano_buffer
+        if lleno:
+            self.vaciar()
+
+    def escribir_tabla(self, tabla: pd.DataFrame, **campos):
+        """
+        Agrega cada fila de una tabla como una línea JSON
+
+        Args:
+            tabla: Filas a registrar
+            **campos: Valores constantes agregados a cada línea (fecha, nivel...)
+        """
+        if tabla.empty:
+            return
+        tabla = tabla.assign(**campos)[list(campos) + [c for c in tabla.columns if c not in campos]]
+        self.escribir(tabla.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+                      .rstrip('\n') + '\n')
+
+    @contextmanager
+    def _bloqueo_archivo(self) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.ruta}.lock", 'a') as candado:
+            fcntl.flock(candado, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(candado, fcntl.LOCK_UN)
+
+    def _debe_rotar(self, agregado: int) -> bool:
+        try:
+            estado = os.stat(self.ruta)
+        except FileNotFoundError:
+            return False
+        if estado.st_size == 0:
+            return False
+        if self.tamano_maximo and estado.st_size + agregado > self.tamano_maximo:
+            return True
+        if self.rotacion_segundos:
+            return int(estado.st_mtime // self.rotacion_segundos) != int(time.time() // self.rotacion_segundos)
+        return False
+
+    def _segmento(self, numero: int) -> str:
+        return f"{self.ruta}.{numero}" + ('.gz' if self.comprimir else '')
+
+    def _rotar(self):
+        """Desplaza los segmentos (.1 -> .2 ...) y mueve el archivo actual a .1"""
+        if self.copias <= 0:
+            os.remove(self.ruta)
+        else:
+            for numero in range(self.copias - 1, 0, -1):
+                if os.path.exists(self._segmento(numero)):
+                    os.replace(self._segmento(numero), self._segmento(numero + 1))
+            if self.comprimir:
+                temporal = f"{self._segmento(1)}.tmp"
+                with open(self.ruta, 'rb') as origen, gzip.open(temporal, 'wb', compresslevel=6) as destino:
+                    shutil.copyfileobj(origen, destino)
+                os.replace(temporal, self._segmento(1))
+                os.remove(self.ruta)
+            else:
+                os.replace(self.ruta, self._segmento(1))
+        self.rotaciones += 1
+        self.logger.info(f"Log de alertas rotado: {self.ruta}")
+
+    def vaciar(self) -> bool:
+        """
+        Escribe el buffer en el archivo, rotando antes si corresponde
+
+        Returns:
+            True si se escribió correctamente (o no había nada pendiente)
+        """
+        with self._lock:
+            if not self._buffer:
+                return True
+            datos = b''.join(self._buffer)
+            self._buffer = []
+            self._pendientes = 0
+
+            try:
+                with self._bloqueo_archivo():
+                    if self._debe_rotar(len(datos)):
+                        self._rotar()
+                    with open(self.ruta, 'ab') as archivo:
+                        archivo.write(datos)
+                self.bytes_escritos += len(datos)
+                return True
+            except Exception as e:
+                self.logger.error(f"Error al escribir el log de alertas: {str(e)}")
+                return False
+
+    def cerrar(self):
+        """Vuelca lo pendiente"""
+        self.vaciar()
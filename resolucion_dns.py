@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Resolución DNS concurrente con cache, previa a las verificaciones SSL y WHOIS
+"""
+
+import socket
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional
+
+from trazas_dominios import tramo
+
+# Códigos de getaddrinfo que indican que el nombre no existe
+CODIGOS_INEXISTENTE = {socket.EAI_NONAME}
+if hasattr(socket, 'EAI_NODATA'):
+    CODIGOS_INEXISTENTE.add(socket.EAI_NODATA)
+
+
+class DominioInexistente(OSError):
+    """El dominio no existe en DNS (NXDOMAIN)"""
+
+
+def resolver_sistema(dominio: str) -> List[str]:
+    """
+    Resuelve un dominio con el resolvedor del sistema
+
+    Args:
+        dominio: Nombre a resolver
+
+    Returns:
+        Direcciones IP (IPv4 primero)
+
+    Raises:
+        socket.gaierror: Si la resolución falla
+    """
+    respuestas = socket.getaddrinfo(dominio, None, type=socket.SOCK_STREAM)
+    direcciones = []
+    for *_, direccion in sorted(respuestas, key=lambda r: r[0] != socket.AF_INET):
+        if direccion[0] not in direcciones:
+            direcciones.append(direccion[0])
+    return direcciones
+
+
+class ResolvedorDNS:
+    """
+    Resuelve listas de dominios en paralelo y guarda las respuestas en memoria
+
+    El resolvedor es intercambiable: cualquier función dominio -> lista de IPs
+    (o tupla (lista de IPs, ttl)) que lance DominioInexistente o socket.gaierror
+    sirve, lo que permite usar un resolvedor de prueba.
+    """
+
+    def __init__(self, resolver: Optional[Callable] = None, ttl: int = 300,
+                 ttl_negativo: int = 60, max_workers: int = 50, timeout: float = 5,
+                 trazador=None):
+        """
+        Args:
+            resolver: Función de resolución (por defecto getaddrinfo del sistema)
+            ttl: Segundos que se conserva una respuesta sin TTL propio
+            ttl_negativo: Segundos que se conserva un NXDOMAIN o un error
+            max_workers: Resoluciones simultáneas en resolver_lote
+            timeout: Tiempo máximo para resolver un lote completo
+            trazador: Trazador opcional que registra un tramo 'dns' por resolución
+        """
+        self.logger = logging.getLogger('ResolvedorDNS')
+        self.logger.setLevel(logging.INFO)
+        self.resolver_fn = resolver or resolver_sistema
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.trazador = trazador
+
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Dict] = {}
+
+    def _consultar(self, dominio: str) -> Dict:
+        """Resuelve un dominio sin pasar por la cache"""
+        with tramo(self.trazador, 'dns', dominio) as datos_tramo:
+            resultado = self._resolver_sin_cache(dominio)
+            datos_tramo['existe'] = resultado['existe']
+            datos_tramo['direcciones'] = len(resultado['direcciones'])
+            if resultado['error']:
+                datos_tramo['error'] = resultado['error']
+            return resultado
+
+    def _resolver_sin_cache(self, dominio: str) -> Dict:
+        """Ejecuta la función de resolución y arma el diccionario de resultado"""
+        ahora = time.time()
+        try:
+            respuesta = self.resolver_fn(dominio)
+            if isinstance(respuesta, tuple):
+                direcciones, ttl = respuesta
+            else:
+                direcciones, ttl = respuesta, self.ttl
+            if not direcciones:
+                raise DominioInexistente(f"{dominio} no tiene direcciones")
+            return {'dominio': dominio, 'direcciones': list(direcciones), 'existe': True,
+                    'error': None, 'expira': ahora + ttl}
+        except DominioInexistente as e:
+            return {'dominio': dominio, 'direcciones': [], 'existe': False,
+                    'error': f"NXDOMAIN: {e}", 'expira': ahora + self.ttl_negativo}
+        except socket.gaierror as e:
+            inexistente = e.errno in CODIGOS_INEXISTENTE
+            return {'dominio': dominio, 'direcciones': [], 'existe': not inexistente,
+                    'error': ('NXDOMAIN: ' if inexistente else 'error_dns: ') + str(e),
+                    'expira': ahora + self.ttl_negativo}
+        except Exception as e:
+            # Fallo transitorio: no se puede afirmar que el dominio no exista
+            return {'dominio': dominio, 'direcciones': [], 'existe': True,
+                    'error': f"error_dns: {e}", 'expira': ahora + self.ttl_negativo}
+
+    def _desde_cache(self, dominio: str) -> Optional[Dict]:
+        with self._lock:
+            resultado = self._cache.get(dominio.lower())
+            if resultado and resultado['expira'] > time.time():
+                return resultado
+        return None
+
+    def _guardar(self, resultado: Dict):
+        with self._lock:
+            self._cache[resultado['dominio'].lower()] = resultado
+
+    def resolver(self, dominio: str) -> Dict:
+        """
+        Resuelve un dominio usando la cache
+
+        Args:
+            dominio: Nombre a resolver
+
+        Returns:
+            Diccionario con 'direcciones', 'existe' (False si es NXDOMAIN) y 'error'
+        """
+        resultado = self._desde_cache(dominio)
+        if resultado is None:
+            resultado = self._consultar(dominio)
+            self._guardar(resultado)
+        return resultado
+
+    def resolver_lote(self, dominios: List[str]) -> Dict[str, Dict]:
+        """
+        Resuelve una lista de dominios en paralelo
+
+        Las resoluciones que no terminan dentro de self.timeout se marcan con
+        error de timeout (sin considerarlas NXDOMAIN) y no se guardan en cache.
+
+        Args:
+            dominios: Dominios a resolver
+
+        Returns:
+            Diccionario dominio -> resultado de resolver()
+        """
+        resultados = {}
+        pendientes = []
+        for dominio in dict.fromkeys(dominios):
+            resultado = self._desde_cache(dominio)
+            if resultado is None:
+                pendientes.append(dominio)
+            else:
+                resultados[dominio] = resultado
+
+        if pendientes:
+            executor = ThreadPoolExecutor(max_workers=min(self.max_workers, len(pendientes)),
+                                          thread_name_prefix='resolvedor-dns')
+            futuros = {executor.submit(self._consultar, dominio): dominio for dominio in pendientes}
+            terminados, _ = wait(futuros, timeout=self.timeout)
+            # No esperar a las resoluciones colgadas: getaddrinfo no se puede cancelar
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            for futuro, dominio in futuros.items():
+                if futuro in terminados:
+                    resultado = futuro.result()
+                    self._guardar(resultado)
+                else:
+                    resultado = {'dominio': dominio, 'direcciones': [], 'existe': True,
+                                 'error': 'error_dns: timeout', 'expira': 0}
+                resultados[dominio] = resultado
+
+        inexistentes = sum(1 for r in resultados.values() if not r['existe'])
+        self.logger.info(f"Resolución DNS: {len(resultados)} dominios, {inexistentes} inexistentes, "
+                         f"{len(resultados) - len(pendientes)} desde cache")
+        return resultados
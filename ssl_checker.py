@@ -5,70 +5,255 @@ Módulo para verificar certificados SSL de dominios
 
 import ssl
 import socket
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Optional, List
 import logging
 
+from resolucion_dns import DominioInexistente
+from trazas_dominios import tramo
+
 class SSLChecker:
     """
     Clase para verificar certificados SSL de dominios
     """
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 20, timeout: float = 10, cache=None, resolvedor=None,
+                 trazador=None, metricas=None):
+        """
+        Args:
+            max_workers: Handshakes simultáneos en escanear_dominios
+            timeout: Tiempo máximo por dominio en segundos (conexión + handshake)
+            cache: CacheCertificados opcional para evitar handshakes y re-procesado
+            resolvedor: ResolvedorDNS opcional; se conecta directo a la IP (con SNI)
+                        y los dominios inexistentes fallan sin tocar la red
+            trazador: Trazador opcional que registra tramos de conexión TCP,
+                      handshake TLS y procesamiento por dominio
+            metricas: MetricasMonitoreo opcional donde escanear_dominios registra
+                      el uso de la cache de certificados
+        """
         self.logger = logging.getLogger('SSLChecker')
         self.logger.setLevel(logging.INFO)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.cache = cache
+        self.resolvedor = resolvedor
+        self.trazador = trazador
+        self.metricas = metricas
         
-    def obtener_info_ssl(self, dominio: str, puerto: int = 443, timeout: int = 10) -> Optional[Dict]:
+        # El contexto carga el almacén de CAs una sola vez y se comparte entre hilos
+        self.contexto = ssl.create_default_context()
+        
+    def obtener_info_ssl(self, dominio: str, puerto: int = 443, timeout: Optional[float] = None,
+                         usar_cache: bool = True) -> Optional[Dict]:
         """
         Obtiene información del certificado SSL de un dominio
         
         Args:
             dominio: Nombre del dominio a verificar
             puerto: Puerto SSL (default 443)
-            timeout: Timeout en segundos
+            timeout: Timeout en segundos (por defecto self.timeout)
+            usar_cache: Si False, conecta aunque la cache tenga el certificado vigente
             
         Returns:
             Diccionario con información del certificado o None si hay error
         """
         try:
-            # Crear contexto SSL
-            context = ssl.create_default_context()
+            return self._inspeccionar_certificado(dominio, puerto, timeout or self.timeout, usar_cache)
+        except Exception as e:
+            self.logger.error(f"Error al verificar SSL para {dominio}: {str(e)}")
+            return None
+    
+    def _inspeccionar_certificado(self, dominio: str, puerto: int, timeout: float, usar_cache: bool = True) -> Dict:
+        """
+        Conecta al dominio y extrae la información del certificado
+        
+        El timeout es un límite total para conexión y handshake. Con cache,
+        no se conecta si aún no toca re-verificar, y si el certificado recibido
+        tiene la misma huella que el cacheado se reutiliza sin procesarlo.
+        
+        Raises:
+            Exception: Si la conexión o el handshake fallan
+        """
+        with tramo(self.trazador, 'ssl_verificacion', dominio, puerto=puerto) as datos_tramo:
+            if self.cache is not None and usar_cache:
+                info_cert = self.cache.obtener_vigente(dominio, puerto)
+                if info_cert:
+                    datos_tramo['cache'] = 'vigente'
+                    return info_cert
+            
+            limite = time.monotonic() + timeout
             
-            # Conectar y obtener certificado
-            with socket.create_connection((dominio, puerto), timeout=timeout) as sock:
-                with context.wrap_socket(sock, server_hostname=dominio) as ssock:
+            # Conectar y obtener certificado (sin resolvedor, la conexión incluye la resolución DNS)
+            with tramo(self.trazador, 'tcp_connect', dominio, puerto=puerto, incluye_dns=self.resolvedor is None):
+                sock = self._conectar(dominio, puerto, timeout)
+            with sock:
+                sock.settimeout(max(0.001, limite - time.monotonic()))
+                with tramo(self.trazador, 'tls_handshake', dominio) as datos_handshake:
+                    ssock = self.contexto.wrap_socket(sock, server_hostname=dominio)
+                    datos_handshake['version'] = ssock.version()
+                with ssock:
                     cert = ssock.getpeercert()
-                    
-            # Extraer información del certificado
-            info_cert = {
-                'dominio': dominio,
-                'version': cert.get('version'),
-                'serial_number': cert.get('serialNumber'),
-                'emisor': dict(cert.get('issuer', [])),
-                'sujeto': dict(cert.get('subject', [])),
-                'fecha_inicio': self._parse_date(cert.get('notBefore')),
-                'fecha_fin': self._parse_date(cert.get('notAfter')),
-                'algoritmo': cert.get('signatureAlgorithm'),
-                'alternativos': cert.get('subjectAltName', []),
-                'fecha_verificacion': datetime.now()
-            }
-            
-            # Calcular días hasta expiración
-            if info_cert['fecha_fin']:
-                dias_hasta_expiracion = (info_cert['fecha_fin'] - datetime.now()).days
-                info_cert['dias_hasta_expiracion'] = dias_hasta_expiracion
-            else:
-                info_cert['dias_hasta_expiracion'] = None
-                
-            # Verificar si el certificado es válido para el dominio
-            info_cert['dominio_valido'] = self._verificar_dominio(dominio, cert)
+                    der = ssock.getpeercert(binary_form=True)
+            
+            if self.cache is None:
+                with tramo(self.trazador, 'parse_certificado', dominio):
+                    return self._procesar_certificado(dominio, cert)
             
-            self.logger.info(f"SSL verificado para {dominio}: {info_cert['dias_hasta_expiracion']} días hasta expiración")
+            huella = hashlib.sha256(der).hexdigest()
+            info_cert = self.cache.obtener_por_huella(dominio, puerto, huella)
+            if info_cert is None:
+                with tramo(self.trazador, 'parse_certificado', dominio):
+                    info_cert = self._procesar_certificado(dominio, cert)
+                self.cache.guardar(dominio, puerto, huella, info_cert)
+            else:
+                datos_tramo['cache'] = 'misma_huella'
             return info_cert
+    
+    def _conectar(self, dominio: str, puerto: int, timeout: float) -> socket.socket:
+        """
+        Abre la conexión TCP, usando las IPs ya resueltas si hay resolvedor
+        
+        Raises:
+            DominioInexistente: Si el resolvedor marcó el dominio como NXDOMAIN
+        """
+        if self.resolvedor is None:
+            return socket.create_connection((dominio, puerto), timeout=timeout)
+        
+        resolucion = self.resolvedor.resolver(dominio)
+        if not resolucion['existe']:
+            raise DominioInexistente(resolucion['error'])
+        if not resolucion['direcciones']:
+            raise OSError(resolucion['error'])
+        
+        limite = time.monotonic() + timeout
+        ultimo_error = None
+        for direccion in resolucion['direcciones']:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                break
+            try:
+                return socket.create_connection((direccion, puerto), timeout=restante)
+            except OSError as e:
+                ultimo_error = e
+        raise ultimo_error or socket.timeout("timeout al conectar")
+    
+    def _procesar_certificado(self, dominio: str, cert: Dict) -> Dict:
+        """
+        Extrae la información relevante de un certificado ya recibido
+        
+        Args:
+            dominio: Dominio verificado
+            cert: Certificado devuelto por getpeercert()
             
-        except Exception as e:
-            self.logger.error(f"Error al verificar SSL para {dominio}: {str(e)}")
-            return None
+        Returns:
+            Diccionario con información del certificado
+        """
+        # Extraer información del certificado
+        info_cert = {
+            'dominio': dominio,
+            'version': cert.get('version'),
+            'serial_number': cert.get('serialNumber'),
+            'emisor': dict(x[0] for x in cert.get('issuer', [])),
+            'sujeto': dict(x[0] for x in cert.get('subject', [])),
+            'fecha_inicio': self._parse_date(cert.get('notBefore')),
+            'fecha_fin': self._parse_date(cert.get('notAfter')),
+            'algoritmo': cert.get('signatureAlgorithm'),
+            'alternativos': cert.get('subjectAltName', []),
+            'fecha_verificacion': datetime.now()
+        }
+        
+        # Calcular días hasta expiración
+        if info_cert['fecha_fin']:
+            dias_hasta_expiracion = (info_cert['fecha_fin'] - datetime.now()).days
+            info_cert['dias_hasta_expiracion'] = dias_hasta_expiracion
+        else:
+            info_cert['dias_hasta_expiracion'] = None
+            
+        # Verificar si el certificado es válido para el dominio
+        info_cert['dominio_valido'] = self._verificar_dominio(dominio, cert)
+        
+        self.logger.info(f"SSL verificado para {dominio}: {info_cert['dias_hasta_expiracion']} días hasta expiración",
+                         extra={'por_dominio': True, 'dominio': dominio})
+        return info_cert
+    
+    def _motivo_error(self, error: Exception) -> str:
+        """
+        Clasifica un error de conexión SSL en un motivo legible
+        
+        Args:
+            error: Excepción capturada
+            
+        Returns:
+            Motivo del fallo
+        """
+        if isinstance(error, ssl.SSLCertVerificationError):
+            return f"certificado_invalido: {error.verify_message}"
+        if isinstance(error, ssl.SSLError):
+            return f"error_tls: {error.reason or error}"
+        if isinstance(error, DominioInexistente):
+            return f"dns: {error}"
+        if isinstance(error, socket.gaierror):
+            return "dns: el dominio no se pudo resolver"
+        if isinstance(error, (socket.timeout, TimeoutError)):
+            return "timeout"
+        if isinstance(error, ConnectionRefusedError):
+            return "conexion_rechazada"
+        if isinstance(error, OSError):
+            return f"error_red: {error.strerror or error}"
+        return f"error: {error}"
+    
+    def escanear_dominios(self, dominios: List[str], puerto: int = 443,
+                          timeout: Optional[float] = None, max_workers: Optional[int] = None,
+                          usar_cache: bool = True) -> List[Dict]:
+        """
+        Verifica certificados de múltiples dominios con handshakes concurrentes
+        
+        Args:
+            dominios: Lista de dominios a verificar
+            puerto: Puerto SSL
+            timeout: Tiempo máximo por dominio (por defecto self.timeout)
+            max_workers: Handshakes simultáneos (por defecto self.max_workers)
+            usar_cache: Si False, conecta a todos los dominios aunque estén en cache
+            
+        Returns:
+            Lista en el mismo orden que dominios; cada elemento es la información
+            del certificado con 'error' = None, o {'dominio', 'error', 'fecha_verificacion'}
+            con el motivo del fallo
+        """
+        timeout = timeout or self.timeout
+        workers = min(max_workers or self.max_workers, max(1, len(dominios)))
+        
+        def escanear(dominio: str) -> Dict:
+            try:
+                info = self._inspeccionar_certificado(dominio, puerto, timeout, usar_cache)
+                info['error'] = None
+                return info
+            except Exception as e:
+                motivo = self._motivo_error(e)
+                self.logger.error(f"Error al verificar SSL para {dominio}: {motivo}")
+                return {'dominio': dominio, 'error': motivo, 'fecha_verificacion': datetime.now()}
+        
+        inicio = time.perf_counter()
+        cache_previa = self.cache.estadisticas() if self.cache is not None else None
+        
+        # Resolver toda la lista de una vez; los handshakes leen de la cache DNS
+        if self.resolvedor is not None:
+            self.resolvedor.resolver_lote(dominios)
+        
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ssl-checker') as executor:
+            resultados = list(executor.map(escanear, dominios))
+        
+        if self.metricas is not None and cache_previa is not None:
+            # Los contadores de la cache son acumulados: se registra solo este escaneo
+            self.metricas.registrar_cache_ssl({clave: valor - cache_previa[clave]
+                                               for clave, valor in self.cache.estadisticas().items()})
+        
+        exitosos = sum(1 for r in resultados if r['error'] is None)
+        self.logger.info(f"Escaneo SSL: {exitosos}/{len(dominios)} certificados en {time.perf_counter() - inicio:.1f}s")
+        return resultados
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """
@@ -115,7 +300,7 @@ class SSLChecker:
         """
         try:
             # Obtener CN del sujeto
-            subject = dict(cert.get('subject', []))
+            subject = dict(x[0] for x in cert.get('subject', []))
             cn = subject.get('commonName', '')
             
             # Verificar dominio principal
@@ -153,12 +338,7 @@ class SSLChecker:
         Returns:
             Lista de diccionarios con información de certificados
         """
-        resultados = []
-        
-        for dominio in dominios:
-            info = self.obtener_info_ssl(dominio)
-            if info:
-                resultados.append(info)
+        resultados = [r for r in self.escanear_dominios(dominios) if r['error'] is None]
                 
         self.logger.info(f"Se verificaron {len(resultados)} certificados SSL exitosamente")
         return resultados
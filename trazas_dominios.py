@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Trazas por dominio (DNS, conexión TCP, handshake TLS, consulta WHOIS y parseo)
+exportables como Chrome trace o JSON lines
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+
+class Trazador:
+    """
+    Registra tramos (spans) con tiempo de inicio y duración por dominio
+
+    Es opcional: los componentes reciben trazador=None por defecto y en ese
+    caso no registran nada. Cada dominio tiene su propia pista (tid) en el
+    Chrome trace, así los tramos de consultas concurrentes no se mezclan y
+    un dominio lento se ve como una pista larga. El archivo Chrome trace se
+    abre con chrome://tracing o https://ui.perfetto.dev.
+    """
+
+    def __init__(self, limite_tramos: int = 1_000_000):
+        """
+        Args:
+            limite_tramos: Tramos máximos en memoria; los siguientes se descartan
+        """
+        self.limite_tramos = limite_tramos
+        self._lock = threading.Lock()
+        self.reiniciar()
+
+    def reiniciar(self):
+        """Descarta los tramos registrados y toma un nuevo origen de tiempo"""
+        with self._lock:
+            self.descartados = 0
+            self._tramos: List[Dict] = []
+            self._pistas: Dict[str, int] = {}
+            self._origen = time.perf_counter()
+            self._origen_epoch = time.time()
+
+    def _pista(self, dominio: str) -> int:
+        pista = self._pistas.get(dominio)
+        if pista is None:
+            pista = self._pistas[dominio] = len(self._pistas) + 1
+        return pista
+
+    @contextmanager
+    def tramo(self, nombre: str, dominio: str, **atributos) -> Iterator[Dict]:
+        """
+        Mide un tramo de trabajo de un dominio
+
+        Si el bloque lanza una excepción, el tramo se guarda con el error y la
+        excepción se propaga. El diccionario entregado permite agregar
+        atributos desde dentro del bloque.
+
+        Args:
+            nombre: Nombre del tramo (dns, tcp_connect, tls_handshake, whois_consulta...)
+            dominio: Dominio al que pertenece
+            **atributos: Datos adicionales (servidor, dirección, cache...)
+
+        Yields:
+            Diccionario de atributos del tramo
+        """
+        inicio = time.perf_counter()
+        try:
+            yield atributos
+        except BaseException as e:
+            atributos['error'] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            fin = time.perf_counter()
+            with self._lock:
+                if len(self._tramos) >= self.limite_tramos:
+                    self.descartados += 1
+                else:
+                    self._tramos.append({
+                        'nombre': nombre,
+                        'dominio': dominio,
+                        'pista': self._pista(dominio),
+                        'inicio': inicio - self._origen,
+                        'duracion': fin - inicio,
+                        'atributos': atributos
+                    })
+
+    def tramos(self) -> List[Dict]:
+        """
+        Devuelve los tramos registrados en formato legible
+
+        Returns:
+            Lista de diccionarios con dominio, nombre, inicio (ISO), duracion_ms y atributos
+        """
+        with self._lock:
+            tramos = list(self._tramos)
+        return [{
+            'dominio': tramo['dominio'],
+            'nombre': tramo['nombre'],
+            'inicio': datetime.fromtimestamp(self._origen_epoch + tramo['inicio']).isoformat(),
+            'duracion_ms': round(tramo['duracion'] * 1000, 3),
+            'atributos': tramo['atributos']
+        } for tramo in sorted(tramos, key=lambda t: t['inicio'])]
+
+    def mas_lentos(self, nombre: Optional[str] = None, cantidad: int = 10) -> List[Dict]:
+        """
+        Devuelve los tramos más largos (por ejemplo para ver servidores lentos)
+
+        Args:
+            nombre: Filtrar por nombre de tramo (None = todos)
+            cantidad: Tramos a devolver
+
+        Returns:
+            Tramos ordenados de mayor a menor duración
+        """
+        tramos = [t for t in self.tramos() if nombre is None or t['nombre'] == nombre]
+        return sorted(tramos, key=lambda t: t['duracion_ms'], reverse=True)[:cantidad]
+
+    def eventos_chrome(self) -> List[Dict]:
+        """
+        Convierte los tramos a eventos del formato Chrome trace (fase 'X')
+
+        Returns:
+            Lista de eventos con metadatos de nombre de pista por dominio
+        """
+        pid = os.getpid()
+        with self._lock:
+            tramos = list(self._tramos)
+            pistas = dict(self._pistas)
+
+        eventos = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                    'args': {'name': 'monitoreo de dominios'}}]
+        eventos.extend({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': pista, 'args': {'name': dominio}}
+                       for dominio, pista in pistas.items())
+        eventos.extend({
+            'name': tramo['nombre'],
+            'cat': tramo['nombre'].split('_', 1)[0],
+            'ph': 'X',
+            'ts': round(tramo['inicio'] * 1e6, 1),
+            'dur': round(tramo['duracion'] * 1e6, 1),
+            'pid': pid,
+            'tid': tramo['pista'],
+            'args': {'dominio': tramo['dominio'], **tramo['atributos']}
+        } for tramo in tramos)
+        return eventos
+
+    def exportar(self, ruta: str) -> int:
+        """
+        Escribe los tramos en ruta: JSON lines si termina en .jsonl, Chrome trace si no
+
+        Args:
+            ruta: Archivo de destino
+
+        Returns:
+            Cantidad de tramos exportados
+        """
+        if ruta.endswith('.jsonl'):
+            tramos = self.tramos()
+            with open(ruta, 'w', encoding='utf-8') as archivo:
+                for tramo in tramos:
+                    archivo.write(json.dumps(tramo, ensure_ascii=False, default=str) + '\n')
+            return len(tramos)
+
+        eventos = self.eventos_chrome()
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms',
+                       'otherData': {'inicio': datetime.fromtimestamp(self._origen_epoch).isoformat(),
+                                     'tramos_descartados': self.descartados}},
+                      archivo, ensure_ascii=False, default=str)
+        return sum(1 for evento in eventos if evento['ph'] == 'X')
+
+
+def tramo(trazador: Optional[Trazador], nombre: str, dominio: str, **atributos):
+    """
+    Devuelve trazador.tramo(...) o un contexto vacío si no hay trazador
+
+    Permite instrumentar el código sin condicionales en cada punto.
+    """
+    if trazador is None:
+        return nullcontext({})
+    return trazador.tramo(nombre, dominio, **atributos)
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Cliente WHOIS asíncrono (protocolo del puerto 43) para el Agente Lector
+"""
+
+import asyncio
+import re
+import time
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from agente_lector import armar_info_dominio
+from parser_whois import extraer_campos_rapido
+from trazas_dominios import tramo
+
+# Algunos servidores requieren un prefijo para devolver solo la coincidencia exacta
+PREFIJOS_CONSULTA = {
+    'whois.verisign-grs.com': '=',
+}
+
+# Líneas que indican el siguiente servidor WHOIS a consultar
+PATRON_REFERENCIA = re.compile(
+    r'^\s*(?:refer|whois|Registrar WHOIS Server|ReferralServer)\s*:\s*(?:whois://)?([A-Za-z0-9.-]+)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+PATRONES_EXPIRACION = [
+    re.compile(r'^\s*Registry Expiry Date\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'^\s*Registrar Registration Expiration Date\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'^\s*(?:Expiration|Expiry) Date\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'^\s*paid-till\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE),
+    re.compile(r'^\s*expires\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE),
+]
+
+PATRON_REGISTRAR = re.compile(r'^\s*(?:Registrar|registrar name)\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+PATRON_ESTADO = re.compile(r'^\s*(?:Domain )?Status\s*:\s*(.+)$', re.IGNORECASE | re.MULTILINE)
+
+FORMATOS_FECHA = [
+    '%Y-%m-%dT%H:%M:%SZ',
+    '%Y-%m-%dT%H:%M:%S.%fZ',
+    '%Y-%m-%dT%H:%M:%S%z',
+    '%Y-%m-%dT%H:%M:%S.%f%z',
+    '%Y-%m-%d %H:%M:%S',
+    '%Y-%m-%d',
+    '%Y.%m.%d',
+    '%d-%b-%Y',
+    '%d.%m.%Y',
+]
+
+
+def parsear_fecha_whois(texto: str) -> Optional[datetime]:
+    """
+    Convierte una fecha de respuesta WHOIS a datetime
+
+    Args:
+        texto: Fecha tal como aparece en la respuesta
+
+    Returns:
+        Objeto datetime o None si no se reconoce el formato
+    """
+    texto = texto.strip()
+    for fmt in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def extraer_campos_whois(respuestas: List[str]) -> Tuple[Optional[datetime], Optional[str], Optional[object]]:
+    """
+    Extrae fecha de expiración, registrador y estado de las respuestas WHOIS
+
+    Las respuestas se recorren de la más específica (la última referencia)
+    a la más general, y cada campo toma el primer valor encontrado.
+
+    Args:
+        respuestas: Textos crudos en el orden en que se consultaron
+
+    Returns:
+        Tupla (fecha_expiracion, registrar, estado)
+    """
+    expiracion = None
+    registrar = None
+    estado = None
+
+    for texto in reversed(respuestas):
+        if expiracion is None:
+            for patron in PATRONES_EXPIRACION:
+                coincidencia = patron.search(texto)
+                if coincidencia:
+                    expiracion = parsear_fecha_whois(coincidencia.group(1))
+                    if expiracion:
+                        break
+
+        if registrar is None:
+            coincidencia = PATRON_REGISTRAR.search(texto)
+            if coincidencia:
+                registrar = coincidencia.group(1).strip()
+
+        if estado is None:
+            estados = [e.strip() for e in PATRON_ESTADO.findall(texto)]
+            if estados:
+                # Mismo formato que python-whois: cadena si hay uno, lista si hay varios
+                estado = estados[0] if len(estados) == 1 else estados
+
+    return expiracion, registrar, estado
+
+
+class ClienteWhoisAsincrono:
+    """
+    Cliente WHOIS basado en asyncio que habla el protocolo del puerto 43
+    directamente y sigue las referencias entre servidores
+    """
+
+    def __init__(self, servidor_raiz: str = 'whois.iana.org', puerto: int = 43,
+                 timeout: float = 10, max_referencias: int = 3, max_concurrencia: int = 100,
+                 direcciones: Optional[Dict[str, Tuple[str, int]]] = None,
+                 planificador=None, metricas=None, trazador=None):
+        """
+        Args:
+            servidor_raiz: Servidor inicial (IANA devuelve el servidor del TLD)
+            puerto: Puerto WHOIS por defecto
+            timeout: Timeout en segundos por cada servidor consultado
+            max_referencias: Máximo de saltos de referencia a seguir
+            max_concurrencia: Consultas simultáneas por defecto en consultar_dominios
+            direcciones: Mapa opcional nombre_servidor -> (host, puerto) para
+                         redirigir servidores (por ejemplo a un servidor local de pruebas)
+            planificador: PlanificadorWhois opcional; limita la tasa por servidor
+                          y aporta el mapa TLD -> servidor para evitar pasar por IANA
+            metricas: MetricasMonitoreo opcional donde registrar latencia y errores
+            trazador: Trazador opcional; registra tramos por servidor consultado
+                      (conexión TCP, ida y vuelta) y del parseo
+        """
+        self.logger = logging.getLogger('ClienteWhoisAsincrono')
+        self.logger.setLevel(logging.INFO)
+        self.servidor_raiz = servidor_raiz
+        self.puerto = puerto
+        self.timeout = timeout
+        self.max_referencias = max_referencias
+        self.max_concurrencia = max(1, max_concurrencia)
+        self.direcciones = direcciones or {}
+        self.planificador = planificador
+        self.metricas = metricas
+        self.trazador = trazador
+
+        # TLD -> servidor WHOIS aprendido de las respuestas de IANA
+        self.servidores_tld: Dict[str, str] = {}
+
+    def _direccion(self, servidor: str) -> Tuple[str, int]:
+        """Resuelve el host y puerto reales de un servidor WHOIS"""
+        return self.direcciones.get(servidor.lower(), (servidor, self.puerto))
+
+    async def consultar_servidor(self, servidor: str, consulta: str) -> str:
+        """
+        Envía una consulta a un servidor WHOIS y devuelve la respuesta completa
+
+        Args:
+            servidor: Nombre del servidor WHOIS
+            consulta: Texto de la consulta (normalmente el dominio)
+
+        Returns:
+            Respuesta del servidor como texto
+        """
+        # El tramo incluye la espera del planificador: la diferencia con la
+        # conexión y la ida y vuelta es tiempo de cola por límite de tasa
+        with tramo(self.trazador, 'whois_servidor', consulta, servidor=servidor):
+            if self.planificador is not None:
+                async with self.planificador.permiso_async(servidor.lower()):
+                    return await self._enviar_consulta(servidor, consulta)
+            return await self._enviar_consulta(servidor, consulta)
+
+    async def _enviar_consulta(self, servidor: str, consulta: str) -> str:
+        host, puerto = self._direccion(servidor)
+        prefijo = PREFIJOS_CONSULTA.get(servidor.lower(), '')
+
+        # open_connection resuelve el nombre del servidor: el tramo incluye DNS
+        with tramo(self.trazador, 'tcp_connect', consulta, servidor=servidor, incluye_dns=True):
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, puerto), self.timeout)
+        try:
+            with tramo(self.trazador, 'whois_ida_vuelta', consulta, servidor=servidor) as datos_tramo:
+                writer.write(f"{prefijo}{consulta}\r\n".encode('utf-8'))
+                await writer.drain()
+                datos = await asyncio.wait_for(reader.read(), self.timeout)
+                datos_tramo['bytes'] = len(datos)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+
+        return datos.decode('utf-8', errors='replace')
+
+    async def consultar_texto(self, dominio: str) -> List[str]:
+        """
+        Consulta un dominio siguiendo las referencias entre servidores
+
+        Args:
+            dominio: Nombre del dominio a consultar
+
+        Returns:
+            Lista de respuestas crudas, de la más general a la más específica
+        """
+        tld = dominio.rsplit('.', 1)[-1].lower()
+        servidor = self.servidores_tld.get(tld)
+        if servidor is None and self.planificador is not None:
+            servidor = self.planificador.servidores_tld.get(tld)
+        servidor = servidor or self.servidor_raiz
+        visitados = set()
+        respuestas = []
+
+        for _ in range(self.max_referencias + 1):
+            visitados.add(servidor.lower())
+            texto = await self.consultar_servidor(servidor, dominio)
+            respuestas.append(texto)
+
+            coincidencia = PATRON_REFERENCIA.search(texto)
+            if not coincidencia:
+                break
+
+            siguiente = coincidencia.group(1).rstrip('.').lower()
+            if siguiente in visitados:
+                break
+
+            if servidor == self.servidor_raiz:
+                self.servidores_tld[tld] = siguiente
+            servidor = siguiente
+
+        return respuestas
+
+    async def obtener_info_dominio(self, dominio: str) -> Optional[Dict]:
+        """
+        Obtiene la información de un dominio con el mismo formato que AgenteLector
+
+        Args:
+            dominio: Nombre del dominio a consultar
+
+        Returns:
+            Diccionario con información del dominio o None si hay error
+        """
+        inicio = time.perf_counter()
+        try:
+            with tramo(self.trazador, 'whois_consulta', dominio):
+                respuestas = await self.consultar_texto(dominio)
+                with tramo(self.trazador, 'whois_parse', dominio):
+                    # Primero los patrones del TLD sobre las respuestas encadenadas, como las ve python-whois
+                    campos = extraer_campos_rapido(dominio, '\n'.join(respuestas))
+                    expiracion, registrar, estado = campos or extraer_campos_whois(respuestas)
+
+                if expiracion is None and registrar is None:
+                    raise ValueError("respuesta WHOIS sin datos de registro")
+
+                info = armar_info_dominio(dominio, expiracion, registrar, estado)
+
+            if self.metricas is not None:
+                self.metricas.registrar_consulta(time.perf_counter() - inicio)
+            self.logger.info(f"Información obtenida para {dominio}: {info['dias_hasta_vencimiento']} días hasta vencimiento",
+                             extra={'por_dominio': True, 'dominio': dominio})
+            return info
+
+        except Exception as e:
+            if self.metricas is not None:
+                self.metricas.registrar_consulta(time.perf_counter() - inicio, e)
+            self.logger.error(f"Error al obtener información del dominio {dominio}: {str(e) or type(e).__name__}")
+            return None
+
+    async def consultar_dominios(self, lista_dominios: List[str],
+                                 max_concurrencia: Optional[int] = None) -> List[Optional[Dict]]:
+        """
+        Consulta múltiples dominios en el mismo event loop
+
+        Args:
+            lista_dominios: Lista de dominios a consultar
+            max_concurrencia: Consultas simultáneas (por defecto self.max_concurrencia)
+
+        Returns:
+            Lista de resultados en el mismo orden que lista_dominios (None si hubo error)
+        """
+        semaforo = asyncio.Semaphore(max_concurrencia or self.max_concurrencia)
+
+        async def consultar(dominio: str) -> Optional[Dict]:
+            async with semaforo:
+                return await self.obtener_info_dominio(dominio)
+
+        return await asyncio.gather(*(consultar(dominio) for dominio in lista_dominios))